@@ -72,8 +72,17 @@ import segment as seg
 #        control of the root logger.
 #__import__('logging').root.setLevel(__import__('logging').INFO)
 
-## shortcuts
-h, top, go, goof = database.h, func.top, database.go, database.go_offset
+## shortcuts (if a module hasn't been loaded yet, then we avoid loading it
+## by fetching the shortcut from the module only when it gets called)
+def __shortcut__(module, name):
+    if '__lazy__' not in module.__dict__:
+        return getattr(module, name)
+    def shortcut(*args, **kwargs):
+        return getattr(module, name)(*args, **kwargs)
+    shortcut.__name__, shortcut.__doc__ = name, "Shortcut for `{:s}.{:s}`.".format(module.__name__, name)
+    return shortcut
+h, top, go, goof = (__shortcut__(module, name) for module, name in [(database, 'h'), (func, 'top'), (database, 'go'), (database, 'go_offset')])
+del(__shortcut__)
 
 ## other useful things that we can grab from other modules
 
@@ -58,8 +58,9 @@ that is prefixed with a backslash.
 """
 
 import functools, operator, itertools, types
-import collections, heapq, string
+import collections, heapq, bisect, string, re, contextlib
 import six, logging
+import zlib, bz2
 
 import internal, idaapi
 import codecs
@@ -534,6 +535,123 @@ class tag(object):
         # plain and simple...
         return key.get(), value.get()
 
+### compiled encoding/decoding of a tag
+class codec(object):
+    """
+    Namespace for encoding and decoding a tag and its value a line at a
+    time. This produces the exact same results as the ``tag`` namespace,
+    but instead of processing each character through a coroutine, the
+    common formats are matched with regular expressions and characters
+    are escaped using a table. The table is populated the first time a
+    character is encountered by escaping it with the ``tag`` namespace.
+    Any input that these are unable to handle is then passed to the
+    ``tag`` namespace so that it can be decoded (or fail) the same way.
+    """
+
+    # the whitespace that is skipped by the ``tag`` namespace
+    whitespace = string.whitespace
+
+    # a line whose tag name has nothing that needs to be unescaped
+    line = re.compile(u"[{:s}]*\\[([^\\]\\\\]*)\\](.*)\\Z".format(re.escape(whitespace)), re.DOTALL)
+
+    # each escape sequence that can be unescaped without the ``tag`` namespace
+    escape = re.compile(r'\\(?:x[0-9a-f]{2}|u[0-9a-f]{4}|[^xuU])', re.DOTALL)
+    escapable = re.compile(r'(?:[^\\]+|\\(?:x[0-9a-f]{2}|u[0-9a-f]{4}|[^xuU]))*\Z', re.DOTALL)
+
+    # tables of each character that has been escaped for a tag name and a value
+    names, values = {str: {}, unicode: {}}, {str: {}, unicode: {}}
+
+    @classmethod
+    def __table__(cls, tables, string, escape):
+        '''Return the table from `tables` for escaping `string` after adding any characters that are missing from it using `escape`.'''
+        table = tables[unicode if isinstance(string, unicode) else str]
+        missing = {ch for ch in string} - six.viewkeys(table)
+        table.update((ch, escape(ch)) for ch in missing)
+        return table
+
+    @classmethod
+    def __escape_name__(cls, ch):
+        result = internal.interface.collect_t(unicode, operator.add)
+        tag.name.encode(iter(ch), result)
+        return result.get()[+1 : -1]
+
+    @classmethod
+    def __unescape__(cls, match):
+        sequence = match.group(0)
+        t = sequence[1]
+        if t in {'x', 'u'}:
+            return six.unichr(int(sequence[2:], 16))
+        return internal.utils.character.const.inverse.get(sequence, t)
+
+    @classmethod
+    def name(cls, key):
+        '''Return the specified `key` encoded as the name of a tag.'''
+        if not isinstance(key, six.string_types):
+            result = internal.interface.collect_t(unicode, operator.add)
+            tag.name.encode(iter(key), result)
+            return result.get()
+        try:
+            table = cls.names[unicode if isinstance(key, unicode) else str]
+            return unicode().join([tag.name.prefix] + [table[ch] for ch in key] + [tag.name.suffix])
+        except KeyError:
+            table = cls.__table__(cls.names, key, cls.__escape_name__)
+        return unicode().join([tag.name.prefix] + [table[ch] for ch in key] + [tag.name.suffix])
+
+    @classmethod
+    def string(cls, instance):
+        '''Return the string in `instance` with any of its characters escaped.'''
+        try:
+            table = cls.values[unicode if isinstance(instance, unicode) else str]
+            return unicode().join([table[ch] for ch in instance])
+        except KeyError:
+            table = cls.__table__(cls.values, instance, _str.encode)
+        return unicode().join([table[ch] for ch in instance])
+
+    @classmethod
+    def unescape(cls, data):
+        '''Return the string in `data` with its leading whitespace removed and its escape sequences evaluated.'''
+        res = (data if isinstance(data, unicode) else data.decode('utf8')).lstrip()
+        if u'\\' not in res:
+            return res
+        elif cls.escapable.match(res):
+            return cls.escape.sub(cls.__unescape__, res)
+        return _str.decode(res)
+
+    @classmethod
+    def value(cls, data):
+        '''Decode the value of a tag from the string in `data`.'''
+        try:
+            t = cache.match(data)
+        except KeyError:
+            t = _str
+
+        # use our own unescape if it's a string, otherwise use the decoder
+        # and fall back to a string if it couldn't be decoded.
+        try:
+            return cls.unescape(data) if t is _str else t.decode(data)
+        except Exception as E:
+            logging.debug(u"{:s}.value({!s}) : Assuming value is of type {!s} due to an exception raised by {!s}.".format('.'.join([__name__, cls.__name__]), internal.utils.string.repr(data), _str, t), exc_info=True)
+        return cls.unescape(data)
+
+    @classmethod
+    def encode(cls, key, value):
+        '''Encode the provided `key` and `value` into a line fit for a comment.'''
+        t = cache.by(value)
+        encoded = cls.string(value) if issubclass(t, _str) and t.encode.__func__ is _str.encode.__func__ else t.encode(value)
+        return unicode().join([cls.name(key), u' ', encoded])
+
+    @classmethod
+    def decode(cls, line):
+        '''Decode the specified `line` and return the key and its value.'''
+        match = cls.line.match(line)
+        if not match:
+            return tag.decode((ch for ch in line))
+
+        # if the value is only whitespace, then it's an empty string.
+        name, data = match.groups()
+        data = data.lstrip(cls.whitespace)
+        return unicode() + name, cls.value(data) if data else unicode()
+
 ### Encoding and decoding of a comment
 def decode(data, default=u''):
     """Decode all the `(key, value)` pairs from the string `data` delimited by newlines.
@@ -547,15 +665,13 @@ def decode(data, default=u''):
 
     # initialize some variables to keep our state
     res = {}
-    key, value = internal.interface.collect_t(object, lambda _, key: key), internal.interface.collect_t(object, lambda _, value: value)
 
     # iterate through each line in the data
     for line in data.split(u'\n'):
-        iterable = (ch for ch in line)
 
         # try and decode the key and the value from the line
         try:
-            k, v = tag.decode(iterable)
+            k, v = codec.decode(line)
 
         # if the key wasn't terminated properly, or formatted correctly,
         # then append it to the default key separated by newlines
@@ -582,7 +698,7 @@ def encode(dict):
     # walk each item in the dictionary
     for k, v in (dict or {}).items():
         # encode the key and value from the dictionary
-        line = tag.encode(k, v)
+        line = codec.encode(k, v)
 
         # aggregate it into our list
         res.append(line)
@@ -592,14 +708,310 @@ def encode(dict):
 
 def check(data):
     '''Check that the string `data` has the correct format by trying to decode it.'''
-    res = map(iter, (data or '').split('\n'))
+    res = (data or '').split('\n')
     try:
-        [tag.decode(item) for item in res]
+        [codec.decode(item) for item in res]
     except Exception as E:
         return False
     return True
 
 ### Tag reference counting
+class decoded(object):
+    """
+    This namespace is a least-recently-used cache of the tags that have
+    been decoded from the comments in the database. The tags for the
+    comment at an address are keyed by the address and whether the
+    comment is repeatable, and the tags for a function's comment are
+    kept separately and keyed by the address of the function.
+
+    Each entry retains the comment that it was decoded from and so an
+    entry is only used if the comment that is being decoded is the same.
+    The hooks that are notified when a comment changes are responsible
+    for discarding the entries for the comment being changed. The number
+    of entries that are kept can be adjusted with ``decoded.resize``.
+    """
+    capacity = 0x2000
+    addresses, functions = collections.OrderedDict(), collections.OrderedDict()
+    statistics = {'hits': 0, 'misses': 0, 'evictions': 0, 'discards': 0}
+
+    @classmethod
+    def __lookup__(cls, table, key, string):
+        '''Return the tags decoded from `string` using the entry for `key` in `table` if possible.'''
+        comment, res = table.pop(key, (None, None))
+        if res is not None and comment == string:
+            cls.statistics['hits'] += 1
+        else:
+            cls.statistics['misses'] += 1
+            res = decode(string)
+
+        # re-insert the entry so that it is the most recently used, and then
+        # evict whatever entries were least recently used.
+        table[key] = string, res
+        while len(table) > cls.capacity:
+            table.popitem(last=False)
+            cls.statistics['evictions'] += 1
+
+        # copy any mutable values so that our caller can't modify the cache.
+        return { name : __import__('copy').deepcopy(value) if isinstance(value, (list, set, dict)) else value for name, value in res.items() }
+
+    @classmethod
+    def address(cls, ea, repeatable, string):
+        '''Return the tags decoded from `string` which is the comment at the address `ea`.'''
+        return cls.__lookup__(cls.addresses, (ea, bool(repeatable)), string)
+
+    @classmethod
+    def function(cls, ea, repeatable, string):
+        '''Return the tags decoded from `string` which is the comment for the function at address `ea`.'''
+        return cls.__lookup__(cls.functions, (ea, bool(repeatable)), string)
+
+    @classmethod
+    def discard(cls, ea, *repeatable):
+        '''Discard the tags that were decoded from the comment at address `ea` that is `repeatable`, or both comments if `repeatable` is not specified.'''
+        count = len(cls.addresses)
+        [ cls.addresses.pop((ea, bool(item)), None) for item in (repeatable or (False, True)) ]
+        cls.statistics['discards'] += count - len(cls.addresses)
+        return count - len(cls.addresses)
+
+    @classmethod
+    def discard_function(cls, ea, *repeatable):
+        '''Discard the tags that were decoded from the comment for the function at address `ea` that is `repeatable`, or both comments if `repeatable` is not specified.'''
+        count = len(cls.functions)
+        [ cls.functions.pop((ea, bool(item)), None) for item in (repeatable or (False, True)) ]
+        cls.statistics['discards'] += count - len(cls.functions)
+        return count - len(cls.functions)
+
+    @classmethod
+    def resize(cls, capacity):
+        '''Change the maximum number of entries for both addresses and functions to `capacity` and return the previous one.'''
+        res, cls.capacity = cls.capacity, capacity
+        for table in [cls.addresses, cls.functions]:
+            while len(table) > cls.capacity:
+                table.popitem(last=False)
+                cls.statistics['evictions'] += 1
+            continue
+        return res
+
+    @classmethod
+    def reset(cls, *idp_modname):
+        '''Discard all of the entries and statistics for the cache.'''
+        cls.addresses.clear(), cls.functions.clear()
+        cls.statistics.update((key, 0) for key in cls.statistics)
+
+    @classmethod
+    def stats(cls):
+        '''Return a dictionary containing the statistics for the cache.'''
+        res = dict(cls.statistics)
+        res['capacity'], res['addresses'], res['functions'] = cls.capacity, len(cls.addresses), len(cls.functions)
+        total = res['hits'] + res['misses']
+        res['ratio'] = float(res['hits']) / total if total else 0.
+        return res
+
+class cachecodec(object):
+    """
+    This class is used to compress and decompress the values that are
+    stored within the tag cache. Each value that is encoded is prefixed
+    with a header composed of ``cachecodec.magic`` and a byte identifying
+    which codec was used to compress it. This way a value can always be
+    decoded regardless of which codec was selected when it was written.
+    Any value without the header was written before the header existed
+    and is decoded with the "bz2_codec" that was used at the time.
+
+    The available codecs are "raw", "zlib", and "bz2". The compression
+    level can also be specified for the "zlib" and "bz2" codecs.
+    """
+    magic = b'\xa7'
+    identifiers = {'raw': b'r', 'zlib': b'z', 'bz2': b'b'}
+    names = { identifier : name for name, identifier in identifiers.items() }
+    legacy = __import__('codecs').lookup('bz2_codec')
+
+    compress = {
+        'raw': lambda data, level: data,
+        'zlib': lambda data, level: zlib.compress(data, 6 if level is None else level),
+        'bz2': lambda data, level: bz2.compress(data, 9 if level is None else level),
+    }
+    decompress = {
+        'raw': lambda data: data,
+        'zlib': zlib.decompress,
+        'bz2': bz2.decompress,
+    }
+
+    def __init__(self, name, level=None):
+        '''Create a codec that compresses any data it encodes using the codec `name` with the specified `level`.'''
+        cls = self.__class__
+        if name not in cls.identifiers:
+            raise internal.exceptions.InvalidParameterError(u"{:s}({!r}{:s}) : The specified codec ({!r}) is not one of the available codecs ({:s}).".format('.'.join([__name__, cls.__name__]), name, '' if level is None else ", level={:d}".format(level), name, ', '.join(sorted(cls.identifiers))))
+        self.name, self.level = name, None if name == 'raw' else level
+        self.header = cls.magic + cls.identifiers[name]
+
+    def encode(self, data):
+        '''Compress `data` and return it prefixed with a header along with the number of bytes that were consumed.'''
+        res = self.compress[self.name](data, self.level)
+        return self.header + res, len(data)
+
+    def decode(self, data):
+        '''Decompress `data` using the codec in its header and return it along with the number of bytes that were consumed.'''
+        cls = self.__class__
+        if data[:1] != cls.magic:
+            return cls.legacy.decode(data)
+
+        identifier = data[1:2]
+        if identifier not in cls.names:
+            raise internal.exceptions.InvalidFormatError(u"{:s}.decode(...) : The codec identifier ({!r}) in the header is not one of the available codecs ({:s}).".format('.'.join([__name__, cls.__name__]), identifier, ', '.join(sorted(cls.identifiers))))
+        res = cls.decompress[cls.names[identifier]](data[2:])
+        return res, len(data)
+
+    @classmethod
+    def identify(cls, data):
+        '''Return the name of the codec that was used to encode `data`.'''
+        if data[:1] != cls.magic:
+            return 'bz2'
+        return cls.names.get(data[1:2], None)
+
+    def __repr__(self):
+        cls = self.__class__
+        return "<{:s} {!r}{:s}>".format('.'.join([__name__, cls.__name__]), self.name, '' if self.level is None else " level={:d}".format(self.level))
+
+class deferred(object):
+    """
+    This namespace is used to defer the adjustments that are made to the
+    reference counts in the tag cache when a comment is changed. When it
+    is enabled, the adjustment for each tag name is queued for its address
+    and coalesced with any other adjustments to the same address so that
+    only the net adjustment is applied. The pending adjustments are then
+    applied all at once within a ``contents.batch`` so that the contents
+    of each function are only written a single time.
+
+    As the cache is not up to date while adjustments are pending, each of
+    the namespaces that read from or write to the cache are decorated with
+    ``deferred.barrier``. This way any pending adjustments are applied
+    before the cache is accessed, and the cache is always consistent with
+    the comments in the database.
+
+    The pending adjustments are applied by the hooks when the analysis
+    queue is empty or the database is saved, and by a timer every number
+    of milliseconds specified by ``deferred.interval``. To enable or
+    disable deferring the adjustments::
+
+        > internal.comment.deferred.enable(interval=1000)
+        > internal.comment.deferred.disable()
+
+    """
+
+    # (target, address) -> {name : adjustment}
+    __pending__ = {}
+    __timer__ = 'internal.comment.deferred'
+
+    enabled, interval = False, 1000
+
+    @staticmethod
+    def barrier(F):
+        '''Return a wrapper for the callable `F` that applies any pending adjustments before calling it.'''
+        @functools.wraps(F)
+        def wrapper(*args, **kwargs):
+            if deferred.__pending__:
+                deferred.flush()
+            return F(*args, **kwargs)
+        return wrapper
+
+    @classmethod
+    def __apply__(cls, target, address, name, adjustment):
+        '''Apply the `adjustment` for the tag `name` at `address` to the function `target` or the globals if `target` is ``None``.'''
+        ctx, options = (globals, {}) if target is None else (contents, {'target': target})
+        F = ctx.inc if adjustment > 0 else ctx.dec
+        [ F(address, name, **options) for _ in range(abs(adjustment)) ]
+        return abs(adjustment)
+
+    @classmethod
+    def adjust(cls, target, address, name, adjustment):
+        """Adjust the reference count of the tag `name` at `address` by `adjustment` and return the adjustment that is still pending.
+
+        If `target` is ``None``, then the globals are adjusted. Otherwise `target` is the address of the function whose contents are adjusted.
+        """
+        if not cls.enabled:
+            cls.__apply__(target, address, name, adjustment)
+            return 0
+
+        # coalesce the adjustment with the ones already pending for the address.
+        key = target, address
+        res = cls.__pending__.setdefault(key, {})
+        count = res.get(name, 0) + adjustment
+        if count:
+            res[name] = count
+        else:
+            res.pop(name, None)
+
+        if not res:
+            cls.__pending__.pop(key, None)
+        return count
+
+    @classmethod
+    def pending(cls):
+        '''Return the number of addresses that have adjustments pending.'''
+        return len(cls.__pending__)
+
+    @classmethod
+    def flush(cls):
+        '''Apply all of the pending adjustments and return the number of reference counts that were adjusted.'''
+        pending, cls.__pending__ = cls.__pending__, {}
+        if not pending:
+            return 0
+
+        # apply the adjustments in order so that the contents of each function
+        # are loaded and written only once for the entire batch.
+        count, order = 0, lambda item: (item[0][0] is not None, item[0][0] or 0, item[0][1])
+        with contents.batch():
+            for (target, address), adjustments in sorted(pending.items(), key=order):
+                for name, adjustment in adjustments.items():
+                    try:
+                        count += cls.__apply__(target, address, name, adjustment)
+                    except Exception:
+                        logging.warning(u"{:s}.flush() : Unable to adjust the reference count of tag {!s} at {:#x} by {:+d} for the {:s}.".format('.'.join([__name__, cls.__name__]), internal.utils.string.repr(name), address, adjustment, 'globals' if target is None else "contents of function {:#x}".format(target)), exc_info=True)
+                    continue
+                continue
+        return count
+
+    @classmethod
+    def reset(cls, *idp_modname):
+        '''Discard all of the pending adjustments without applying them.'''
+        res, cls.__pending__ = len(cls.__pending__), {}
+        return res
+
+    @classmethod
+    def __tick__(cls):
+        '''Apply the pending adjustments returning the interval until the next tick.'''
+        if not (cls.enabled and cls.interval):
+            return -1
+
+        try:
+            cls.flush()
+        except Exception:
+            logging.warning(u"{:s}.tick() : An exception was raised while applying the pending adjustments to the tag cache.".format('.'.join([__name__, cls.__name__])), exc_info=True)
+        return cls.interval
+
+    @classmethod
+    def enable(cls, interval=None):
+        """Defer the adjustments that are made to the tag cache when a comment is changed.
+
+        If `interval` is non-zero, then also apply the pending adjustments every `interval` milliseconds using a timer.
+        """
+        import ui
+        cls.interval = cls.interval if interval is None else interval
+        res, cls.enabled = cls.enabled, True
+        if cls.interval:
+            ui.timer.register(cls.__timer__, cls.interval, cls.__tick__)
+        return res
+
+    @classmethod
+    def disable(cls):
+        '''Stop deferring the adjustments to the tag cache and apply any that are still pending.'''
+        res, cls.enabled = cls.enabled, False
+        cls.flush()
+        return res
+
+    @classmethod
+    def __nw_flush__(cls, nw_code, is_old_database):
+        return cls.flush()
+
 class tagging(object):
     """
     This namespace is essentially the configuration of the tagging
@@ -617,12 +1029,16 @@ class tagging(object):
     responsible for calling the ``tagging.__init_tagcache__()``
     function. This will then create a netnode with the name
     specified in ``tagging.__node__``.
+
+    The codec that is used to compress any values written to the
+    tag cache is specified by ``tagging.codec``. This can be changed
+    by assigning another ``cachecodec`` to it.
     """
     __node__ = '$ tagcache'
     __tags__, __address__ = 'name', 'address'
 
     marshaller = __import__('marshal')
-    codec = __import__('codecs').lookup('bz2_codec')
+    codec = cachecodec('zlib', 1)
 
     @classmethod
     def __init_tagcache__(cls, idp_modname):
@@ -647,13 +1063,283 @@ class tagging(object):
         # Explicitly try to fetch the netnode containing the tag-cache. If we were
         # unable to find it, then create it and use that instead.
         node = internal.netnode.get(cls.__node__)
-        if node == idaapi.BADADDR:
+        created = node == idaapi.BADADDR
+        if created:
             node = internal.netnode.new(cls.__node__)
 
         # Cache the identifier for the netnode inside a class attribute
         cls.__cache_id__ = node
+
+        # Refresh the netnode for each index. If we just created the tag-cache,
+        # then there's nothing to index and so each index can be used as-is.
+        for index in [globals.index, contents.index, contents.locations]:
+            index.node(cached=False)
+            created and index.initialize()
+        return node
+
+class segmentmap(object):
+    """
+    This class is used to translate an address from the segment that
+    contained it to the segment that it was moved to. Each segment is a
+    tuple of the format `(old, new, size)`. The segments are sorted by
+    their old address so that the segment containing an address can be
+    found using a binary search instead of checking each one of them.
+    """
+
+    def __init__(self, segments):
+        self.segments = sorted((old, new, size) for old, new, size in segments)
+        self.starts = [old for old, _, _ in self.segments]
+
+    def __repr__(self):
+        cls = self.__class__
+        return "<{:s} {:s}>".format('.'.join([__name__, cls.__name__]), ', '.join("{:#x}<>{:#x}->{:#x}".format(old, old + size, new) for old, new, size in self.segments))
+
+    def __call__(self, ea):
+        '''Return the address that `ea` was moved to or ``None`` if it is not within any of the segments.'''
+        index = bisect.bisect_right(self.starts, ea) - 1
+        if index < 0:
+            return None
+        old, new, size = self.segments[index]
+        return ea - old + new if ea < old + size else None
+
+class tagindex(object):
+    """
+    This class is used to maintain an inverted index from each tag name
+    to the addresses that contain it, so that a query for a tag only needs
+    to visit the addresses that actually have it. An instance of this
+    class is attached to both the ``globals`` and ``contents`` namespaces
+    as their ``index`` attribute.
+
+    The index is stored within the netnode named by the instance. The
+    hashval for each tag name contains the identifier of another netnode
+    which holds the tag's postings. The altval for each address in the
+    postings contains the reference count of the tag at that address, and
+    the value of the postings netnode contains the number of addresses.
+
+    As the index did not always exist, it is only used if it was created
+    along with the tag cache or was rebuilt afterwards. The value of the
+    index's netnode is used to determine this.
+    """
+
+    # netnode(name).value = version
+    # netnode(name).hash[tagname] = postings
+    # netnode(postings).alt[ea] = refcount
+    # netnode(postings).value = len(postings.alt)
+
+    version = 1
+
+    def __init__(self, name):
+        self.__node__, self.__cache_id__ = name, None
+
+    def __repr__(self):
+        cls = self.__class__
+        return "<{:s} {!r}>".format('.'.join([__name__, cls.__name__]), self.__node__)
+
+    def node(self, cached=True):
+        '''Fetch the netnode containing the index creating it if necessary.
+
+        If `cached` is changed to False, then always update the node's identifier.
+        '''
+        if cached and self.__cache_id__ is not None:
+            return self.__cache_id__
+
+        node = internal.netnode.get(self.__node__)
+        if node == idaapi.BADADDR:
+            node = internal.netnode.new(self.__node__)
+        self.__cache_id__ = node
         return node
 
+    def ready(self):
+        '''Return whether the index has been built and can be used.'''
+        return internal.netnode.value.get(self.node(), type=int) == self.version
+
+    def initialize(self):
+        '''Erase the index and mark it as being ready to use.'''
+        self.erase()
+        return internal.netnode.value.set(self.node(), self.version)
+
+    def erase(self):
+        '''Erase the index and mark it as unusable until it has been initialized.'''
+        node = self.node()
+        names = [name for name in internal.netnode.hash.fiter(node)]
+        for name in names:
+            postings = internal.netnode.hash.get(node, name, type=int)
+            postings and internal.netnode.remove(postings)
+            internal.netnode.hash.remove(node, name)
+        internal.netnode.value.remove(node)
+        return len(names)
+
+    def postings(self, name, create=False):
+        '''Return the identifier of the netnode containing the postings for the tag `name`.
+
+        If `create` is true, then create the postings if they do not exist.
+        '''
+        node, eName = self.node(), internal.utils.string.to(name)
+        res = internal.netnode.hash.get(node, eName, type=int)
+        if res or not create:
+            return res or None
+
+        # use a counter from the index to give each netnode a unique name.
+        identifier = (internal.netnode.alt.get(node, 0) or 0) + 1
+        internal.netnode.alt.set(node, 0, identifier)
+        res = internal.netnode.new("{:s}.{:d}".format(self.__node__, identifier))
+        internal.netnode.hash.set(node, eName, res)
+        return res
+
+    def __assign__(self, postings, address, name, count, previous):
+        '''Assign the reference count `count` of the tag `name` at `address` to the specified `postings` when it was `previous`.'''
+        if count > 0:
+            internal.netnode.alt.set(postings, address, count)
+        else:
+            internal.netnode.alt.remove(postings, address)
+
+        # if the address was added or removed, then update the number of addresses
+        # in the postings and remove the postings if there aren't any left.
+        if (count > 0) == (previous > 0):
+            return previous
+
+        total = (internal.netnode.value.get(postings, type=int) or 0) + (1 if count > 0 else -1)
+        if total > 0:
+            internal.netnode.value.set(postings, total)
+        else:
+            internal.netnode.remove(postings)
+            internal.netnode.hash.remove(self.node(), internal.utils.string.to(name))
+        return previous
+
+    def set(self, address, name, count):
+        '''Set the reference count of the tag `name` at `address` to `count` and return its previous value.'''
+        postings = self.postings(name, create=count > 0)
+        if postings is None:
+            return 0
+        res = internal.netnode.alt.get(postings, address) or 0
+        return self.__assign__(postings, address, name, count, res)
+
+    def inc(self, address, name):
+        '''Increase the reference count of the tag `name` at `address`.'''
+        postings = self.postings(name, create=True)
+        res = internal.netnode.alt.get(postings, address) or 0
+        self.__assign__(postings, address, name, res + 1, res)
+        return res + 1
+
+    def dec(self, address, name):
+        '''Decrease the reference count of the tag `name` at `address`.'''
+        postings = self.postings(name)
+        if postings is None:
+            return 0
+        res = internal.netnode.alt.get(postings, address) or 0
+        self.__assign__(postings, address, name, res - 1, res)
+        return max(0, res - 1)
+
+    def get(self, address, name):
+        '''Return the reference count of the tag `name` at `address`.'''
+        postings = self.postings(name)
+        return (internal.netnode.alt.get(postings, address) or 0) if postings else 0
+
+    @deferred.barrier
+    def count(self, name):
+        '''Return the number of addresses that contain the tag `name`.'''
+        postings = self.postings(name)
+        return (internal.netnode.value.get(postings, type=int) or 0) if postings else 0
+
+    @deferred.barrier
+    def name(self):
+        '''Return all of the tag names (``set``) within the index.'''
+        return { internal.utils.string.of(name) for name in internal.netnode.hash.fiter(self.node()) }
+
+    @deferred.barrier
+    def address(self, name):
+        '''Return all of the addresses (``sorted``) that contain the tag `name`.'''
+        postings = self.postings(name)
+        return [ea for ea, _ in internal.netnode.alt.fiter(postings)] if postings else []
+
+    @deferred.barrier
+    def range(self, start, stop):
+        '''Yield the address, name, and reference count of each tag in the index from `start` up to `stop`.'''
+        node = self.node()
+        for name in [name for name in internal.netnode.hash.fiter(node)]:
+            postings = internal.netnode.hash.get(node, name, type=int)
+            for ea, refs in internal.netnode.alt.range(postings, start, stop):
+                yield ea, internal.utils.string.of(name), refs
+            continue
+        return
+
+    @deferred.barrier
+    def iterate(self, name, ea, reverse=False, inclusive=False):
+        """Yield each address (in order) after `ea` that contains the tag `name`.
+
+        If `reverse` is true, then yield each address before `ea` in reverse order.
+        If `inclusive` is true, then also yield `ea` if it contains the tag.
+        """
+        postings = self.postings(name)
+        if postings is None:
+            return
+
+        step = internal.netnode.alt.prev if reverse else internal.netnode.alt.next
+        res = ea if inclusive and internal.netnode.alt.get(postings, ea) else step(postings, ea)
+        while res is not None:
+            yield res
+            res = step(postings, res)
+        return
+
+    @staticmethod
+    def merge(iterables, reverse=False):
+        '''Merge the ordered addresses from each of the `iterables` into a single ordering without any duplicates.'''
+        merged = heapq.merge(*[(-ea for ea in iterable) for iterable in iterables]) if reverse else heapq.merge(*iterables)
+        previous = None
+        for item in merged:
+            ea = -item if reverse else item
+            if ea != previous:
+                yield ea
+            previous = ea
+        return
+
+    @deferred.barrier
+    def select(self, And=(), Or=()):
+        """Return the addresses (``sorted``) that contain all of the tag names in `And` or any of the tag names in `Or`.
+
+        The tag names in `And` are intersected in order of the number of
+        addresses that contain them, so that each intersection is made
+        against the smallest set of addresses that is possible.
+        """
+        res = { ea for name in Or for ea in self.address(name) }
+
+        # if nothing was required, then we only needed to check the `Or` tags.
+        if not And:
+            return sorted(res)
+
+        # start with the tag that has the fewest addresses. for each one that
+        # follows, check the candidates directly if there's fewer of them than
+        # addresses in the postings. otherwise, intersect it with the postings.
+        ordered = sorted(And, key=self.count)
+        candidates = { ea for ea in self.address(ordered[0]) }
+        for name in ordered[1:]:
+            if not candidates:
+                break
+            postings = self.postings(name)
+            if postings is None:
+                candidates = set()
+            elif len(candidates) < self.count(name):
+                candidates = { ea for ea in candidates if internal.netnode.alt.get(postings, ea) }
+            else:
+                candidates &= { ea for ea in self.address(name) }
+            continue
+        return sorted(res | candidates)
+
+    def relocate(self, segments):
+        """Move the addresses for each `(old, new, size)` in `segments` to their new location.
+
+        All of the addresses are removed before any of them are added, so
+        that a segment being moved on top of another one is handled.
+        """
+        node, count = self.node(), 0
+        for name in [name for name in internal.netnode.hash.fiter(node)]:
+            postings = internal.netnode.hash.get(node, name, type=int)
+            moved = [(ea, ea - old + new, refs) for old, new, size in segments for ea, refs in internal.netnode.alt.range(postings, old, old + size)]
+            [ internal.netnode.alt.remove(postings, ea) for ea, _, _ in moved ]
+            [ internal.netnode.alt.set(postings, ea, refs) for _, ea, refs in moved ]
+            count += len(moved)
+        return count
+
 class contents(tagging):
     '''Tagging for an address within a function (contents)'''
     """
@@ -676,15 +1362,55 @@ class contents(tagging):
     names within the contents of the function correspond with the
     reference count that is stored within the marshall'd dictionary
     in the blob.
+
+    If the number of addresses within a function becomes larger than the
+    `contents.threshold`, then they are split into shards that each contain
+    the addresses within an aligned range of ``2 ** contents.shift`` bytes.
+    Each shard is stored as a blob within a separate netnode for the function
+    at the offset of its range, and the blob for the function only keeps the
+    offset of each shard. This way a change to the reference count of a single
+    address only needs to rewrite the blob of the shard that contains it.
+
+    The functions that contain each tag name are kept in the ``tagindex``
+    that is stored as `contents.index`. The addresses within each function
+    that contain each tag name are kept in the ``tagindex`` that is stored
+    as `contents.locations`. As the order of the addresses are preserved
+    by the index, it can be used to find the next or previous tag without
+    having to decode the contents of every single function.
     """
 
     ## for each function's content
     # netnode.blob[fn.start_ea, btag] = marshal.dumps({'name', 'address'})
     # netnode.sup[fn.start_ea] = marshal.dumps({tagnames})
 
+    ## for each function's content that has been sharded
+    # netnode.blob[fn.start_ea, btag] = marshal.dumps({'name', 'shards'})
+    # netnode("$ tagcache {:#x}".format(fn.start_ea)).blob[base, btag] = marshal.dumps({address})
+
     #btag = idaapi.stag         # XXX: apparently 'S' is used for comments
     btag = idaapi.atag
 
+    # the addresses are split into shards of 2**shift bytes once there are
+    # more than the threshold of them.
+    __shards__ = 'shards'
+    shift, threshold = 12, 0x400
+
+    # inverted index of the functions containing each tag name
+    index = tagindex('$ tagindex contents')
+
+    # inverted index of the addresses containing each tag name
+    locations = tagindex('$ tagindex contents addresses')
+
+    # state used by a batch. each nesting level of a batch gets its own
+    # dictionary of the states that need to be restored if it is aborted.
+    # the tag names for each function when it was loaded are also kept
+    # so that the index can be updated when the batch is written. as the
+    # locations are updated immediately, each level also keeps a journal
+    # of the previous reference counts (and the function that they belong
+    # to) so that they can be restored.
+    __transactions__, __journal__ = [], []
+    __pending__, __dirty__, __loaded__ = {}, set(), {}
+
     @classmethod
     def _key(cls, ea):
         '''Converts the address `ea` to a key that's used to store contents data for the specified function.'''
@@ -692,6 +1418,84 @@ class contents(tagging):
         return internal.interface.range.start(res) if res else None
 
     @classmethod
+    def __touch__(cls, key):
+        '''Record the pending state for the function `key` so that the current level of the batch can restore it.'''
+        undo, pending = cls.__transactions__[-1], cls.__pending__
+        if key not in undo:
+            state = pending.get(key, None)
+            undo[key] = None if state is None else { item : dict(value) if isinstance(value, dict) else value for item, value in state.items() }
+        return
+
+    @classmethod
+    @contextlib.contextmanager
+    def batch(cls):
+        """Defer any updates to the contents tag cache until the outermost batch is exited.
+
+        Within a batch, the state for each function that is modified is kept in
+        memory so that the reference counts of any number of tags can be adjusted
+        without decoding and re-encoding the blob for every single one. When the
+        outermost batch exits, the blob and header for each modified function is
+        written exactly once. If an exception is raised within a batch, then the
+        state of every function modified within that batch is restored and the
+        exception is re-raised. Only the tag cache is restored, so any comments
+        that were written during the batch are left as they are.
+        """
+        cls.__transactions__.append({}), cls.__journal__.append([])
+        try:
+            yield cls
+
+        # restore everything that was touched at our level of the batch.
+        except:
+            undo, pending, dirty = cls.__transactions__.pop(), cls.__pending__, cls.__dirty__
+            [ cls.locations.set(address, name, count) for _, address, name, count in reversed(cls.__journal__.pop()) ]
+            for key, state in undo.items():
+                if state is None:
+                    pending.pop(key, None), dirty.discard(key), cls.__loaded__.pop(key, None)
+                else:
+                    pending[key] = state
+                continue
+
+            # if we were the outermost batch, then there's nothing left to keep.
+            if not cls.__transactions__:
+                pending.clear(), dirty.clear(), cls.__loaded__.clear()
+            raise
+
+        # if we're still nested within another batch, then hand off whatever
+        # we touched to it so that it can be restored if the parent is aborted.
+        undo = cls.__transactions__.pop()
+        if cls.__transactions__:
+            parent, journal = cls.__transactions__[-1], cls.__journal__.pop()
+            [ parent.setdefault(key, state) for key, state in undo.items() ]
+            cls.__journal__[-1].extend(journal)
+            return
+
+        # otherwise we're the outermost batch and we need to flush everything.
+        # the journal is kept until everything has been written so that the
+        # locations for any function that we failed to write can be restored.
+        pending, dirty, loaded, failed = cls.__pending__, cls.__dirty__, cls.__loaded__, []
+        try:
+            for key in sorted(dirty):
+                try:
+                    cls._write(key, key, pending[key])
+                except Exception as E:
+                    logging.warning(u"{:s}.batch() : An exception {!r} was raised while trying to write the contents for the function with key {:#x}.".format('.'.join([__name__, cls.__name__]), E, key), exc_info=True)
+                    failed.append(key)
+                    continue
+
+                # update the index with any tag names that were changed.
+                names, previous = (pending[key] or {}).get(cls.__tags__, {}), loaded.get(key, {})
+                [ cls.index.set(key, name, names.get(name, 0)) for name in set(names) | set(previous) if names.get(name, 0) != previous.get(name, 0) ]
+        finally:
+            journal = cls.__journal__.pop()
+            [ cls.locations.set(address, name, count) for key, address, name, count in reversed(journal) if key in failed ]
+            pending.clear(), dirty.clear(), loaded.clear()
+
+        if failed:
+            raise internal.exceptions.ReadOrWriteError(u"{:s}.batch() : Unable to write the contents for {:d} function{:s} ({:s}).".format('.'.join([__name__, cls.__name__]), len(failed), '' if len(failed) == 1 else 's', ', '.join(map("{:#x}".format, failed))))
+        return
+
+    @classmethod
+    @deferred.barrier
     def _read_header(cls, target, ea):
         """Read the contents dictionary out of the supval belonging to the function at `target`.
 
@@ -701,6 +1505,11 @@ class contents(tagging):
         if key is None:
             raise internal.exceptions.FunctionNotFoundError(u"{:s}._read_header({!r}, {:#x}) : Unable to locate a function for target ({!r}) at {:#x}.".format('.'.join([__name__, cls.__name__]), target, ea, key, ea))
 
+        # if we're in a batch and the function has been modified, then use its pending state.
+        if key in cls.__pending__:
+            state = cls.__pending__[key]
+            return {item for item in state.keys()} if state else None
+
         view = internal.netnode.sup.get(node, key, type=memoryview)
         if view is None:
             return None
@@ -761,6 +1570,7 @@ class contents(tagging):
         return bool(ok)
 
     @classmethod
+    @deferred.barrier
     def _read(cls, target, ea):
         """Reads the value from the contents supval for the specific `target`.
 
@@ -770,6 +1580,18 @@ class contents(tagging):
         if key is None:
             raise internal.exceptions.FunctionNotFoundError(u"{:s}._read({!r}, {:#x}) : Unable to determine the key for the target ({!r}) at {:#x}.".format('.'.join([__name__, cls.__name__]), target, ea, target, ea))
 
+        # if we're in a batch, then return the state from memory (loading it if necessary).
+        if cls.__transactions__:
+            if key not in cls.__pending__:
+                cls.__pending__[key] = state = cls.__load__(target, ea, key) or {}
+                cls.__loaded__[key] = dict(state.get(cls.__tags__, {}))
+            cls.__touch__(key)
+            return cls.__pending__[key]
+        return cls.__load__(target, ea, key)
+
+    @classmethod
+    def __load__(cls, target, ea, key):
+        '''Read and decode the contents from the blob for the function `key` that was resolved from `target` or `ea`.'''
         encdata = internal.netnode.blob.get(key, cls.btag)
         if encdata is None:
             return None
@@ -790,9 +1612,143 @@ class contents(tagging):
         except Exception as E:
             logging.info(u"{:s}._read({!r}, {:#x}) : Error while unmarshalling the following data from the blob cache: {!r}.".format('.'.join([__name__, cls.__name__]), target, ea, data))
             raise internal.exceptions.SerializationError(u"{:s}._read({!r}, {:#x}) : Unable to unmarshal the contents for address {:#x} from the blob cache ({!s}) associated with key {:#x}.".format('.'.join([__name__, cls.__name__]), target, ea, ea, cls.btag, key))
+
+        # if the addresses were split into shards, then merge them back together.
+        bases = result.pop(cls.__shards__, None)
+        if bases:
+            node, addresses = cls.__shardnode__(key), {}
+            [ addresses.update(cls.__unpack__(node, base, key) or {}) for base in sorted(bases) if node is not None ]
+            result[cls.__address__] = addresses
         return result
 
     @classmethod
+    def __shardnode__(cls, key, create=False):
+        '''Return the netnode containing the shards for the function `key` or ``None`` if there isn't one and `create` is false.'''
+        name = "{:s} {:#x}".format(tagging.__node__, key)
+        res = internal.netnode.get(name)
+        if res == idaapi.BADADDR:
+            return internal.netnode.new(name) if create else None
+        return res
+
+    @classmethod
+    def __shard__(cls, ea):
+        '''Return the base address of the shard that contains the address `ea`.'''
+        return ea & ~((1 << cls.shift) - 1)
+
+    @classmethod
+    def __blobs__(cls, key):
+        '''Yield the netnode and offset of each blob that is used to store the contents of the function `key`.'''
+        yield key, 0
+        node = cls.__shardnode__(key)
+        if node is None:
+            return
+        for base in sorted((cls.__unpack__(key, 0, key) or {}).get(cls.__shards__, ())):
+            yield node, base
+        return
+
+    @classmethod
+    def __unpack__(cls, node, start, key):
+        '''Decode the blob at the offset `start` of the netnode `node` that is used to store the contents of the function `key`.'''
+        encdata = internal.netnode.blob.get(node, cls.btag, start)
+        if encdata is None:
+            return None
+
+        try:
+            data, sz = cls.codec.decode(encdata)
+            if len(encdata) != sz:
+                raise internal.exceptions.SizeMismatchError(u"{:s}.unpack({:#x}, {:#x}, {:#x}) : The number of bytes that was decoded did not match the expected size ({:#x}<>{:#x}).".format('.'.join([__name__, cls.__name__]), node, start, key, sz, len(encdata)))
+            return cls.marshaller.loads(data)
+
+        except Exception as E:
+            logging.warning(u"{:s}.unpack({:#x}, {:#x}, {:#x}) : An exception {!r} was raised while trying to decode the blob ({!s}) at offset {:#x} of the netnode {:#x} for the contents associated with key {:#x}.".format('.'.join([__name__, cls.__name__]), node, start, key, E, cls.btag, start, node, key), exc_info=True)
+        raise internal.exceptions.SerializationError(u"{:s}.unpack({:#x}, {:#x}, {:#x}) : Unable to decode the blob ({!s}) at offset {:#x} of the netnode {:#x} for the contents associated with key {:#x}.".format('.'.join([__name__, cls.__name__]), node, start, key, cls.btag, start, node, key))
+
+    @classmethod
+    def __pack__(cls, node, start, key, value):
+        '''Encode `value` into the blob at the offset `start` of the netnode `node` for the function `key` returning whether it was different and needed to be written.'''
+        try:
+            encdata, sz = cls.codec.encode(cls.marshaller.dumps(value))
+
+        except Exception as E:
+            logging.warning(u"{:s}.pack({:#x}, {:#x}, {:#x}, {!s}) : An exception {!r} was raised while trying to encode the blob ({!s}) at offset {:#x} of the netnode {:#x} for the contents associated with key {:#x}.".format('.'.join([__name__, cls.__name__]), node, start, key, internal.utils.string.repr(value), E, cls.btag, start, node, key), exc_info=True)
+            raise internal.exceptions.SerializationError(u"{:s}.pack({:#x}, {:#x}, {:#x}, {!s}) : Unable to encode the blob ({!s}) at offset {:#x} of the netnode {:#x} for the contents associated with key {:#x}.".format('.'.join([__name__, cls.__name__]), node, start, key, internal.utils.string.repr(value), cls.btag, start, node, key))
+
+        if encdata == internal.netnode.blob.get(node, cls.btag, start):
+            return False
+
+        elif not internal.netnode.blob.set(node, cls.btag, encdata, start):
+            raise internal.exceptions.DisassemblerError(u"{:s}.pack({:#x}, {:#x}, {:#x}, {!s}) : Unable to write the blob ({!s}) at offset {:#x} of the netnode {:#x} for the contents associated with key {:#x}.".format('.'.join([__name__, cls.__name__]), node, start, key, internal.utils.string.repr(value), cls.btag, start, node, key))
+        return True
+
+    @classmethod
+    def __split__(cls, key, value):
+        """Write the addresses from `value` for the function `key` into their shards if there are too many of them.
+
+        Only the shards that were changed are written. Return what should be stored in the blob for the function.
+        """
+        addresses = value.get(cls.__address__, {})
+        node = cls.__shardnode__(key, create=len(addresses) > cls.threshold)
+        if node is None:
+            return value
+
+        shards = {}
+        if len(addresses) > cls.threshold:
+            [ shards.setdefault(cls.__shard__(ea), {}).__setitem__(ea, count) for ea, count in addresses.items() ]
+
+        # write each of the shards and remove any of them that are now empty.
+        previous = (cls.__unpack__(key, 0, key) or {}).get(cls.__shards__, ())
+        [ cls.__pack__(node, base, key, items) for base, items in shards.items() ]
+        [ internal.netnode.blob.remove(node, cls.btag, base) for base in previous if base not in shards ]
+
+        # if there aren't any shards, then the addresses fit in the blob again.
+        if not shards:
+            internal.netnode.remove(node)
+            return value
+
+        res = { item : items for item, items in value.items() if item != cls.__address__ }
+        res[cls.__shards__] = {base for base in shards}
+        return res
+
+    @classmethod
+    def __adjust__(cls, key, address, name, adjustment):
+        """Adjust the reference count of the tag `name` at `address` within the sharded function `key` by `adjustment`.
+
+        Only the blob for the function and the shard containing `address` are read and written.
+        Return the new reference count for `name` or ``None`` if the addresses for the function are not sharded.
+        """
+        node = None if key is None else cls.__shardnode__(key)
+        if node is None:
+            return None
+
+        res, base = cls.__unpack__(key, 0, key) or {}, cls.__shard__(address)
+        names, bases = res.get(cls.__tags__, {}), res.get(cls.__shards__, set())
+        shard = (cls.__unpack__(node, base, key) or {}) if base in bases else {}
+
+        refs, count = names.pop(name, 0) + adjustment, shard.pop(address, 0) + adjustment
+        if refs > 0:
+            names[name] = refs
+        if count > 0:
+            shard[address] = count
+
+        # write the shard (or remove it if it's empty) followed by the function.
+        if shard:
+            cls.__pack__(node, base, key, shard), bases.add(base)
+        elif base in bases:
+            internal.netnode.blob.remove(node, cls.btag, base), bases.discard(base)
+
+        if not bases:
+            internal.netnode.remove(node)
+            cls._write(key, address, {cls.__tags__ : names} if names else None)
+            return refs
+
+        header = {item for item, items in [(cls.__tags__, names), (cls.__address__, bases)] if items}
+        cls.__pack__(key, 0, key, {item : items for item, items in [(cls.__tags__, names), (cls.__shards__, bases)] if items})
+        if header != {item for item, items in [(cls.__tags__, res.get(cls.__tags__)), (cls.__address__, res.get(cls.__shards__))] if items}:
+            cls._write_header(key, address, header)
+        return refs
+
+    @classmethod
+    @deferred.barrier
     def _write(cls, target, ea, value):
         """Writes a `value` to the contents supval for the specific `target`.
 
@@ -803,6 +1759,13 @@ class contents(tagging):
         if key is None:
             raise internal.exceptions.FunctionNotFoundError(u"{:s}._write({!r}, {:#x}, {!r}) : Unable to determine the key for target ({!r}) at {:#x}.".format('.'.join([__name__, cls.__name__]), target, ea, value, target, ea))
 
+        # if we're in a batch, then update the state in memory to be written later.
+        if cls.__transactions__:
+            cls.__touch__(key)
+            cls.__pending__[key] = value or {}
+            cls.__dirty__.add(key)
+            return True
+
         # erase cache and blob if no data is specified
         if not value:
             try:
@@ -811,13 +1774,15 @@ class contents(tagging):
                     logging.debug(u"{:s}._write({!r}, {:#x}, {!s}) : Unable to remove the address {:#x} from the cache header associated with the key {:#x}.".format('.'.join([__name__, cls.__name__]), target, ea, internal.utils.string.repr(value), ea, key))
 
             finally:
+                node = cls.__shardnode__(key)
+                node is None or internal.netnode.remove(node)
                 count = internal.netnode.blob.remove(key, cls.btag)
                 logging.debug(u"{:s}._write({!r}, {:#x}, {!s}) : Removed {:d} blob{:s} ({!s}) associated with the key {:#x}.".format('.'.join([__name__, cls.__name__]), target, ea, internal.utils.string.repr(value), count, '' if count == 1 else 's', cls.btag, key))
 
             return True
 
-        # update blob for given address
-        res = value
+        # update blob for given address after moving its addresses into shards
+        res = cls.__split__(key, value)
         try:
             data = cls.marshaller.dumps(res)
 
@@ -849,9 +1814,26 @@ class contents(tagging):
         return ok
 
     @classmethod
+    @deferred.barrier
     def iterate(cls):
         '''Yield each address and names for all of the contents tags in the database according to what is written into the tagging supval.'''
-        node = tagging.node()
+        node, pending = tagging.node(), cls.__pending__
+
+        # if we're in a batch with pending changes, then merge them with what's in the supval.
+        if pending:
+            res = { ea : names for ea, names in cls.__iterate__(node) if ea not in pending }
+            res.update({ ea : {item for item in state.keys()} for ea, state in pending.items() if state })
+            for ea in sorted(res):
+                yield ea, res[ea]
+            return
+
+        for ea, names in cls.__iterate__(node):
+            yield ea, names
+        return
+
+    @classmethod
+    def __iterate__(cls, node):
+        '''Yield each address and names that are written into the supval of the specified `node`.'''
         for ea in internal.netnode.sup.fiter(node):
             view = internal.netnode.sup.get(node, ea, type=memoryview)
             encdata = view.tobytes()
@@ -863,54 +1845,86 @@ class contents(tagging):
         return
 
     @classmethod
+    @deferred.barrier
     def inc(cls, address, name, **target):
         """Increase the ref count for the given `address` and `name` belonging to the function `target`.
 
         If `target` is undefined or ``None`` then use `address` to locate the function.
         """
         key = target.get('target', None)
-        res = cls._read(key, address) or {}
-        state, cache = res.get(cls.__tags__, {}), res.get(cls.__address__, {})
+        function = cls._key(address) if key is None else key
+
+        # if the addresses of the function are sharded, then only its shard needs updating.
+        refs = None if cls.__transactions__ else cls.__adjust__(function, address, name, +1)
+        if refs is None:
+            res = cls._read(key, address) or {}
+            state, cache = res.get(cls.__tags__, {}), res.get(cls.__address__, {})
 
-        state[name] = refs = state.get(name, 0) + 1
-        cache[address] = cache.get(address, 0) + 1
+            state[name] = refs = state.get(name, 0) + 1
+            cache[address] = cache.get(address, 0) + 1
 
-        if state: res[cls.__tags__] = state
-        else: del res[cls.__tags__]
+            if state: res[cls.__tags__] = state
+            else: del res[cls.__tags__]
 
-        if cache: res[cls.__address__] = cache
-        else: del res[cls.__address__]
+            if cache: res[cls.__address__] = cache
+            else: del res[cls.__address__]
 
-        cls._write(key, address, res)
+            cls._write(key, address, res)
+        cls.__locate__(function, address, name, +1)
+
+        # if we're not in a batch, then the index can be updated immediately.
+        if not cls.__transactions__:
+            cls.index.set(function, name, refs)
         return refs
 
     @classmethod
+    @deferred.barrier
     def dec(cls, address, name, **target):
         """Decreate the ref count for the given `address` and `name` belonging to the function `target`.
 
         If `target` is undefined or ``None`` then use `address` to locate the function.
         """
         key = target.get('target', None)
-        res = cls._read(key, address) or {}
-        state, cache = res.get(cls.__tags__, {}), res.get(cls.__address__, {})
+        function = cls._key(address) if key is None else key
 
-        refs, count = state.pop(name, 0) - 1, cache.pop(address, 0) - 1
-        if refs > 0:
-            state[name] = refs
+        # if the addresses of the function are sharded, then only its shard needs updating.
+        refs = None if cls.__transactions__ else cls.__adjust__(function, address, name, -1)
+        if refs is None:
+            res = cls._read(key, address) or {}
+            state, cache = res.get(cls.__tags__, {}), res.get(cls.__address__, {})
 
-        if count > 0:
-            cache[address] = count
+            refs, count = state.pop(name, 0) - 1, cache.pop(address, 0) - 1
+            if refs > 0:
+                state[name] = refs
+
+            if count > 0:
+                cache[address] = count
+
+            if state: res[cls.__tags__] = state
+            else: res.pop(cls.__tags__, None)
 
-        if state: res[cls.__tags__] = state
-        else: res.pop(cls.__tags__, None)
+            if cache: res[cls.__address__] = cache
+            else: res.pop(cls.__address__, None)
 
-        if cache: res[cls.__address__] = cache
-        else: res.pop(cls.__address__, None)
+            cls._write(key, address, res)
+        cls.__locate__(function, address, name, -1)
 
-        cls._write(key, address, res)
+        # if we're not in a batch, then the index can be updated immediately.
+        if not cls.__transactions__:
+            cls.index.set(function, name, max(0, refs))
         return refs
 
     @classmethod
+    def __locate__(cls, function, address, name, adjustment):
+        '''Adjust the reference count of the tag `name` at `address` within the locations by `adjustment` journaling it for `function` if we're in a batch.'''
+        res = cls.locations.get(address, name)
+        cls.locations.set(address, name, max(0, res + adjustment))
+        if cls.__journal__:
+            cls.__journal__[-1].append((function, address, name, res))
+        return res
+
+    @classmethod
+    @deferred.barrier
     def name(cls, address, **target):
         """Return all the tag names (``set``) for the contents of the function `target`.
 
@@ -922,6 +1936,7 @@ class contents(tagging):
         return {item for item in res.keys()}
 
     @classmethod
+    @deferred.barrier
     def address(cls, address, **target):
         """Return all the addresses (``sorted``) with tags in the contents for the function `target`.
 
@@ -933,6 +1948,7 @@ class contents(tagging):
         return sorted(res.keys())
 
     @classmethod
+    @deferred.barrier
     def set_name(cls, address, name, count, **target):
         """Set the contents tag count for the function `target` and `name` to `count`.
 
@@ -955,12 +1971,15 @@ class contents(tagging):
         try:
             ok = cls._write(key, address, state)
             if ok:
+                if not cls.__transactions__:
+                    cls.index.set(cls._key(address) if key is None else key, name, max(0, count))
                 return state
         except Exception as E:
             logging.warning(u"{:s}.set_name({:#x}, {!r}, {:d}{:s}) : An exception {!r} was raised while trying to update the name cache for address {:#x}.".format('.'.join([__name__, cls.__name__]), address, name, count, ', {:s}'.format(internal.utils.string.kwargs(target)) if target else '', E, address), exc_info=True)
         raise internal.exceptions.ReadOrWriteError(u"{:s}.set_name({:#x}, {!r}, {:d}{:s}) : Unable to update the name cache for address {:#x}.".format('.'.join([__name__, cls.__name__]), address, name, count, ', {:s}'.format(internal.utils.string.kwargs(target)) if target else '', address))
 
     @classmethod
+    @deferred.barrier
     def set_address(cls, address, count, **target):
         """Set the contents tag count for the function `target` and `address` to `count`.
 
@@ -998,14 +2017,19 @@ class globals(tagging):
     `tagging.node()`. The refcount for each address containing a
     tag is stored in an altval keyed by the address. The refcount
     for each tag name is stored in a hashval keyed by the tags
-    name.
+    name. The addresses that contain each tag name are kept in the
+    ``tagindex`` that is stored as `globals.index`.
     """
 
     ## FIXME: for each global/function
     # netnode.alt[address] = refcount
     # netnode.hash[name] = refcount
 
+    # inverted index of the addresses containing each tag name
+    index = tagindex('$ tagindex globals')
+
     @classmethod
+    @deferred.barrier
     def inc(cls, address, name):
         '''Increase the global tag count for the given `address` and `name`.'''
         node, eName = tagging.node(), internal.utils.string.to(name)
@@ -1015,10 +2039,12 @@ class globals(tagging):
 
         internal.netnode.hash.set(node, eName, cName)
         internal.netnode.alt.set(node, address, cAddress)
+        cls.index.inc(address, name)
 
         return cName
 
     @classmethod
+    @deferred.barrier
     def dec(cls, address, name):
         '''Decrease the global tag count for the given `address` and `name`.'''
         node, eName = tagging.node(), internal.utils.string.to(name)
@@ -1035,21 +2061,25 @@ class globals(tagging):
             internal.netnode.alt.remove(node, address)
         else:
             internal.netnode.alt.set(node, address, cAddress)
+        cls.index.dec(address, name)
 
         return cName
 
     @classmethod
+    @deferred.barrier
     def name(cls):
         '''Return all the tag names (``set``) in the specified database (globals and func-tags)'''
         node = tagging.node()
         return { internal.utils.string.of(name) for name in internal.netnode.hash.fiter(node) }
 
     @classmethod
+    @deferred.barrier
     def address(cls):
         '''Return all the tag addresses (``sorted``) in the specified database (globals and func-tags)'''
         return sorted(ea for ea, _ in internal.netnode.alt.fiter(tagging.node()))
 
     @classmethod
+    @deferred.barrier
     def set_name(cls, name, count):
         '''Set the global tag count for `name` in the database to `count`.'''
         node, eName = tagging.node(), internal.utils.string.to(name)
@@ -1058,9 +2088,55 @@ class globals(tagging):
         return res
 
     @classmethod
+    @deferred.barrier
     def set_address(cls, address, count):
         '''Set the global tag count for `address` in the database to `count`.'''
         node = tagging.node()
         res = internal.netnode.alt.get(node, address)
         internal.netnode.alt.set(node, address, count)
         return res
+
+class addresses(object):
+    """
+    This namespace is used to find the addresses that contain tags in the
+    order that they appear within the database. It does this by combining
+    the index for the globals (`globals.index`) with the index for the
+    addresses within the contents of each function (`contents.locations`).
+    As each of these indices keep their addresses in order, the next or
+    previous address with a tag can be found without having to visit each
+    of the addresses that are in between.
+    """
+
+    @classmethod
+    def indices(cls):
+        '''Return each of the indices that are used to locate the addresses containing a tag.'''
+        return [globals.index, contents.locations]
+
+    @classmethod
+    def ready(cls):
+        '''Return whether all of the indices have been built and can be used.'''
+        return all(index.ready() for index in cls.indices())
+
+    @classmethod
+    def iterate(cls, ea, *names, **options):
+        """Yield each address after `ea` (in order) that contains any of the tags in `names`.
+
+        If no `names` are given, then yield each address that contains any tag.
+        If `reverse` is true, then yield each address before `ea` in reverse order.
+        If `inclusive` is true, then also yield `ea` if it contains any of the tags.
+        """
+        backwards = options.get('reverse', False)
+        iterables = [index.iterate(name, ea, reverse=backwards, inclusive=options.get('inclusive', False)) for index in cls.indices() for name in (names or index.name())]
+        return tagindex.merge(iterables, reverse=backwards)
+
+    @classmethod
+    def range(cls, start, stop, *names):
+        """Yield each address from `start` up to `stop` (in order) that contains any of the tags in `names`.
+
+        If no `names` are given, then yield each address that contains any tag.
+        """
+        for ea in cls.iterate(start, *names, inclusive=True):
+            if ea >= stop:
+                break
+            yield ea
+        return
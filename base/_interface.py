@@ -240,10 +240,25 @@ class prioritybase(object):
     CONTINUE = type('continue', (result,), {})()
     STOP = type('stop', (result,), {})()
 
+    # the function used to measure the time spent by each callable
+    timer = staticmethod(__import__('timeit').default_timer)
+
     def __init__(self):
         self.__cache__ = collections.defaultdict(list)
         self.__disabled = {item for item in []}
         self.__traceback = {}
+        self.__chain = {}
+        self.__statistics = None
+        self.__recorder = None
+
+    def __compile(self, target):
+        '''Compile the ordered chain of callables that is dispatched for the specified `target`.'''
+        if target in self.__cache__ and target not in self.__disabled:
+            hookq = self.__cache__[target][:]
+            self.__chain[target] = tuple(heapq.nsmallest(len(hookq), hookq))
+        else:
+            self.__chain.pop(target, ())
+        return self.__chain.get(target, ())
 
     def __iter__(self):
         '''Return the id of each target that is hooked by this object.'''
@@ -298,6 +313,7 @@ class prioritybase(object):
             logging.fatal(u"{:s}.enable({!r}) : The requested {:s} is not disabled. Currently disabled hooks are: {:s}.".format('.'.join([__name__, cls.__name__]), target, self.__formatter__(target), "{{{:s}}}".format(', '.join(map("{!r}".format, self.__disabled)))))
             return False
         self.__disabled.discard(target)
+        self.__compile(target)
         return True
 
     def disable(self, target):
@@ -310,6 +326,7 @@ class prioritybase(object):
             logging.warning(u"{:s}.disable({!r}) : {:s} has already been disabled. Currently disabled hooks are: {:s}.".format('.'.join([__name__, cls.__name__]), target, self.__formatter__(target).capitalize(), "{{{:s}}}".format(', '.join(map("{!r}".format, self.__disabled)))))
             return False
         self.__disabled.add(target)
+        self.__compile(target)
         return True
 
     def add(self, target, callable, priority):
@@ -326,6 +343,7 @@ class prioritybase(object):
         # add the callable to our priority queue
         res = self.__cache__[target]
         heapq.heappush(self.__cache__[target], (priority, callable))
+        self.__compile(target)
 
         # preserve a backtrace so we can track where our callable is at
         self.__traceback[(target, callable)] = traceback.extract_stack()[:-1]
@@ -362,27 +380,144 @@ class prioritybase(object):
         else:
             self.__cache__.pop(target, [])
 
+        # Now we can recompile the chain that gets dispatched for the target.
+        self.__compile(target)
         return True if found else False
 
+    def profile(self, *enable):
+        '''Return whether statistics are being collected for the callables that are dispatched.'''
+        if not enable:
+            return self.__statistics is not None
+        enabled, = enable
+
+        # If we're being asked to collect statistics, then we only need to
+        # allocate our tables if they don't exist.
+        ok = self.__statistics is not None
+        if enabled and not ok:
+            record = lambda: [0, 0., 0., 0]
+            self.__statistics = collections.defaultdict(record), collections.defaultdict(record)
+
+        # Otherwise we're being disabled and so we can just discard them.
+        elif not enabled:
+            self.__statistics = None
+        return ok
+
+    def reset(self):
+        '''Reset any statistics that have been collected for the callables that are dispatched.'''
+        if self.__statistics is None:
+            return False
+        [ table.clear() for table in self.__statistics ]
+        return True
+
+    def statistics(self, *target):
+        '''Return a dictionary containing the `(count, total, maximum, exceptions)` of each target, or of each callable for the specified `target`.'''
+        if self.__statistics is None:
+            return {}
+        targets, callables = self.__statistics
+        if not target:
+            return { item : tuple(record) for item, record in targets.items() }
+        target, = target
+        return { F : tuple(record) for (item, F), record in callables.items() if item == target }
+
+    def record(self, *recorder):
+        '''Return the callable that is given the target and parameters of each event before it is dispatched, or set it to `recorder`.'''
+        if not recorder:
+            return self.__recorder
+        res, (self.__recorder,) = self.__recorder, recorder
+        return res
+
+    @staticmethod
+    def __record(record, elapsed, failed):
+        '''Update the statistics in `record` with the `elapsed` time of a single call and whether it `failed`.'''
+        record[0] += 1
+        record[1] += elapsed
+        record[2] = max(record[2], elapsed)
+        record[3] += 1 if failed else 0
+
+    @staticmethod
+    def __describe__(callable):
+        '''Return a description of `callable` that includes its module and the class that owns it.'''
+        owner, name, module = (getattr(callable, attribute, None) for attribute in ['__self__', '__name__', '__module__'])
+        if name is None:
+            return "{!s}".format(callable)
+        components = [owner.__name__] if isinstance(owner, type) else [owner.__class__.__name__] if owner is not None else []
+        return '.'.join(([module] if module else []) + components + [name])
+
+    def top(self, count=10, key='total'):
+        '''List the `count` callables that have the largest statistic named by `key` which can be either "count", "total", "average", "maximum", or "exceptions".'''
+        fields = {
+            'count': operator.itemgetter(0), 'total': operator.itemgetter(1), 'maximum': operator.itemgetter(2), 'exceptions': operator.itemgetter(3),
+            'average': lambda record: record[1] / record[0] if record[0] else 0.,
+        }
+        if key not in fields:
+            cls = self.__class__
+            raise KeyError(u"{:s}.top({:d}, key={!r}) : The specified key ({!r}) is not one of the available statistics ({:s}).".format('.'.join([__name__, cls.__name__]), count, key, key, ', '.join(map("{!r}".format, sorted(fields)))))
+
+        if self.__statistics is None:
+            cls = self.__class__
+            logging.warning(u"{:s}.top({:d}, key={!r}) : Statistics are not being collected. Use `{:s}` to enable them.".format('.'.join([__name__, cls.__name__]), count, key, 'profile(True)'))
+            return
+
+        # Sort the statistics for every callable using the requested field.
+        _, callables = self.__statistics
+        F = fields[key]
+        listable = sorted(callables.items(), key=lambda item: F(item[1]), reverse=True)[:count]
+        if not listable:
+            return
+
+        # Figure out the lengths of each column and then output each row.
+        rows = [(self.__formatter__(target), self.__describe__(callable), record) for (target, callable), record in listable]
+        ctarget = max(len(target) for target, _, _ in rows)
+        ccallable = max(len(callable) for _, callable, _ in rows)
+        ccount = max(len("{:d}".format(record[0])) for _, _, record in rows)
+        cindex = len("{:d}".format(len(rows) - 1))
+        for index, (target, callable, record) in enumerate(rows):
+            calls, total, maximum, exceptions = record
+            average = total / calls if calls else 0.
+            six.print_(u"[{:>{:d}d}] {:<{:d}s} : {:<{:d}s} : count:{:<{:d}d} total:{:.6f}s average:{:.6f}s maximum:{:.6f}s exceptions:{:d}".format(index, cindex, target, ctarget, callable, ccallable, calls, ccount, total, average, maximum, exceptions))
+        return
+
     def apply(self, target):
         '''Return a closure that will execute all of the hooks for the specified `target`.'''
 
         ## Define the closure that we'll hand off to connect
         def closure(*parameters):
-            if target not in self.__cache__ or target in self.__disabled:
+            recorder = self.__recorder
+            if recorder is not None:
+                recorder(target, parameters)
+
+            chain = self.__chain.get(target, ())
+            if not chain:
                 return
 
-            # Iterate through our priorityqueue extracting each callable and
+            # Only format the parameters if we're actually going to log them
+            debug = logging.root.isEnabledFor(logging.DEBUG)
+            if debug:
+                description = ', '.join(map("{!r}".format, parameters))
+
+            # Grab our statistics so that we can time each callable if requested
+            statistics = self.__statistics
+            if statistics is not None:
+                (targets, callables), timer = statistics, self.timer
+                started, failed = timer(), False
+
+            # Iterate through our compiled chain extracting each callable and
             # executing it with the parameters we received
-            hookq = self.__cache__[target][:]
-            for priority, callable in heapq.nsmallest(len(hookq), hookq):
-                logging.debug(u"{:s}.closure({:s}) : Dispatching parameters ({:s}) to callback ({!s}) with priority ({:+d})".format('.'.join([__name__, self.__class__.__name__]), ', '.join(map("{!r}".format, parameters)), ', '.join(map("{!r}".format, parameters)), callable, priority))
+            for priority, callable in chain:
+                if debug:
+                    logging.debug(u"{:s}.closure({:s}) : Dispatching parameters ({:s}) to callback ({!s}) with priority ({:+d})".format('.'.join([__name__, self.__class__.__name__]), description, description, callable, priority))
+
+                if statistics is not None:
+                    ts = timer()
 
                 try:
                     result = callable(*parameters)
 
                 # if we caught an exception, then inform the user about it and stop processing our queue
                 except:
+                    if statistics is not None:
+                        self.__record(callables[target, callable], timer() - ts, True)
+                        failed = True
                     cls = self.__class__
                     bt = traceback.format_list(self.__traceback[target, callable])
                     current = str().join(traceback.format_exception(*sys.exc_info()))
@@ -395,6 +530,10 @@ class prioritybase(object):
 
                     result = self.STOP
 
+                else:
+                    if statistics is not None:
+                        self.__record(callables[target, callable], timer() - ts, False)
+
                 if not isinstance(result, self.result) or result == self.CONTINUE:
                     continue
 
@@ -403,6 +542,10 @@ class prioritybase(object):
 
                 cls = self.__class__
                 raise TypeError("{:s}.callback({:s}) : Unable to determine the result ({!r}) returned from callable ({!s}).".format('.'.join([__name__, cls.__name__]), ', '.join(map("{!r}".format, parameters)), result, callable))
+
+            # If we're collecting statistics, then update them for the target
+            if statistics is not None:
+                self.__record(targets[target], timer() - started, failed)
             return
 
         # That's it!
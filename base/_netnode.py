@@ -459,6 +459,20 @@ class alt(object):
         node = netnode.get(nodeidx)
         return netnode.altdel(node, index)
 
+    @classmethod
+    def next(cls, nodeidx, index):
+        '''Return the index of the element following `index` in the "altval" array belonging to the netnode identified by `nodeidx` or None if there isn't one.'''
+        node = netnode.get(nodeidx)
+        res = netnode.altnext(node, index)
+        return None if res in {None, idaapi.BADADDR} else res
+
+    @classmethod
+    def prev(cls, nodeidx, index):
+        '''Return the index of the element preceding `index` in the "altval" array belonging to the netnode identified by `nodeidx` or None if there isn't one.'''
+        node = netnode.get(nodeidx)
+        res = netnode.altprev(node, index)
+        return None if res in {None, idaapi.BADADDR} else res
+
     @classmethod
     def fiter(cls, nodeidx):
         '''Iterate through all of the elements of the "altval" array belonging to the netnode identified by `nodeidx` in order.'''
@@ -475,6 +489,16 @@ class alt(object):
             yield index, value
         return
 
+    @classmethod
+    def range(cls, nodeidx, start, stop):
+        '''Iterate through the elements of the "altval" array belonging to the netnode identified by `nodeidx` from `start` up to `stop` in order.'''
+        node = netnode.get(nodeidx)
+        index = netnode.altfirst(node) if start <= 0 else netnode.altnext(node, start - 1)
+        while index not in {None, idaapi.BADADDR} and index < stop:
+            yield index, netnode.altval(node, index)
+            index = netnode.altnext(node, index)
+        return
+
     @classmethod
     def repr(cls, nodeidx):
         '''Display the "altval" array belonging to the netnode identified by `nodeidx`.'''
@@ -538,6 +562,16 @@ class sup(object):
             yield index
         return
 
+    @classmethod
+    def range(cls, nodeidx, start, stop):
+        '''Iterate through the elements of the "supval" array belonging to the netnode identified by `nodeidx` from `start` up to `stop` in order.'''
+        node = netnode.get(nodeidx)
+        index = netnode.supfirst(node) if start <= 0 else netnode.supnext(node, start - 1)
+        while index not in {None, idaapi.BADADDR} and index < stop:
+            yield index
+            index = netnode.supnext(node, index)
+        return
+
     @classmethod
     def repr(cls, nodeidx):
         '''Display the "supval" array belonging to the netnode identified by `nodeidx`.'''
@@ -149,6 +149,10 @@ class multicase(object):
     CO_FUTURE_GENERATOR_STOP    = 0x80000
 
     cache_name = '__multicase_cache__'
+    dispatch_name = '__multicase_dispatch__'
+    compiled_name = '__multicase_compiled__'
+    documentation_name = '__multicase_documentation__'
+    code_name = '__multicase_code__'
 
     def __new__(cls, *other, **t_args):
         '''Decorate a case of a function with the specified types.'''
@@ -178,6 +182,12 @@ class multicase(object):
                 res = cls.new_wrapper(func, cache)
                 res.__module__ = getattr(wrapped, '__module__', getattr(func, '__module__', '__main__'))
 
+            # a case is being added, so any of the prototypes that we've
+            # already dispatched to are no longer guaranteed to be correct
+            # and the dispatcher will need to be compiled again.
+            getattr(res, cls.dispatch_name, {}).clear()
+            del getattr(res, cls.compiled_name, [])[:]
+
             # calculate the priority by trying to match the most first
             argtuple = s_args, args, defaults, (star, starstar)
             priority = len(args) - s_args - len(t_args) + (len(args) and (next((float(i) for i, a in enumerate(args[s_args:]) if a in t_args), 0) / len(args))) + sum(0.3 for item in [star, starstar] if item)
@@ -188,9 +198,11 @@ class multicase(object):
                 if p != priority: continue
                 # verify that it actually matches the entry
                 if current == (tuple(t.get(_, None) for _ in a[1]), a[3]):
-                    # yuuup, update it.
+                    # yuuup, update it and discard the documentation for the old one.
+                    _, (f, _, _) = cache[i]
+                    getattr(res, cls.documentation_name, {}).pop(f, None)
                     cache[i] = (priority, (func, t_args, argtuple))
-                    res.__doc__ = cls.document(func.__name__, [n for _, n in cache])
+                    res.__doc__ = cls.document(func.__name__, [n for _, n in cache], getattr(res, cls.documentation_name, None))
                     return cons(res)
                 continue
 
@@ -198,7 +210,7 @@ class multicase(object):
             heapq.heappush(cache, (priority, (func, t_args, argtuple)))
 
             # now we can update the docs
-            res.__doc__ = cls.document(func.__name__, [n for _, n in cache])
+            res.__doc__ = cls.document(func.__name__, [n for _, n in cache], getattr(res, cls.documentation_name, None))
 
             # ..and then restore the wrapper to its former glory
             return cons(res)
@@ -225,19 +237,32 @@ class multicase(object):
         return result
 
     @classmethod
-    def document(cls, name, cache):
-        '''Generate documentation for a multicased function.'''
+    def document(cls, name, cache, rendered=None):
+        """Generate documentation for a multicased function.
+
+        If the dictionary `rendered` is provided, then it is used to store the
+        documentation for each case so that it is only generated once.
+        """
+        rendered = {} if rendered is None else rendered
+
         res = []
         for func, types, _ in cache:
-            doc = (func.__doc__ or '').split('\n')
-            if len(doc) > 1:
-                res.append("{:s} ->".format(cls.prototype(func, types)))
-                res.extend("{: >{padding:d}s}".format(item, padding=1 + len(name) + len(item)) for item in map(operator.methodcaller('strip'), doc))
-            elif len(doc) == 1:
-                res.append(cls.prototype(func, types) + (" -> {:s}".format(doc[0]) if len(doc[0]) else ''))
-            continue
+            if func not in rendered:
+                rendered[func] = cls.describe(name, func, types)
+            res.extend(rendered[func])
         return '\n'.join(res)
 
+    @classmethod
+    def describe(cls, name, func, types):
+        '''Return a list of the lines that document the case `func` with the specified `types`.'''
+        res, doc = [], (func.__doc__ or '').split('\n')
+        if len(doc) > 1:
+            res.append("{:s} ->".format(cls.prototype(func, types)))
+            res.extend("{: >{padding:d}s}".format(item, padding=1 + len(name) + len(item)) for item in map(operator.methodcaller('strip'), doc))
+        elif len(doc) == 1:
+            res.append(cls.prototype(func, types) + (" -> {:s}".format(doc[0]) if len(doc[0]) else ''))
+        return res
+
     @classmethod
     def prototype(cls, func, parameters={}):
         '''Generate a prototype for an instance of a function `func`.'''
@@ -302,7 +327,7 @@ class multicase(object):
             try:
                 for n in af[sa:]:
                     try: a.append(next(ac))
-                    except StopIteration: a.append(kc.pop(n) if n in kc else defaults.pop(n))
+                    except StopIteration: a.append(kc.pop(n) if n in kc else defaults[n])
             except KeyError: pass
             finally: a = tuple(a)
 
@@ -329,28 +354,154 @@ class multicase(object):
         error_keywords = ["{:s}={!s}".format(n, kwds[n].__class__.__name__) for n in kwds]
         raise internal.exceptions.UnknownPrototypeError(u"@multicase.call({:s}{:s}): The requested argument types do not match any of the available prototypes. The prototypes that are available are: {:s}.".format(', '.join(error_arguments) if args else '*()', ", {:s}".format(', '.join(error_keywords)) if error_keywords else '', ', '.join(cls.prototype(f, t) for f, t, _ in heap)))
 
+    @classmethod
+    def signature(cls, args_kwds):
+        '''Return a key for the tuple (`args`, `kwds`) that uniquely identifies which case it will be dispatched to.'''
+        args, kwds = args_kwds
+        res = builtins.tuple(builtins.map(builtins.type, args))
+        if kwds:
+            res += builtins.tuple((kwd, builtins.type(kwds[kwd])) for kwd in builtins.sorted(kwds))
+
+        # old-style instances all share the same type, so we can't use them to
+        # determine a match without checking their class. so we just avoid them.
+        return None if types.InstanceType in res else res
+
+    @classmethod
+    def resolve(cls, args_kwds, cache):
+        '''Find the correct function for the tuple (`args`, `kwds`) by searching through the entire `cache`.'''
+        heap = [res for _, res in heapq.nsmallest(len(cache), cache)]
+        f, _ = cls.match(args_kwds, heap)
+        return f
+
+    @classmethod
+    def new_dispatcher(cls, name, cache):
+        """Compile the cases in `cache` into a function that takes the tuple (`args`, `kwds`) and returns the case that matches.
+
+        The compiled function checks the number of arguments for each case
+        followed by a flat chain of type checks. If no case matches, then
+        ``None`` is returned.
+        """
+        namespace = {'isinstance': builtins.isinstance, 'callable': builtins.callable, 'len': builtins.len}
+
+        def check(index, param, t, expression):
+            '''Return an expression that checks `expression` against the type `t` for the specified `param`.'''
+            if t in {callable}:
+                return "callable({:s})".format(expression)
+            symbol = "T{:d}_{:s}".format(index, param)
+            namespace[symbol] = t
+            return "isinstance({:s}, {:s})".format(expression, symbol)
+
+        lines = ['def dispatch(args, kwds):', '    count = len(args)']
+        for index, (_, (f, ts, (sa, af, defaults, (argname, kwdname)))) in enumerate(heapq.nsmallest(len(cache), cache)):
+            namespace["F{:d}".format(index)] = f
+            params = af[sa:]
+
+            # generate a branch for every number of parameters that can be
+            # passed positionally with the rest coming from the keywords.
+            for count in builtins.range(1 + len(params)):
+                positional, rest = params[:count], params[count:]
+                conditions = ["count {:s} {:d}".format('>=' if argname and count == len(params) else '==', sa + count)]
+
+                # the parameters that weren't passed positionally need to be
+                # in the keywords unless they have a default value.
+                conditions.extend("{!r} in kwds".format(param) for param in rest if param not in defaults)
+                if not kwdname:
+                    symbol = "K{:d}_{:d}".format(index, count)
+                    namespace[symbol] = builtins.frozenset(rest)
+                    conditions.append("(not kwds or {:s}.issuperset(kwds))".format(symbol))
+
+                # now we can check the types of everything that was passed.
+                conditions.extend(check(index, param, ts[param], "args[{:d}]".format(sa + i)) for i, param in enumerate(positional) if param in ts)
+                for param in (item for item in rest if item in ts):
+                    expression = check(index, param, ts[param], "kwds[{!r}]".format(param))
+                    if param in defaults:
+                        t = ts[param]
+                        default = builtins.callable(defaults[param]) if t in {callable} else builtins.isinstance(defaults[param], t)
+                        expression = "({:s} if {!r} in kwds else {!s})".format(expression, param, default)
+                    conditions.append(expression)
+                lines.append("    if {:s}: return F{:d}".format(' and '.join(conditions), index))
+            continue
+        lines.append('    return None')
+
+        # compile the function that we generated, and then return it.
+        code = builtins.compile('\n'.join(lines), "<multicase {:s}>".format(name), 'exec')
+        six.exec_(code, namespace)
+        return namespace['dispatch']
+
     @classmethod
     def new_wrapper(cls, func, cache):
         '''Create a new wrapper that will determine the correct function to call.'''
+        dispatch, compiled = {}, []
+
         # define the wrapper...
         def F(*arguments, **keywords):
-            heap = [res for _, res in heapq.nsmallest(len(cache), cache)]
-            f, (a, w, k) = cls.match((arguments[:], keywords), heap)
+            key = cls.signature((arguments, keywords))
+
+            # if we've already dispatched these types, then we can just call it.
+            if key in dispatch:
+                return dispatch[key](*arguments, **keywords)
+
+            # otherwise we need to use our compiled dispatcher to find the right
+            # one. if it doesn't find anything, then we search through the cache
+            # so that the correct exception gets raised.
+            if not compiled:
+                compiled.append(cls.new_dispatcher(func.func_name, cache))
+            f = compiled[0](arguments, keywords) or cls.resolve((arguments[:], keywords), cache)
+
+            # now we can save it so that we don't have to do it again.
+            if key is not None:
+                dispatch[key] = f
             return f(*arguments, **keywords)
-            #return f(*(arguments + tuple(w)), **keywords)
+
+        # define the wrapper that is used when profiling. this needs to use
+        # the exact same closure as the other wrapper so that we can swap
+        # between them by exchanging their code objects.
+        def P(*arguments, **keywords):
+            statistics, start = cls.profile.statistics(cache, func), cls.profile.timer()
+            try:
+                key = cls.signature((arguments, keywords))
+                if key in dispatch:
+                    f = dispatch[key]
+                else:
+                    if not compiled:
+                        compiled.append(cls.new_dispatcher(func.func_name, cache))
+                    f = compiled[0](arguments, keywords) or cls.resolve((arguments[:], keywords), cache)
+                    if key is not None:
+                        dispatch[key] = f
+
+            # if we couldn't find a case, then track it before re-raising.
+            except internal.exceptions.UnknownPrototypeError:
+                cls.profile.failed(statistics, cls.profile.timer() - start)
+                raise
+
+            # now we can call the case and track how long everything took.
+            dispatched = cls.profile.timer()
+            try:
+                return f(*arguments, **keywords)
+            finally:
+                cls.profile.update(statistics, f, dispatched - start, cls.profile.timer() - dispatched)
 
         # swap out the original code object with our wrapper's
-        f, c = F, F.func_code
-        cargs = c.co_argcount, c.co_nlocals, c.co_stacksize, c.co_flags, \
-                c.co_code, c.co_consts, c.co_names, c.co_varnames, \
-                c.co_filename, '.'.join([func.__module__, func.func_name]), \
-                c.co_firstlineno, c.co_lnotab, c.co_freevars, c.co_cellvars
-        newcode = types.CodeType(*cargs)
-        res = types.FunctionType(newcode, f.func_globals, f.func_name, f.func_defaults, f.func_closure)
+        def rename(c):
+            cargs = c.co_argcount, c.co_nlocals, c.co_stacksize, c.co_flags, \
+                    c.co_code, c.co_consts, c.co_names, c.co_varnames, \
+                    c.co_filename, '.'.join([func.__module__, func.func_name]), \
+                    c.co_firstlineno, c.co_lnotab, c.co_freevars, c.co_cellvars
+            return types.CodeType(*cargs)
+
+        f, codes = F, (rename(F.func_code), rename(P.func_code))
+        res = types.FunctionType(codes[cls.profile.enabled], f.func_globals, f.func_name, f.func_defaults, f.func_closure)
         res.func_name, res.func_doc = func.func_name, func.func_doc
 
-        # assign the specified cache to it
+        # assign the specified cache and the dispatch table to it
         setattr(res, cls.cache_name, cache)
+        setattr(res, cls.dispatch_name, dispatch)
+        setattr(res, cls.compiled_name, compiled)
+        setattr(res, cls.documentation_name, {})
+
+        # keep the code for both wrappers so that profiling can be toggled
+        setattr(res, cls.code_name, codes)
+        cls.profile.wrappers.add(res)
         # ...and finally add a default docstring
         setattr(res, '__doc__', '')
         return res
@@ -403,6 +554,99 @@ class multicase(object):
         func = cls.ex_function(func)
         return bool(func.func_code.co_flags & CO_VARGEN)
 
+    class profile(object):
+        """
+        This namespace is responsible for profiling the functions that are
+        decorated with `multicase`. When profiling is enabled, the number of
+        calls to each case, the time spent dispatching to a case compared
+        with the time spent executing it, and the number of calls that did
+        not match any of the available prototypes are tracked for every
+        multicased function.
+
+        Profiling is enabled by exchanging the code of each multicased
+        function with one that collects these statistics. Thus when it is
+        disabled, no overhead is added to any of the multicased functions.
+        """
+        enabled, wrappers, state = False, weakref.WeakSet(), {}
+
+        # the function used to measure time
+        timer = staticmethod(__import__('timeit').default_timer)
+
+        @classmethod
+        def enable(cls):
+            '''Start profiling each of the functions that have been decorated with `multicase`.'''
+            return cls.__toggle__(True)
+
+        @classmethod
+        def disable(cls):
+            '''Stop profiling each of the functions that have been decorated with `multicase`.'''
+            return cls.__toggle__(False)
+
+        @classmethod
+        def __toggle__(cls, enabled):
+            res, cls.enabled = cls.enabled, builtins.bool(enabled)
+            for F in cls.wrappers:
+                F.func_code = getattr(F, multicase.code_name)[cls.enabled]
+            return res
+
+        @classmethod
+        def reset(cls):
+            '''Discard all of the statistics that have been collected.'''
+            cls.state.clear()
+
+        @classmethod
+        def statistics(cls, cache, func):
+            '''Return the statistics being collected for the multicased function that uses the specified `cache`.'''
+            key = builtins.id(cache)
+            if key not in cls.state:
+                name = '.'.join([func.__module__, func.func_name])
+                cls.state[key] = {'name': name, 'cache': cache, 'calls': 0, 'errors': 0, 'dispatch': 0., 'body': 0., 'cases': {}}
+            return cls.state[key]
+
+        @classmethod
+        def failed(cls, statistics, elapsed):
+            '''Update the `statistics` for a call that did not match any of the available prototypes.'''
+            statistics['calls'] += 1
+            statistics['errors'] += 1
+            statistics['dispatch'] += elapsed
+
+        @classmethod
+        def update(cls, statistics, case, dispatch, body):
+            '''Update the `statistics` for a call that was dispatched to `case`.'''
+            statistics['calls'] += 1
+            statistics['dispatch'] += dispatch
+            statistics['body'] += body
+            calls, elapsed = statistics['cases'].get(case, (0, 0.))
+            statistics['cases'][case] = calls + 1, elapsed + body
+
+        @classmethod
+        def results(cls):
+            '''Return a list of the statistics for each multicased function sorted by the time spent dispatching.'''
+            res = []
+            for statistics in cls.state.values():
+                prototypes = {f : multicase.prototype(f, types) for f, types, _ in (item for _, item in statistics['cache'])}
+                cases = [(prototypes.get(f, f.func_name), calls, elapsed) for f, (calls, elapsed) in statistics['cases'].items()]
+                items = ((key, statistics[key]) for key in ['name', 'calls', 'errors', 'dispatch', 'body'])
+                res.append(builtins.dict(items, cases=builtins.sorted(cases, key=operator.itemgetter(1), reverse=True)))
+            return builtins.sorted(res, key=operator.itemgetter('dispatch'), reverse=True)
+
+        @classmethod
+        def report(cls, count=None):
+            '''Display the statistics for the first `count` multicased functions that took the most time dispatching.'''
+            for item in cls.results()[:count]:
+                six.print_(u"{:s} : {:d} call{:s} ({:d} unmatched) spent {:.6f}s dispatching and {:.6f}s executing".format(item['name'], item['calls'], '' if item['calls'] == 1 else 's', item['errors'], item['dispatch'], item['body']))
+                for prototype, calls, elapsed in item['cases']:
+                    six.print_(u"    {:s} : {:d} call{:s} ({:.6f}s)".format(prototype, calls, '' if calls == 1 else 's', elapsed))
+                continue
+            return
+
+        @classmethod
+        def dump(cls, path):
+            '''Write the statistics for all of the multicased functions to the file at `path` as JSON.'''
+            with open(path, 'wt') as outfile:
+                __import__('json').dump(cls.results(), outfile, indent=2)
+            return
+
 class alias(object):
     def __new__(cls, other, klass=None):
         cons, func = multicase.reconstructor(other), multicase.ex_function(other)
@@ -430,34 +674,85 @@ class matcher(object):
     """
     An object that allows one to match or filter a list of things in an
     sort of elegant way.
+
+    Each keyword that is registered is composed of the attributes to fetch
+    from an item, and a closure that returns the test to apply to them. When
+    a query is made, all of its keywords are compiled into a single predicate
+    that fetches each attribute shared between the keywords only once and
+    applies the cheaper tests before the more expensive ones.
     """
 
+    # the relative cost of each kind of test so that the cheaper tests
+    # (comparisons) are applied before the expensive ones (regex or glob).
+    __cost__ = {'attribute': 0, 'mapping': 0, 'boolean': 1, 'combinator': 2, 'predicate': 3}
+
     def __init__(self):
         self.__predicate__ = {}
     def __attrib__(self, *attributes):
-        if not attributes:
-            return lambda item: item
-        res = [(operator.attrgetter(callable_or_attribute) if isinstance(callable_or_attribute, six.string_types) else callable_or_attribute) for callable_or_attribute in attributes]
-        return fcompose(*res) if len(res) > 1 else res[0]
+        return builtins.tuple(attributes)
+    def __getter__(self, callable_or_attribute):
+        return operator.attrgetter(callable_or_attribute) if isinstance(callable_or_attribute, six.string_types) else callable_or_attribute
     def attribute(self, type, *attribute):
         attr = self.__attrib__(*attribute)
-        self.__predicate__[type] = lambda target: fcompose(attr, functools.partial(functools.partial(operator.eq, target)))
+        self.__predicate__[type] = self.__cost__['attribute'], attr, lambda target: functools.partial(operator.eq, target)
     def mapping(self, type, function, *attribute):
         attr = self.__attrib__(*attribute)
-        mapper = fcompose(attr, function)
-        self.__predicate__[type] = lambda target: fcompose(mapper, functools.partial(operator.eq, target))
+        self.__predicate__[type] = self.__cost__['mapping'], attr + (function,), lambda target: functools.partial(operator.eq, target)
     def boolean(self, type, function, *attribute):
         attr = self.__attrib__(*attribute)
-        self.__predicate__[type] = lambda target: fcompose(attr, functools.partial(function, target))
+        self.__predicate__[type] = self.__cost__['boolean'], attr, lambda target: functools.partial(function, target)
     def combinator(self, type, function, *attribute):
         attr = self.__attrib__(*attribute)
-        self.__predicate__[type] = fcompose(function, functools.partial(fcompose, attr))
+        self.__predicate__[type] = self.__cost__['combinator'], attr, function
     def predicate(self, type, *attribute):
         attr = self.__attrib__(*attribute)
-        self.__predicate__[type] = functools.partial(fcompose, attr)
+        self.__predicate__[type] = self.__cost__['predicate'], attr, fidentity
+
+    def compile(self, type):
+        '''Compile the keywords in the dictionary `type` into a single predicate that is true if an item matches all of them.'''
+        Fcost = lambda key_value: (self.__predicate__[key_value[0]][0], key_value[0])
+
+        # first we need to figure out each attribute that needs to be fetched
+        # so that the attributes that are shared between tests are reused.
+        slots, steps, tests = {(): 0}, [(None, None)], []
+        for key, value in sorted(type.items(), key=Fcost):
+            _, attributes, closure = self.__predicate__[key]
+
+            path = []
+            for index in builtins.range(len(attributes)):
+                prefix = attributes[:1 + index]
+                if prefix not in slots:
+                    slots[prefix] = len(steps)
+                    steps.append((slots[attributes[:index]], self.__getter__(attributes[index])))
+                path.append(slots[prefix])
+
+            # the test is created here so that any regex or glob is only compiled once.
+            tests.append((path, slots[attributes], closure(value)))
+
+        # now we can build the predicate that will fetch the attributes for each
+        # item as they're needed, and then apply each test to the right one.
+        missing, count = object(), len(steps)
+        def predicate(item):
+            values = [item] + [missing] * (count - 1)
+            for path, index, test in tests:
+                for step in path:
+                    if values[step] is missing:
+                        parent, getter = steps[step]
+                        values[step] = getter(values[parent])
+                    continue
+                if not test(values[index]):
+                    return False
+                continue
+            return True
+        return predicate
+
+    def select(self, type, iterable):
+        '''Return a generator that yields each item from `iterable` that matches all of the keywords in the dictionary `type`.'''
+        predicate = self.compile(type)
+        return (item for item in iterable if predicate(item))
+
     def match(self, type, value, iterable):
-        matcher = self.__predicate__[type](value)
-        return (item for item in iterable if matcher(item))
+        return self.select({type: value}, iterable)
 
 ### character processing (escaping and unescaping)
 class character(object):
@@ -1109,11 +1404,16 @@ def float_of_integer(integer, mantissa_bits, exponent_bits, sign_bits):
     # Check if we need to return any special constants
     if exponent == 2 ** exponent_bits - 1 and mantissa == 0:
         return float('-inf') if sign else float('+inf')
-    elif exponent in {0, 2 ** fraction_bits - 1} and mantissa != 0:
+    elif exponent == 2 ** exponent_bits - 1 and mantissa != 0:
         return float('-nan') if sign else float('+nan')
     elif exponent == 0 and mantissa == 0:
         return float('-0') if sign else float('+0')
 
+    # If the exponent is zero, then this is a denormal and has no implicit bit.
+    elif exponent == 0:
+        m = float(mantissa) / (2 ** fraction_bits)
+        return math.ldexp(math.copysign(m, -1 if sign else +1), 1 - bias)
+
     # Raise an exception as we weren't able to decode the semantics for
     # each component.
     raise ValueError("Unable to decode integer ({:#x}) using the values extracted for the mantissa ({:#x}), exponent ({:#x}), and sign flag ({:d}).".format(integer, mantissa, exponent, sign))
@@ -1122,6 +1422,7 @@ def float_to_integer(float, mantissa_bits, exponent_bits, sign_bits):
     """Encode the specified `float` using the sizes provided for `mantissa_bits`, `exponent_bits`, and `sign_bits`.
 
     Each of the sizes are to be provided as the number of bits used to represent that component.
+    If the `float` can not be represented exactly, then it is rounded to the nearest value (ties to even).
     """
     exponentbias = (2 ** exponent_bits) // 2 - 1
 
@@ -1141,12 +1442,28 @@ def float_to_integer(float, mantissa_bits, exponent_bits, sign_bits):
         # Now we need to copy out the sign flag
         sign = 1 if math.copysign(1.0, m) < 0 else 0
 
-        # Adjust the exponent so that we can remove the implicit bit
+        # Scale the mantissa so that its integral part contains the implicit
+        # bit followed by the fraction. If the exponent is too small to be
+        # normalized, then this is a denormal and has no implicit bit.
         exponent = e + exponentbias - 1
-        m = abs(m) * 2.0 - 1.0 if exponent else abs(m)
-
-        # Finally we need to convert the fractional mantissa into an integer
-        mantissa = math.trunc(m * (2 ** mantissa_bits))
+        if exponent > 0:
+            scaled = math.ldexp(abs(m), mantissa_bits + 1)
+        else:
+            exponent, scaled = 0, math.ldexp(abs(float), mantissa_bits + exponentbias - 1)
+
+        # Round the scaled mantissa to the nearest integer with ties going to
+        # the even one, which is what the hardware does.
+        integral = math.floor(scaled)
+        remainder, mantissa = scaled - integral, int(integral)
+        if remainder > 0.5 or (remainder == 0.5 and mantissa & 1):
+            mantissa += 1
+
+        # Now we can combine the exponent with the mantissa (without its
+        # implicit bit) so that rounding up will carry into the exponent. If
+        # the exponent overflowed, then the number becomes infinity.
+        magnitude = exponent * 2 ** mantissa_bits + (mantissa - 2 ** mantissa_bits if exponent else mantissa)
+        magnitude = min(magnitude, (2 ** exponent_bits - 1) * 2 ** mantissa_bits)
+        exponent, mantissa = divmod(magnitude, 2 ** mantissa_bits)
 
     # Calculate the shift and mask for each component of the encoded float
     components = [mantissa_bits, exponent_bits, sign_bits]
@@ -1163,3 +1480,102 @@ def float_to_integer(float, mantissa_bits, exponent_bits, sign_bits):
     res += (exponent & exponent_mask) * exponent_shift
     res += (mantissa & mantissa_mask) * mantissa_shift
     return res
+
+def __float_half_table__():
+    '''Return an array containing the value of every possible half (16-bit) floating-point number.'''
+    if not hasattr(__float_half_table__, 'table'):
+        __float_half_table__.table = array.array('d', (float_of_integer(integer, 10, 5, 1) for integer in builtins.range(0x10000)))
+    return __float_half_table__.table
+
+def __float_numpy__():
+    '''Return the numpy module if it is available, otherwise return ``None``.'''
+    if not hasattr(__float_numpy__, 'module'):
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        __float_numpy__.module = numpy
+    return __float_numpy__.module
+
+def floats_of_integers(integers, mantissa_bits, exponent_bits, sign_bits, **byteorder):
+    """Decode each of the specified `integers` using the sizes provided for `mantissa_bits`, `exponent_bits`, and `sign_bits`.
+
+    The `integers` parameter can be an ``array.array`` or a list of integers, or a buffer of the raw bytes for each integer.
+    If `byteorder` is 'big' then each integer in a buffer is read in big-endian form.
+    If `byteorder` is 'little' then each integer in a buffer is read in little-endian form.
+
+    The decoded numbers are returned as an ``array.array`` of doubles.
+    """
+    components = mantissa_bits, exponent_bits, sign_bits
+    size = (sum(components) + 7) // 8
+    endian = byteorder.get('order', None) or byteorder.get('byteorder', sys.byteorder)
+    swap = not endian.lower().startswith(sys.byteorder)
+
+    # If we were given a buffer, then we can use its bytes as-is. Otherwise we
+    # need to pack the integers into a buffer of the native byteorder.
+    if isinstance(integers, (six.binary_type, bytearray, memoryview)):
+        data = integers.tobytes() if isinstance(integers, memoryview) else six.binary_type(integers)
+    elif isinstance(integers, array.array) and integers.typecode not in {'c', 'u', 'f', 'd'} and integers.itemsize == size:
+        data, swap = integers.tostring(), False
+    elif size in {1, 2, 4, 8}:
+        data, swap = array.array(get_array_typecode(size), integers).tostring(), False
+    else:
+        return array.array('d', (float_of_integer(integer, *components) for integer in integers))
+
+    if len(data) % size:
+        raise ValueError("The length of the buffer ({:d}) is not a multiple of the size ({:d}) of each integer.".format(len(data), size))
+
+    # If it's a double or a single, then the array module can decode it for us.
+    if components in {(52, 11, 1), (23, 8, 1)}:
+        res = array.array('d' if size == 8 else 'f')
+        res.fromstring(data)
+        if swap:
+            res.byteswap()
+        return res if res.typecode == 'd' else array.array('d', res)
+
+    # If it's a half, then use numpy if it's available.
+    numpy = __float_numpy__()
+    if components == (10, 5, 1) and numpy is not None:
+        values = numpy.frombuffer(data, dtype=numpy.dtype(numpy.float16).newbyteorder('S' if swap else '='))
+        return array.array('d', values.astype(numpy.double).tolist())
+
+    # Otherwise we need the integers so that we can decode each one of them. If
+    # it's a half, then we can use our table to decode them.
+    if size in {1, 2, 4, 8}:
+        items = array.array(get_array_typecode(size))
+        items.fromstring(data)
+        if swap:
+            items.byteswap()
+    else:
+        Fordered = (lambda chunk: chunk[::-1]) if endian.lower().startswith('little') else fidentity
+        items = [functools.reduce(lambda agg, byte: agg * 0x100 + byte, bytearray(Fordered(data[index : index + size])), 0) for index in builtins.range(0, len(data), size)]
+
+    if components == (10, 5, 1):
+        return array.array('d', builtins.map(__float_half_table__().__getitem__, items))
+    return array.array('d', (float_of_integer(integer, *components) for integer in items))
+
+def floats_to_integers(floats, mantissa_bits, exponent_bits, sign_bits):
+    """Encode each of the specified `floats` using the sizes provided for `mantissa_bits`, `exponent_bits`, and `sign_bits`.
+
+    If the size of each encoded integer is a standard size, then the integers are returned as an ``array.array``. Otherwise a list is returned.
+    """
+    components = mantissa_bits, exponent_bits, sign_bits
+    size = (sum(components) + 7) // 8
+
+    # If it's a double or a single, then the array module can encode it for us.
+    if components in {(52, 11, 1), (23, 8, 1)}:
+        data = array.array('d' if size == 8 else 'f', floats).tostring()
+        res = array.array(get_array_typecode(size))
+        res.fromstring(data)
+        return res
+
+    # If it's a half, then use numpy if it's available.
+    numpy = __float_numpy__()
+    if components == (10, 5, 1) and numpy is not None:
+        values = numpy.array(floats, dtype=numpy.float16).view(numpy.uint16)
+        return array.array(get_array_typecode(size), values.tolist())
+
+    # Otherwise we need to encode each one individually. This rounds to the
+    # nearest value just like the array module and numpy would.
+    res = [float_to_integer(item, *components) for item in floats]
+    return array.array(get_array_typecode(size), res) if size in {1, 2, 4, 8} else res
@@ -354,9 +354,7 @@ class functions(object):
     @utils.string.decorate_arguments('name', 'like', 'regex')
     def iterate(cls, **type):
         '''Iterate through all of the functions in the database that match the keyword specified by `type`.'''
-        iterable = cls.__iterate__()
-        for key, value in (type or {'predicate': utils.fconstant(True)}).items():
-            iterable = cls.__matcher__.match(key, value, iterable)
+        iterable = cls.__matcher__.select(type, cls.__iterate__())
         for item in iterable: yield item
 
     @utils.multicase(string=six.string_types)
@@ -720,9 +718,7 @@ class names(object):
     @classmethod
     @utils.string.decorate_arguments('name', 'like', 'regex')
     def __iterate__(cls, **type):
-        iterable = (idx for idx in builtins.range(idaapi.get_nlist_size()))
-        for key, value in (type or {'predicate': utils.fconstant(True)}).items():
-            iterable = cls.__matcher__.match(key, value, iterable)
+        iterable = cls.__matcher__.select(type, builtins.range(idaapi.get_nlist_size()))
         for item in iterable: yield item
 
     @utils.multicase(string=six.string_types)
@@ -1310,9 +1306,7 @@ class entries(object):
     @classmethod
     @utils.string.decorate_arguments('name', 'like', 'regex')
     def __iterate__(cls, **type):
-        listable = builtins.range(idaapi.get_entry_qty())
-        for key, value in (type or {'predicate': utils.fconstant(True)}).items():
-            listable = [item for item in cls.__matcher__.match(key, value, listable)]
+        listable = [item for item in cls.__matcher__.select(type, builtins.range(idaapi.get_entry_qty()))]
         for item in listable: yield item
 
     @utils.multicase(string=six.string_types)
@@ -1498,9 +1492,99 @@ class entries(object):
     add = utils.alias(new, 'entries')
 exports = entries     # XXX: ns alias
 
-def tags():
-    '''Returns all of the tag names used globally.'''
-    return internal.comment.globals.name()
+class tags(object):
+    """
+    This namespace is used for listing the names of the tags within the
+    database or the addresses that contain them. By default, the names of
+    all of the tags that are used globally are returned as a ``set``.
+
+    When listing the addresses within a range, the tag cache is used so
+    that only the addresses that contain tags are visited. If the tag cache
+    has not been indexed, then each address within the range is checked.
+
+    Some examples of how to use this namespace are as follows::
+
+        > names = database.tags()
+        > for ea, res in database.tags.range(0x401000, 0x402000): ...
+        > for ea, res in database.tags.range(segment.bounds(), tagname='note'): ...
+
+    """
+    def __new__(cls):
+        '''Returns all of the tag names used globally.'''
+        return internal.comment.globals.name()
+
+    @utils.multicase(bounds=tuple)
+    @classmethod
+    @utils.string.decorate_arguments('tagname')
+    def range(cls, bounds, **tagname):
+        """Yield each address within `bounds` that contains a tag along with its tags.
+
+        If the string `tagname` is specified, then only yield the addresses where the specified tag is defined.
+        """
+        left, right = bounds
+        return cls.range(left, right, **tagname)
+    @utils.multicase(start=six.integer_types, end=six.integer_types)
+    @classmethod
+    @utils.string.decorate_arguments('tagname')
+    def range(cls, start, end, **tagname):
+        """Yield each address from `start` up to `end` that contains a tag along with its tags.
+
+        If the string `tagname` is specified, then only yield the addresses where the specified tag is defined.
+        Otherwise, only the addresses containing a tag that is not implicit (such as "__name__") are yielded.
+        """
+        tagname = tagname.get('tagname', None)
+        if address.__indexed__(tagname):
+            iterable = internal.comment.addresses.range(start, end, *([] if tagname is None else [tagname]))
+        else:
+            iterable = (ea for ea in address.iterate(start, end) if ea < end)
+
+        for ea in iterable:
+            res = tag(ea)
+            if (tagname in res) if tagname is not None else any(not (name.startswith('__') and name.endswith('__')) for name in res):
+                yield ea, res
+            continue
+        return
+
+def __tag_name__(ea):
+    '''Return the custom name at the address `ea` for the implicit "__name__" tag.'''
+    res = name(ea)
+    return res if res and type.flags(ea, idaapi.FF_NAME) else None
+
+def __tag_typeinfo__(ea):
+    '''Return the rendered type information at the address `ea` for the implicit "__typeinfo__" tag.'''
+    aname = name(ea)
+
+    # if there's some typeinfo then we need to figure out its name so we can
+    # format it.
+    try:
+        if type.has_typeinfo(ea):
+            ti = type(ea)
+
+            # Demangle just the name if it's mangled in some way, and use it to render
+            # the typeinfo to return.
+            realname = internal.declaration.unmangle_name(aname)
+            return idaapi.print_tinfo('', 0, 0, 0, ti, utils.string.to(realname), '')
+
+    # if we caught an exception, then this name might be mangled and we can just rip
+    # our type information directly from the name.
+    except E.InvalidTypeOrValueError:
+        demangled = internal.declaration.demangle(aname)
+
+        # if the demangled name is different from the actual name, then we need
+        # to extract its result type and prepend it to the demangled name.
+        if demangled != aname:
+            return demangled
+        pass
+    return None
+
+# each implicit tag and the callable that is used to compute it for an address
+__implicit__ = {
+    '__name__': __tag_name__,
+    '__extra_prefix__': lambda ea: extra.__get_prefix__(ea),
+    '__extra_suffix__': lambda ea: extra.__get_suffix__(ea),
+    '__color__': lambda ea: color(ea),
+    '__typeinfo__': __tag_typeinfo__,
+}
 
 @utils.multicase()
 def tag():
@@ -1524,11 +1608,11 @@ def tag(ea):
 
     # fetch the tags from the repeatable and non-repeatable comment at the given address
     res = comment(ea, repeatable=False)
-    d1 = internal.comment.decode(res)
+    d1 = internal.comment.decoded.address(ea, False, res)
     res = comment(ea, repeatable=True)
-    d2 = internal.comment.decode(res)
+    d2 = internal.comment.decoded.address(ea, True, res)
     res = function.comment(ea, repeatable=True) if rt else ''
-    d3 = internal.comment.decode(res)
+    d3 = internal.comment.decoded.function(ea, True, res) if rt else {}
 
     # check to see if they're not overwriting each other
     if six.viewkeys(d1) & six.viewkeys(d2):
@@ -1543,43 +1627,10 @@ def tag(ea):
     [res.update(d) for d in ([d1, d2] if repeatable else [d2, d1])]
     rt and res.update(d3)
 
-    # modify the decoded dictionary with any implicit tags
-    aname = name(ea)
-    if aname and type.flags(ea, idaapi.FF_NAME): res.setdefault('__name__', aname)
-
-    eprefix = extra.__get_prefix__(ea)
-    if eprefix is not None: res.setdefault('__extra_prefix__', eprefix)
-
-    esuffix = extra.__get_suffix__(ea)
-    if esuffix is not None: res.setdefault('__extra_suffix__', esuffix)
-
-    col = color(ea)
-    if col is not None: res.setdefault('__color__', col)
-
-    # if there's some typeinfo then we need to figure out its name so we can
-    # format it.
-    try:
-        if type.has_typeinfo(ea):
-            ti = type(ea)
-
-            # Demangle just the name if it's mangled in some way, and use it to render
-            # the typeinfo to return.
-            realname = internal.declaration.unmangle_name(aname)
-            ti_s = idaapi.print_tinfo('', 0, 0, 0, ti, utils.string.to(realname), '')
-
-            # Add it to our dictionary that we return to the user.
-            res.setdefault('__typeinfo__', ti_s)
-
-    # if we caught an exception, then this name might be mangled and we can just rip
-    # our type information directly from the name.
-    except E.InvalidTypeOrValueError:
-        demangled = internal.declaration.demangle(aname)
-
-        # if the demangled name is different from the actual name, then we need
-        # to extract its result type and prepend it to the demangled name.
-        if demangled != aname:
-            res.setdefault('__typeinfo__', demangled)
-
+    # modify the decoded dictionary with any implicit tags that exist
+    for key, F in __implicit__.items():
+        value = None if key in res else F(ea)
+        if value is not None: res.setdefault(key, value)
     # now return what the user cares about
     return res
 @utils.multicase(key=six.string_types)
@@ -1596,9 +1647,29 @@ def tag(key, value):
 @utils.string.decorate_arguments('key')
 def tag(ea, key):
     '''Returns the tag identified by `key` from address `ea`.'''
-    res = tag(ea)
-    if key in res:
-        return res[key]
+    ea = interface.address.inside(ea)
+
+    # figure out the order that the comments are prioritized in, and then
+    # decode each one until we find the key that was requested.
+    try:
+        func = function.by_address(ea)
+        rt, _ = interface.addressOfRuntimeOrStatic(func)
+    except E.FunctionNotFoundError:
+        rt, func = False, None
+    repeatable = False if func and function.within(ea) and not rt else True
+
+    order = [(function.comment, internal.comment.decoded.function, True)] if rt else []
+    order += [(comment, internal.comment.decoded.address, item) for item in [repeatable, not repeatable]]
+    for Fcomment, Fdecode, where in order:
+        res = Fdecode(ea, where, Fcomment(ea, repeatable=where))
+        if key in res:
+            return res[key]
+        continue
+
+    # if it wasn't in any of the comments, then it could be an implicit tag.
+    res = __implicit__[key](ea) if key in __implicit__ else None
+    if res is not None:
+        return res
     raise E.MissingTagError(u"{:s}.tag({:#x}, {!r}) : Unable to read tag \"{:s}\" from address.".format(__name__, ea, key, utils.string.escape(key, '"')))
 @utils.multicase(ea=six.integer_types, key=six.string_types)
 @utils.string.decorate_arguments('key', 'value')
@@ -1644,30 +1715,34 @@ def tag(ea, key, value):
 
     # update the tag's reference if we're actually adding the user's key and not
     # overwriting it. tags for runtime-linked functions are actually globals, so
-    # that's also necessary to include in our tests.
-    if key not in state:
-        if func and function.within(ea) and not rt:
-            internal.comment.contents.inc(ea, key)
-        else:
-            internal.comment.globals.inc(ea, key)
+    # that's also necessary to include in our tests. we do this within a batch
+    # so that the reference for the contents is restored if we fail, and so that
+    # any batch that we were called from can coalesce it with the others.
+    with internal.comment.contents.batch():
+        if key not in state:
+            if func and function.within(ea) and not rt:
+                internal.comment.contents.inc(ea, key)
+            else:
+                internal.comment.globals.inc(ea, key)
 
-    # grab the previous value, and update the state with the new one so that we
-    # can return this to the user.
-    res, state[key] = state.get(key, None), value
+        # grab the previous value, and update the state with the new one so that we
+        # can return this to the user.
+        res, state[key] = state.get(key, None), value
 
-    # now we're ready to do our updates, but we need to guard the modification
-    # so that we don't mistakenly tamper with any references we updated. again,
-    # due to IDA using repeatable function comments for runtime-linked addresses,
-    # we need to check rt in order to determine which comment type to use.
-    hooks = {'changing_cmt', 'cmt_changed', 'changing_range_cmt', 'range_cmt_changed', 'changing_area_cmt', 'area_cmt_changed'} & ui.hook.idb.available
-    try:
-        [ ui.hook.idb.disable(item) for item in hooks ]
-    except Exception:
-        raise
-    else:
-        function.comment(ea, internal.comment.encode(state), repeatable=where) if rt else comment(ea, internal.comment.encode(state), repeatable=where)
-    finally:
-        [ ui.hook.idb.enable(item) for item in hooks ]
+        # now we're ready to do our updates, but we need to guard the modification
+        # so that we don't mistakenly tamper with any references we updated. again,
+        # due to IDA using repeatable function comments for runtime-linked addresses,
+        # we need to check rt in order to determine which comment type to use.
+        hooks = {'changing_cmt', 'cmt_changed', 'changing_range_cmt', 'range_cmt_changed', 'changing_area_cmt', 'area_cmt_changed'} & ui.hook.idb.available
+        try:
+            [ ui.hook.idb.disable(item) for item in hooks ]
+        except Exception:
+            raise
+        else:
+            function.comment(ea, internal.comment.encode(state), repeatable=where) if rt else comment(ea, internal.comment.encode(state), repeatable=where)
+        finally:
+            [ ui.hook.idb.enable(item) for item in hooks ]
+            internal.comment.decoded.discard_function(ea, where) if rt else internal.comment.decoded.discard(ea, where)
 
     # we can now return what the user asked for.
     return res
@@ -1728,6 +1803,7 @@ def tag(ea, key, none):
         function.comment(ea, internal.comment.encode(state), repeatable=where) if rt else comment(ea, internal.comment.encode(state), repeatable=where)
     finally:
         [ ui.hook.idb.enable(item) for item in hooks ]
+        internal.comment.decoded.discard_function(ea, where) if rt else internal.comment.decoded.discard(ea, where)
 
     # delete its reference since it's been removed from the dict. if
     # it's a runtime-linked function, then we ensure that only the
@@ -1742,7 +1818,6 @@ def tag(ea, key, none):
 
 # FIXME: consolidate the boolean querying logic into the utils module
 # FIXME: document this properly
-# FIXME: add support for searching global tags using the addressing cache
 @utils.multicase(tag=six.string_types)
 @utils.string.decorate_arguments('And', 'Or')
 def select(tag, *And, **boolean):
@@ -1772,18 +1847,27 @@ def select(**boolean):
     # collect the keys to query as specified by the user
     Or, And = ({item for item in boolean.get(B, [])} for B in ['Or', 'And'])
 
+    # if the index is available, then we only need to visit the addresses that
+    # contain the tags being queried. implicit tags aren't indexed, so if any
+    # of those are being queried then we need to walk through all of the tags.
+    index = internal.comment.globals.index
+    if index.ready() and not any(item.startswith('__') and item.endswith('__') for item in Or | And):
+        iterable = index.select(And=And, Or=Or)
+    else:
+        iterable = internal.comment.globals.address()
+
     # walk through all tags so we can cross-check them with the query
-    for ea in internal.comment.globals.address():
+    for ea in iterable:
         ui.navigation.set(ea)
         res, d = {}, function.tag(ea) if function.within(ea) else tag(ea)
 
         # Or(|) includes any tags that were queried
-        res.update({key : value for key, value in d.items() if key in Or})
+        res.update({key : d[key] for key in Or if key in d})
 
         # And(&) includes any tags that match all of the queried tagnames
         if And:
-            if And & six.viewkeys(d) == And:
-                res.update({key : value for key, value in d.items() if key in And})
+            if all(key in d for key in And):
+                res.update({key : d[key] for key in And})
             else: continue
 
         # if anything matched, then yield the address and the queried tags
@@ -1821,8 +1905,17 @@ def selectcontents(**boolean):
     # collect the keys to query as specified by the user
     Or, And = ({item for item in boolean.get(B, [])} for B in ['Or', 'And'])
 
+    # if the index is available, then we only need to visit the functions that
+    # contain the tags being queried. if we're in the middle of a batch, then
+    # the index hasn't been updated yet and so we need to walk through them all.
+    index = internal.comment.contents.index
+    if index.ready() and not internal.comment.contents.__transactions__:
+        iterable = ((ea, internal.comment.contents._read_header(ea, ea) or {}) for ea in index.select(And=And, Or=Or))
+    else:
+        iterable = internal.comment.contents.iterate()
+
     # walk through all tagnames so we can cross-check them against the query
-    for ea, res in internal.comment.contents.iterate():
+    for ea, res in iterable:
         ui.navigation.procedure(ea)
         res, d = {item for item in res}, internal.comment.contents._read(None, ea) or {}
 
@@ -1951,9 +2044,7 @@ class imports(object):
     @utils.string.decorate_arguments('name', 'module', 'fullname', 'like', 'regex')
     def iterate(cls, **type):
         '''Iterate through all of the imports in the database that match the keyword specified by `type`.'''
-        iterable = cls.__iterate__()
-        for key, value in (type or {'predicate': utils.fconstant(True)}).items():
-            iterable = (item for item in cls.__matcher__.match(key, value, iterable))
+        iterable = cls.__matcher__.select(type, cls.__iterate__())
         for item in iterable: yield item
 
     # searching
@@ -2944,6 +3035,31 @@ class address(object):
     def nextlabel(cls, ea, count):
         return cls.nextF(ea, type.has_label, count)
 
+    @staticmethod
+    def __indexed__(tagname):
+        '''Return whether the addresses containing the tag `tagname` (or any tag if ``None``) can be found using the tag cache.'''
+        implicit = tagname is not None and tagname.startswith('__') and tagname.endswith('__')
+        return not implicit and internal.comment.addresses.ready()
+
+    @classmethod
+    def __tagged__(cls, ea, predicate, count, tagname, reverse=False):
+        """Return the address `count` tagged addresses away from `ea` that matches `predicate` by using the tag cache.
+
+        If the string `tagname` is not ``None``, then only consider the addresses containing it.
+        If `reverse` is true, then search towards the top of the database instead of the bottom.
+        """
+        names = [] if tagname is None else [tagname]
+        for res in internal.comment.addresses.iterate(ea, *names, reverse=reverse):
+            if not predicate(res):
+                continue
+            elif count > 1:
+                count -= 1
+                continue
+            return res
+
+        bounds = config.bounds()
+        raise E.AddressOutOfBoundsError(u"{:s}.{:s}: Refusing to seek past the {:s} of the database ({:#x}). Stopped at address {:#x}.".format('.'.join([__name__, cls.__name__]), 'prevtag' if reverse else 'nexttag', 'top' if reverse else 'bottom', bounds[0] if reverse else bounds[1], ea))
+
     @utils.multicase()
     @classmethod
     @utils.string.decorate_arguments('tagname')
@@ -2973,14 +3089,14 @@ class address(object):
         tagname = tagname.get('tagname', None)
         Ftag = type.has_comment if tagname is None else utils.fcompose(tag, utils.frpartial(operator.contains, tagname))
         F = utils.fcompose(utils.fmap(Ftag, predicate), builtins.all)
-        return cls.prevF(ea, F, 1)
+        return cls.__tagged__(ea, F, 1, tagname, reverse=True) if cls.__indexed__(tagname) else cls.prevF(ea, F, 1)
     @utils.multicase(ea=six.integer_types, count=six.integer_types)
     @classmethod
     @utils.string.decorate_arguments('tagname')
     def prevtag(cls, ea, count, **tagname):
         tagname = tagname.get('tagname', None)
         Ftag = type.has_comment if tagname is None else utils.fcompose(tag, utils.frpartial(operator.contains, tagname))
-        return cls.prevF(ea, Ftag, count)
+        return cls.__tagged__(ea, Ftag, count, tagname, reverse=True) if cls.__indexed__(tagname) else cls.prevF(ea, Ftag, count)
 
     @utils.multicase()
     @classmethod
@@ -3011,14 +3127,14 @@ class address(object):
         tagname = tagname.get('tagname', None)
         Ftag = type.has_comment if tagname is None else utils.fcompose(tag, utils.frpartial(operator.contains, tagname))
         F = utils.fcompose(utils.fmap(Ftag, predicate), builtins.all)
-        return cls.nextF(ea, F, 1)
+        return cls.__tagged__(ea, F, 1, tagname) if cls.__indexed__(tagname) else cls.nextF(ea, F, 1)
     @utils.multicase(ea=six.integer_types, count=six.integer_types)
     @classmethod
     @utils.string.decorate_arguments('tagname')
     def nexttag(cls, ea, count, **tagname):
         tagname = tagname.get('tagname', None)
         Ftag = type.has_comment if tagname is None else utils.fcompose(tag, utils.frpartial(operator.contains, tagname))
-        return cls.nextF(ea, Ftag, count)
+        return cls.__tagged__(ea, Ftag, count, tagname) if cls.__indexed__(tagname) else cls.nextF(ea, Ftag, count)
     prevcomment, nextcomment = utils.alias(prevtag, 'address'), utils.alias(nexttag, 'address')
 
     @utils.multicase()
@@ -5616,6 +5732,11 @@ class get(object):
         This specifies 10-bits for the mantissa, 5 for the exponent, and 1
         bit for the signed flag. This allows one to specify arbitrary
         encodings for different floating-point numbers.
+
+        To read a table of floating-point numbers all at once, the number of
+        elements and the components can be given to ``database.get.float.array``::
+
+            > res = database.get.float.array(ea, 0x100, (23, 8, 1))
         """
 
         @utils.multicase()
@@ -5705,6 +5826,37 @@ class get(object):
             bits = 52, 11, 1
             return cls(ea, bits, **byteorder)
 
+        @utils.multicase(count=six.integer_types, components=tuple)
+        @classmethod
+        def array(cls, count, components, **byteorder):
+            '''Read `count` floating-point numbers from the current address that are encoded with the specified `components`.'''
+            return cls.array(ui.current.address(), count, components, **byteorder)
+        @utils.multicase(ea=six.integer_types, count=six.integer_types, components=tuple)
+        @classmethod
+        def array(cls, ea, count, components, **byteorder):
+            """Read `count` floating-point numbers from the address `ea` that are encoded with the specified `components`.
+
+            The `components` parameter is a tuple (mantissa, exponent, sign) representing the number of bits for each component of the floating-point number.
+            If `byteorder` is 'big' then read in big-endian form.
+            If `byteorder` is 'little' then read in little-endian form.
+
+            The default value of `byteorder` is the same as specified by the database architecture.
+            """
+            cb = (sum(components) + 7) // 8
+            endian = byteorder.get('order', None) or byteorder.get('byteorder', config.byteorder())
+
+            # Read all of the data for the numbers at once so that they can be
+            # decoded together instead of one at a time.
+            data = read(ea, count * cb)
+
+            try:
+                res = utils.floats_of_integers(data, *components, byteorder=endian)
+
+            except ValueError as message:
+                raise ValueError(u"{:s}.array({:#x}, {:d}, {!s}) : {!s}".format('.'.join([__name__, cls.__name__]), ea, count, components, message))
+
+            return res
+
     f = float   # XXX: ns alias
 
     @utils.multicase()
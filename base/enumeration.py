@@ -234,10 +234,7 @@ def __iterate__():
 @utils.string.decorate_arguments('regex', 'like', 'name')
 def iterate(**type):
     '''Iterate through all of the enumerations in the database that match the keyword specified by `type`.'''
-    if not type: type = {'predicate': lambda item: True}
-    listable = [item for item in __iterate__()]
-    for key, value in type.items():
-        listable = [item for item in __matcher__.match(key, value, listable)]
+    listable = [item for item in __matcher__.select(type, __iterate__())]
     for item in listable: yield item
 
 @utils.multicase(string=six.string_types)
@@ -1726,9 +1726,9 @@ def tag(func):
 
     fn, repeatable = by_address(ea), True
     res = comment(fn, repeatable=False)
-    d1 = internal.comment.decode(res)
+    d1 = internal.comment.decoded.function(interface.range.start(fn), False, res)
     res = comment(fn, repeatable=True)
-    d2 = internal.comment.decode(res)
+    d2 = internal.comment.decoded.function(interface.range.start(fn), True, res)
 
     if six.viewkeys(d1) & six.viewkeys(d2):
         logging.info(u"{:s}.tag({:#x}) : Contents of both the repeatable and non-repeatable comment conflict with one another due to using the same keys ({!r}). Giving the {:s} comment priority.".format(__name__, ea, ', '.join(six.viewkeys(d1) & six.viewkeys(d2)), 'repeatable' if repeatable else 'non-repeatable'))
@@ -1817,6 +1817,7 @@ def tag(func, key, value):
         comment(fn, internal.comment.encode(state), repeatable=where)
     finally:
         [ ui.hook.idb.enable(item) for item in hooks ]
+        internal.comment.decoded.discard_function(interface.range.start(fn), where)
 
     # if we weren't able to find a key in the dict, then one was added and we need to update its reference
     if res is None:
@@ -1879,6 +1880,7 @@ def tag(func, key, none):
         comment(fn, internal.comment.encode(state), repeatable=where)
     finally:
         [ ui.hook.idb.enable(item) for item in hooks ]
+        internal.comment.decoded.discard_function(interface.range.start(fn), where)
 
     # if we got here without raising an exception, then the tag was remove and
     # we just need to update the cache with its removal.
@@ -1953,12 +1955,12 @@ def select(func, **boolean):
         res, d = {}, database.tag(ea)
 
         # Or(|) includes any of the tags being queried
-        res.update({key : value for key, value in d.items() if key in Or})
+        res.update({key : d[key] for key in Or if key in d})
 
         # And(&) includes any tags only if they include all the specified tagnames
         if And:
-            if And & six.viewkeys(d) == And:
-                res.update({key : value for key, value in d.items() if key in And})
+            if all(key in d for key in And):
+                res.update({key : d[key] for key in And})
             else: continue
 
         # if anything matched, then yield the address and the queried tags.
@@ -74,9 +74,7 @@ def __iterate__(**type):
         seg.index, _ = index, ui.navigation.set(interface.range.start(seg))
         return seg
     iterable = (newsegment(index) for index in builtins.range(idaapi.get_segm_qty()))
-    for key, value in (type or {'predicate': utils.fconstant(True)}).items():
-        iterable = (item for item in __matcher__.match(key, value, iterable))
-    for item in iterable: yield item
+    for item in __matcher__.select(type, iterable): yield item
 
 @utils.multicase(string=six.string_types)
 @utils.string.decorate_arguments('string')
@@ -109,10 +109,7 @@ def iterate(string):
 @utils.string.decorate_arguments('regex', 'like', 'name')
 def iterate(**type):
     '''Iterate through all of the structures that match the keyword specified by `type`.'''
-    if not type: type = {'predicate': lambda item: True}
-    listable = [item for item in __iterate__()]
-    for key, value in type.items():
-        listable = [item for item in __matcher__.match(key, value, listable)]
+    listable = [item for item in __matcher__.select(type, __iterate__())]
     for item in listable: yield item
 
 @utils.multicase(string=six.string_types)
@@ -1008,10 +1005,7 @@ class members_t(object):
     @utils.multicase()
     def iterate(self, **type):
         '''Iterate through all of the members in the structure that match the keyword specified by `type`.'''
-        if not type: type = {'predicate': lambda item: True}
-        listable = [item for item in self]
-        for key, value in type.items():
-            listable = [item for item in self.__member_matcher.match(key, value, listable)]
+        listable = [item for item in self.__member_matcher.select(type, self)]
         for item in listable: yield item
     @utils.multicase(string=six.string_types)
     @utils.string.decorate_arguments('string')
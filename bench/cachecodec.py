@@ -0,0 +1,87 @@
+"""
+Tag cache codec benchmark
+
+This script measures each of the codecs that can be used to compress the
+values that are stored within the tag cache (``internal.comment.cachecodec``)
+against the "bz2_codec" that was used before the codec could be selected.
+The contents for each function in a synthetic database are marshalled the
+same way that ``internal.comment.contents`` does, and then each codec is
+used to encode and decode both the blob and the header for every function::
+
+    $ python2 bench/cachecodec.py --size 10000
+
+For each codec, the time that was spent encoding and decoding the values is
+written along with the total number of bytes that were stored and the size
+of the largest header. As headers are stored in a supval, any header that is
+larger than ``internal.netnode.sup.MAX_SIZE`` is also counted.
+"""
+
+import sys, argparse, logging, timeit
+
+import standin, suite
+
+CODECS = [
+    ('bz2_codec', None, None),
+    ('raw', 'raw', None),
+    ('zlib', 'zlib', 1),
+    ('zlib', 'zlib', 6),
+    ('zlib', 'zlib', 9),
+    ('bz2', 'bz2', 9),
+]
+
+def values():
+    '''Return the marshalled blob and header for the contents of each function in the tag cache.'''
+    import internal
+    contents, marshal = internal.comment.contents, internal.comment.tagging.marshaller
+    res = []
+    for ea, _ in contents.iterate():
+        state = contents._read(ea, ea)
+        res.append((marshal.dumps(state), marshal.dumps({item for item in state.keys()})))
+    return res
+
+def measure(items, repeat):
+    '''Return the results of encoding and decoding the marshalled `items` with each of the available codecs.'''
+    import codecs, internal
+    limit, res = internal.netnode.sup.MAX_SIZE, []
+    for description, name, level in CODECS:
+        codec = codecs.lookup('bz2_codec') if name is None else internal.comment.cachecodec(name, level)
+        blobs, headers = ([codec.encode(item)[0] for item in column] for column in zip(*items))
+        encoding = min(timeit.repeat(lambda: [codec.encode(item) for pair in items for item in pair], number=1, repeat=repeat))
+        decoding = min(timeit.repeat(lambda: [codec.decode(item) for item in blobs + headers], number=1, repeat=repeat))
+        res.append({
+            'codec': description if level is None else "{:s}:{:d}".format(description, level),
+            'encode': encoding,
+            'decode': decoding,
+            'blob': sum(map(len, blobs)),
+            'header': sum(map(len, headers)),
+            'largest': max(map(len, headers)) if headers else 0,
+            'oversized': sum(1 for item in headers if len(item) > limit),
+        })
+    return res
+
+def main(arguments):
+    parser = argparse.ArgumentParser(description='Measure the latency and stored size of each codec for the tag cache.')
+    parser.add_argument('--size', type=int, default=10000, help='the number of heads in the database (default: 10000)')
+    parser.add_argument('--repeat', type=int, default=5, help='the number of times to repeat each measurement')
+    parser.add_argument('--seed', type=int, default=0x1234, help='the seed for the random number generator')
+    res = parser.parse_args(arguments)
+
+    logging.basicConfig(level=logging.ERROR)
+    D = standin.database.generate(res.size, seed=res.seed)
+    standin.install(D)
+    with suite.quiet():
+        standin.boot()
+        standin.open_database(new=True)
+        standin.annotate(D)
+
+    items = values()
+    count = 2 * len(items)
+    sys.stdout.write("functions={:d} marshalled={:d} bytes\n".format(len(items), sum(len(blob) + len(header) for blob, header in items)))
+    sys.stdout.write("{:<12s} {:>12s} {:>12s} {:>10s} {:>10s} {:>8s} {:>9s}\n".format('codec', 'encode/us', 'decode/us', 'blob', 'header', 'largest', 'oversized'))
+    for item in measure(items, res.repeat):
+        encode, decode = (1e6 * item[name] / count if count else 0. for name in ['encode', 'decode'])
+        sys.stdout.write("{codec:<12s} {:>12.2f} {:>12.2f} {blob:>10d} {header:>10d} {largest:>8d} {oversized:>9d}\n".format(encode, decode, **item))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
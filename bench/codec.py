@@ -0,0 +1,186 @@
+"""
+Tag codec benchmark
+
+This script compares the codec that is used for encoding and decoding the
+tags within a comment (``internal.comment.codec``) against the coroutines
+from the ``internal.comment.tag`` namespace which process a comment one
+character at a time. Before measuring the throughput of each of them, the
+two implementations are fuzzed against each other to ensure that they
+produce identical results (including any exceptions that are raised) for
+both randomly generated tags and randomly generated lines::
+
+    $ python2 bench/codec.py --fuzz 20000 --lines 50000
+
+If the implementations produce different results for an input, then the
+input and both of the results are written to stderr and the script exits
+with a non-zero status.
+"""
+
+import sys, os, random, argparse, itertools, logging, timeit
+
+import standin, suite
+
+def reference_decode(data, default=u''):
+    '''Decode the string `data` into a dictionary a character at a time using the ``tag`` namespace.'''
+    import internal
+    if not data:
+        return {}
+
+    res = {}
+    for line in data.split(u'\n'):
+        try:
+            k, v = internal.comment.tag.decode((ch for ch in line))
+        except (StopIteration, internal.exceptions.InvalidFormatError):
+            items = filter(None, res.setdefault(default, u'').split(u'\n'))
+            k, v = default, u'\n'.join(itertools.chain(items, [line]))
+        res[k] = v
+    return res
+
+def reference_encode(dict):
+    '''Encode the dictionary in `dict` into a string a character at a time using the ``tag`` namespace.'''
+    import internal
+    return '\n'.join(internal.comment.tag.encode(k, v) for k, v in (dict or {}).items())
+
+def reference_check(data):
+    '''Check that the string `data` can be decoded a character at a time using the ``tag`` namespace.'''
+    import internal
+    try:
+        [internal.comment.tag.decode(iter(line)) for line in (data or '').split('\n')]
+    except Exception:
+        return False
+    return True
+
+def outcome(F, *args):
+    '''Return the result of calling `F` with `args` in a form that can be compared.'''
+    try:
+        res = F(*args)
+    except Exception as E:
+        return 'raise', E.__class__
+    if isinstance(res, dict):
+        return 'return', sorted((type(k), k, type(v), repr(v)) for k, v in res.items())
+    return 'return', type(res), res
+
+class generate(object):
+    '''Namespace of functions used to generate random input for the codec.'''
+
+    # characters that have some kind of significance to the codec
+    special = u'[]\\ \t\r\n\x0b\x0c\x00\x07\x7fxuU0123456789abcdefABCDEF-+({\'"su'
+    unicode = u'\xa0\xe9\u4e2d\ufffe\U0001f600'
+
+    @classmethod
+    def character(cls, rng):
+        choice = rng.random()
+        if choice < 0.6:
+            return rng.choice(cls.special)
+        elif choice < 0.8:
+            return unichr(rng.randint(0x20, 0x7e))
+        elif choice < 0.9:
+            return unichr(rng.randint(0, 0xff))
+        return rng.choice(cls.unicode)
+
+    @classmethod
+    def string(cls, rng, maximum=12):
+        res = u''.join(cls.character(rng) for _ in range(rng.randint(0, maximum)))
+        return res if rng.random() < 0.7 else res.encode('ascii', 'ignore')
+
+    @classmethod
+    def value(cls, rng):
+        choice = rng.randint(0, 7)
+        if choice == 0:
+            return rng.randint(-0x100000000, 0x100000000)
+        elif choice == 1:
+            return rng.random() * rng.randint(-1000, 1000)
+        elif choice == 2:
+            return [rng.randint(0, 0x1000) for _ in range(rng.randint(0, 4))]
+        elif choice == 3:
+            return tuple(cls.string(rng, 4) for _ in range(rng.randint(0, 3)))
+        elif choice == 4:
+            return {rng.randint(0, 0x100) for _ in range(rng.randint(0, 4))}
+        elif choice == 5:
+            return {rng.randint(0, 0x10) : cls.string(rng, 4) for _ in range(rng.randint(0, 3))}
+        return cls.string(rng, 24)
+
+    @classmethod
+    def tags(cls, rng):
+        return {cls.string(rng) : cls.value(rng) for _ in range(rng.randint(1, 4))}
+
+    @classmethod
+    def line(cls, rng):
+        prefix = u''.join(rng.choice(u' \t[') for _ in range(rng.randint(0, 2)))
+        return prefix + u''.join(cls.character(rng) for _ in range(rng.randint(0, 24)))
+
+def fuzz(count, seed):
+    '''Fuzz the codec against the ``tag`` namespace with `count` inputs and return the number of differences.'''
+    import internal
+    rng, failures = random.Random(seed), 0
+    for index in range(count):
+        tags = generate.tags(rng)
+        lines = u'\n'.join(generate.line(rng) for _ in range(rng.randint(1, 3)))
+        encoded = outcome(reference_encode, tags)
+        cases = [
+            ('encode', internal.comment.encode, reference_encode, tags),
+            ('decode', internal.comment.decode, reference_decode, encoded[-1] if encoded[0] == 'return' else u''),
+            ('decode', internal.comment.decode, reference_decode, lines),
+            ('check', internal.comment.check, reference_check, lines),
+        ]
+        for name, F, reference, data in cases:
+            expected, result = outcome(reference, data), outcome(F, data)
+            if expected != result:
+                failures += 1
+                sys.stderr.write("{:s}({!r})\n    expected: {!r}\n    received: {!r}\n".format(name, data, expected, result))
+            continue
+        continue
+    return failures
+
+def comments(count, seed):
+    '''Return a list of realistic multi-line comments containing approximately `count` lines.'''
+    rng, res, total = random.Random(seed), [], 0
+    names = [u'note', u'synopsis', u'type', u'return', u'marks', u'todo', u'string', u'frequency', u'__name__', u'__color__']
+    while total < count:
+        tags = {}
+        for name in rng.sample(names, rng.randint(1, 4)):
+            choice = rng.randint(0, 4)
+            tags[name] = rng.randint(0, 0x100000) if choice == 0 else [rng.randint(0x401000, 0x500000) for _ in range(rng.randint(1, 5))] if choice == 1 else u"char *(__cdecl *)(int, char **)" if choice == 2 else u"multi-line\nstring with\ttabs" if choice == 3 else u"plain text for the {:s} tag".format(name)
+        res.append(tags)
+        total += len(tags)
+    return res, total
+
+def throughput(count, seed, repeat):
+    '''Return the number of lines per second that each implementation encodes and decodes.'''
+    import internal
+    decoded, total = comments(count, seed)
+    encoded = [internal.comment.encode(item) for item in decoded]
+    measurements = [
+        ('decode (tag)', lambda: [reference_decode(item) for item in encoded]),
+        ('decode (codec)', lambda: [internal.comment.decode(item) for item in encoded]),
+        ('encode (tag)', lambda: [reference_encode(item) for item in decoded]),
+        ('encode (codec)', lambda: [internal.comment.encode(item) for item in decoded]),
+    ]
+    res = []
+    for name, F in measurements:
+        best = min(timeit.repeat(F, number=1, repeat=repeat))
+        res.append((name, total, best))
+    return res
+
+def main(arguments):
+    parser = argparse.ArgumentParser(description='Fuzz and measure the codec used for tags against a character-at-a-time implementation.')
+    parser.add_argument('--fuzz', type=int, default=20000, help='the number of inputs to fuzz with (default: 20000)')
+    parser.add_argument('--lines', type=int, default=50000, help='the number of lines to measure with (default: 50000)')
+    parser.add_argument('--repeat', type=int, default=3, help='the number of times to repeat each measurement')
+    parser.add_argument('--seed', type=int, default=0x1234, help='the seed for the random number generator')
+    res = parser.parse_args(arguments)
+
+    logging.basicConfig(level=logging.ERROR)
+    standin.install(standin.database.generate(100, seed=res.seed))
+    with suite.quiet():
+        standin.boot()
+
+    failures = fuzz(res.fuzz, res.seed)
+    sys.stdout.write("fuzzed {:d} inputs with {:d} difference{:s}\n".format(res.fuzz, failures, '' if failures == 1 else 's'))
+
+    for name, lines, elapsed in throughput(res.lines, res.seed, res.repeat):
+        sys.stdout.write("{:<16s} {:>12.6f}s {:>14.1f} lines/s\n".format(name, elapsed, lines / elapsed))
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,122 @@
+"""
+Floating-point conversion benchmark
+
+This script compares the bulk encoder for floating-point numbers
+(``internal.utils.floats_to_integers``) against the scalar encoder that it
+falls back to (``internal.utils.float_to_integer``) for each of the standard
+widths. Before measuring the throughput of each of them, the two encoders
+are fuzzed against each other with random values that need to be rounded,
+are denormal, or are too large for the width to ensure that they produce
+identical bits. If numpy is available, then the encoder for halves is also
+fuzzed with numpy disabled so that both of its paths are compared::
+
+    $ python2 bench/floats.py --fuzz 20000 --count 50000
+
+If the encoders produce different results for a value, then the value and
+both of the results are written to stderr and the script exits with a
+non-zero status.
+"""
+
+import sys, math, random, argparse, logging, timeit
+
+import standin, suite
+
+# the components (mantissa, exponent, sign) for each of the standard widths
+widths = [
+    ('half', (10, 5, 1)),
+    ('single', (23, 8, 1)),
+    ('double', (52, 11, 1)),
+]
+
+def generate(rng, components):
+    '''Return a random value that is within (or just outside) the range of the specified `components`.'''
+    mantissa, exponent, _ = components
+    bias = (2 ** exponent) // 2 - 1
+    choice = rng.random()
+
+    # any encoded integer decodes to a value that can be represented exactly.
+    if choice < 0.2:
+        import internal
+        integer = rng.randint(0, 2 ** sum(components) - 1)
+        res = internal.utils.float_of_integer(integer, *components)
+        return 0.0 if math.isnan(res) else res
+
+    # a value that is exactly halfway between two that can be represented
+    # (which a double can only do for the narrower widths).
+    elif choice < 0.3 and mantissa + 2 <= 53:
+        scale = rng.randint(1 - bias - mantissa, bias - mantissa)
+        res = math.ldexp(2 * rng.randint(2 ** mantissa, 2 ** (mantissa + 1) - 1) + 1, scale - 1)
+        return -res if rng.random() < 0.5 else res
+
+    # otherwise it's a random value from the denormals up to just past the
+    # largest, as long as it can still be represented by a double.
+    scale = rng.randint(1 - bias - mantissa - 2, min(bias + 2, 1023))
+    return math.ldexp(rng.uniform(-1.0, 1.0), scale)
+
+def fuzz(count, seed):
+    '''Fuzz the bulk encoder against the scalar encoder with `count` values for each width and return the number of differences.'''
+    import internal
+    rng, failures = random.Random(seed), 0
+    numpy = internal.utils.__float_numpy__()
+    for name, components in widths:
+        values = [generate(rng, components) for _ in range(count)]
+        expected = [internal.utils.float_to_integer(item, *components) for item in values]
+        results = [('bulk', list(internal.utils.floats_to_integers(values, *components)))]
+
+        # if numpy is available, then compare the encoder without it too.
+        if numpy is not None and components == (10, 5, 1):
+            internal.utils.__float_numpy__.module = None
+            try:
+                results.append(('bulk without numpy', list(internal.utils.floats_to_integers(values, *components))))
+            finally:
+                internal.utils.__float_numpy__.module = numpy
+            pass
+
+        for description, result in results:
+            for value, scalar, bulk in zip(values, expected, result):
+                if scalar != bulk:
+                    failures += 1
+                    sys.stderr.write("{:s}({!r}) : {:s}\n    scalar: {:#x}\n    bulk: {:#x}\n".format(name, value, description, scalar, bulk))
+                continue
+            continue
+        continue
+    return failures
+
+def throughput(count, seed, repeat):
+    '''Return the number of values per second that each encoder encodes for each width.'''
+    import internal
+    rng, res = random.Random(seed), []
+    for name, components in widths:
+        values = [generate(rng, components) for _ in range(count)]
+        measurements = [
+            ("{:s} (scalar)".format(name), lambda: [internal.utils.float_to_integer(item, *components) for item in values]),
+            ("{:s} (bulk)".format(name), lambda: internal.utils.floats_to_integers(values, *components)),
+        ]
+        for description, F in measurements:
+            best = min(timeit.repeat(F, number=1, repeat=repeat))
+            res.append((description, count, best))
+        continue
+    return res
+
+def main(arguments):
+    parser = argparse.ArgumentParser(description='Fuzz and measure the bulk encoder for floating-point numbers against the scalar one.')
+    parser.add_argument('--fuzz', type=int, default=20000, help='the number of values to fuzz each width with (default: 20000)')
+    parser.add_argument('--count', type=int, default=50000, help='the number of values to measure each width with (default: 50000)')
+    parser.add_argument('--repeat', type=int, default=3, help='the number of times to repeat each measurement')
+    parser.add_argument('--seed', type=int, default=0x1234, help='the seed for the random number generator')
+    res = parser.parse_args(arguments)
+
+    logging.basicConfig(level=logging.ERROR)
+    standin.install(standin.database.generate(100, seed=res.seed))
+    with suite.quiet():
+        standin.boot()
+
+    failures = fuzz(res.fuzz, res.seed)
+    sys.stdout.write("fuzzed {:d} values for each width with {:d} difference{:s}\n".format(res.fuzz, failures, '' if failures == 1 else 's'))
+
+    for name, values, elapsed in throughput(res.count, res.seed, res.repeat):
+        sys.stdout.write("{:<16s} {:>12.6f}s {:>14.1f} values/s\n".format(name, elapsed, values / elapsed))
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
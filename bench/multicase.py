@@ -0,0 +1,87 @@
+"""
+Multicase benchmark
+
+This script measures the cost of dispatching a call through a function
+that has been decorated with ``utils.multicase``. The cost of resolving
+a case by searching through every one of the available prototypes (which
+is how each call was dispatched prior to the dispatch table) is compared
+against the cost of resolving it with the dispatcher that is compiled for
+the wrapper, and the cost of dispatching through the table kept by the
+wrapper.
+
+As this script requires the ``internal`` module, it is intended to be
+executed from the IDAPython prompt as follows::
+
+    > exec(open('bench/multicase.py').read())
+
+"""
+
+import six, time
+import internal
+from internal import utils
+
+def build():
+    '''Return a multicased function with a similar number of cases to ``database.address.next``.'''
+    @utils.multicase()
+    def F():
+        return F(0)
+    @utils.multicase(predicate=callable)
+    def F(predicate):
+        return F(0, predicate)
+    @utils.multicase(ea=six.integer_types)
+    def F(ea):
+        return ea
+    @utils.multicase(ea=six.integer_types, predicate=callable)
+    def F(ea, predicate):
+        return ea
+    @utils.multicase(ea=six.integer_types, count=six.integer_types)
+    def F(ea, count):
+        return ea + count
+    @utils.multicase(ea=six.integer_types, predicate=callable, count=six.integer_types)
+    def F(ea, predicate, count):
+        return ea + count
+    @utils.multicase(string=six.string_types)
+    def F(string, *suffix, **flags):
+        return string
+    return F
+
+def measure(F, number):
+    '''Return the number of seconds it takes to execute `F` the specified `number` of times.'''
+    ts = time.time()
+    for _ in six.moves.range(number):
+        F()
+    return time.time() - ts
+
+def run(number=100000):
+    '''Compare the dispatch cost of a multicased function before and after its dispatch table is used.'''
+    F = build()
+    cache = getattr(F, utils.multicase.cache_name)
+    args = 0x401000, callable, 2
+
+    dispatcher = utils.multicase.new_dispatcher(F.__name__, cache)
+
+    def before():
+        f = utils.multicase.resolve((args, {}), cache)
+        return f(*args)
+
+    def compiled():
+        f = dispatcher(args, {})
+        return f(*args)
+
+    def after():
+        return F(*args)
+
+    # make sure that all of our callables dispatch to the same case
+    assert before() == compiled() == after()
+
+    results = [(name, measure(item, number)) for name, item in [('search', before), ('compiled', compiled), ('dispatch', after)]]
+    for name, elapsed in results:
+        six.print_(u"{:<10s} : {:.3f}s for {:d} calls ({:.3f}us per call)".format(name, elapsed, number, 1e6 * elapsed / number))
+
+    search = next(elapsed for name, elapsed in results if name == 'search')
+    for name, elapsed in results[1:]:
+        six.print_(u"{:<10s} : {:.2f}x".format("speedup ({:s})".format(name), search / elapsed if elapsed else float('inf')))
+    return dict(results)
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,183 @@
+"""
+Replay benchmark
+
+This script replays the events from a recording that was made with the
+"custom.events" module against the hooks from "misc/hooks.py" on the
+synthetic database from "bench/standin.py". This allows the hooks for the
+tag cache to be measured without IDA using the events from an analysis
+session. The database that the events are replayed against is generated
+with the size and seed from the header of the recording if it has them::
+
+    $ python2 bench/replay.py events.json.gz
+    $ python2 bench/replay.py --size 10000 events.json.gz
+
+As a recording from IDA is of a different database, any function that an
+event refers to is created within the stand-in if it does not exist. The
+changes that an event describes are applied to the stand-in once the hooks
+have been dispatched, so that the hooks for the following events will find
+the database in the same state that IDA would have.
+
+A recording can also be synthesized by churning the comments, names, and
+functions of the stand-in database. This will record the events that the
+stand-in dispatches while it is being changed::
+
+    $ python2 bench/replay.py --size 10000 --synthesize 5000 events.json.gz
+"""
+
+import sys, json, gzip, random, argparse, collections, timeit
+
+import standin
+import suite
+
+class moved(object):
+    '''The information for a segment that was moved.'''
+    def __init__(self, old, new, size):
+        self._from, self.to, self.size = old, new, size
+
+class infos(list):
+    '''The information for each of the segments that were moved.'''
+    def size(self):
+        return len(self)
+
+def header(path):
+    '''Return the header of the recording at `path` without needing the plugin to be loaded.'''
+    with (gzip.open(path, 'rb') if path.endswith('.gz') else open(path, 'rb')) as fp:
+        return json.loads(fp.readline().decode('utf8'))
+
+def decode(D, value):
+    '''Convert the plain `value` of a parameter from a recording back into an object for the stand-in database `D`.'''
+    if isinstance(value, list):
+        return [decode(D, item) for item in value]
+    elif not isinstance(value, dict):
+        return value
+
+    # anything with boundaries is either a segment or a function chunk, and is
+    # created within the stand-in if it does not exist.
+    if value['type'] == 'segment_t':
+        return D.segment(value['start']) or standin.segment_t(value['start'], value['end'], None)
+    elif 'start' in value:
+        res = D.fchunk(value['start'])
+        if res is None or res.start_ea != value['start']:
+            res = D.add_chunk(value['start'], value['end'], value.get('flags', 0) & ~standin.FUNC_TAIL)
+        return res
+
+    # the information for the segments that were moved is a list with a size.
+    elif 'items' in value:
+        return infos(moved(old, new, size) for old, new, size in value['items'])
+    return value
+
+def apply(D, name, parameters):
+    '''Apply the change that is described by the event `name` with the specified `parameters` to the stand-in database `D`.'''
+    if name == 'changing_cmt':
+        ea, repeatable, string = parameters[:3]
+        D.set_comment(ea, string, repeatable)
+    elif name == 'changing_range_cmt':
+        _, fn, string, repeatable = parameters[:4]
+        key = fn.start_ea, bool(repeatable)
+        D.function_comments.__setitem__(key, string) if string else D.function_comments.pop(key, None)
+    elif name in {'ev_rename', 'rename'}:
+        ea, string = parameters[:2]
+        D.set_name(ea, string)
+    elif name in {'deleting_func', 'del_func'}:
+        fn, = parameters[:1]
+        fn.start_ea in D.chunk and D.remove_chunk(fn.start_ea)
+    return
+
+def replay(D, events):
+    """Replay the `events` from a recording against the hooks that are installed for the stand-in database `D`.
+
+    Returns the number of events that were replayed, the number of seconds
+    that they were recorded over, and a dictionary containing the number of
+    each event that was skipped as the stand-in is unable to dispatch it.
+    """
+    import ui
+    count, duration, skipped = 0, 0., collections.Counter()
+    for elapsed, component, name, parameters in events:
+        duration = max(duration, elapsed)
+        hook = getattr(ui.hook, component, None)
+        method = getattr(hook.object, name, None) if hook else None
+        if method is None:
+            skipped[component, name] += 1
+            continue
+
+        args = decode(D, parameters)
+        method(*args)
+        apply(D, name, args)
+        count += 1
+    return count, duration, skipped
+
+def synthesize(D, path, count, size, seed):
+    '''Record `count` changes to the comments, names, and functions of the stand-in database `D` generated with `size` and `seed` to the file at `path`.'''
+    import idaapi, custom
+    rng = random.Random(seed)
+    heads = [ea for ea in D.heads]
+    custom.events.recorder.start(path, size=size, seed=seed, synthesized=count)
+    try:
+        for index in range(count):
+            choice, ea = rng.random(), rng.choice(heads)
+
+            # most of the changes are to the comments of an address.
+            if choice < 0.7:
+                string = "[churn] {:d}\n[index] {:#x}".format(index, ea) if rng.random() < 0.8 else None
+                idaapi.set_cmt(ea, string, rng.random() < 0.5)
+
+            # the others rename an address or delete a function and create it again.
+            elif choice < 0.9:
+                idaapi.set_name(ea, "churn_{:d}".format(index) if rng.random() < 0.8 else '')
+
+            else:
+                fn = D.func(ea)
+                if fn is None or fn.tails:
+                    continue
+                start, end = fn.start_ea, fn.end_ea
+                idaapi.del_func(start)
+                idaapi.add_func(start, end)
+            continue
+    finally:
+        count = custom.events.recorder.stop()
+    return count
+
+def main(arguments):
+    parser = argparse.ArgumentParser(description='Replay a recording of the events from IDA against the hooks.')
+    parser.add_argument('path', help='the file containing the recording')
+    parser.add_argument('--size', type=int, help='the number of heads in the database (default: from the recording or 10000)')
+    parser.add_argument('--seed', type=int, help='the seed used to generate the database (default: from the recording or 0x1234)')
+    parser.add_argument('--synthesize', type=int, metavar='COUNT', help='record the specified number of changes to the database instead of replaying')
+    parser.add_argument('--top', type=int, default=10, help='the number of events to list with the most time spent in their hooks')
+    args = parser.parse_args(arguments)
+
+    attributes = {} if args.synthesize else header(args.path)
+    size = args.size or attributes.get('size', 10000)
+    seed = args.seed if args.seed is not None else attributes.get('seed', 0x1234)
+    D = standin.database.generate(size, seed=seed)
+    standin.install(D)
+    with suite.quiet():
+        standin.boot()
+        standin.open_database(new=True)
+        standin.annotate(D)
+
+    if args.synthesize:
+        with suite.quiet():
+            count = synthesize(D, args.path, args.synthesize, size, seed)
+        sys.stdout.write("synthesized {:d} events from {:d} changes to {:s}\n".format(count, args.synthesize, args.path))
+        return 0
+
+    import ui, custom
+    _, events = custom.events.load(args.path)
+    ui.hook.profile(True)
+    ts = timeit.default_timer()
+    with suite.quiet():
+        count, duration, skipped = replay(D, events)
+    elapsed = timeit.default_timer() - ts
+
+    sys.stdout.write("size={:d} heads={:d} functions={:d} events={:d} recorded={:.3f}s\n".format(size, len(D.heads), len(D.functions()), count, duration))
+    sys.stdout.write("{:<20s} {:>12.6f}s {:>14.1f}/s\n".format('replay', elapsed, count / elapsed if elapsed else float('inf')))
+    rows = sorted(((component, name, record) for component in ['idp', 'idb', 'ui'] for name, record in getattr(ui.hook, component).statistics().items()), key=lambda item: item[2][1], reverse=True)
+    for component, name, (calls, total, maximum, exceptions) in rows[:args.top]:
+        sys.stdout.write("{:<20s} {:>12.6f}s {:>8d} calls {:>12.6f}s maximum {:d} exceptions\n".format('.'.join([component, name]), total, calls, maximum, exceptions))
+    for (component, name), total in sorted(skipped.items()):
+        sys.stdout.write("skipped {:d} event{:s} for {:s} that the stand-in does not support\n".format(total, '' if total == 1 else 's', '.'.join([component, name])))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
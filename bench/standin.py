@@ -0,0 +1,1070 @@
+"""
+Stand-in module
+
+This module contains a synthetic in-memory replacement for the parts of
+``idaapi`` and ``idc`` that are used by the plugin. This allows the real
+modules from the "base", "misc", and "custom" directories to be loaded
+outside of IDA so that they can be measured on a regular machine.
+
+The stand-in models the segments, heads and their flags, the functions
+and their chunks, comments, names, cross-references, and netnodes of a
+database. Changing a comment, a name, or a function will dispatch the same
+events that IDA would dispatch to any of the installed hooks. A database can be generated with a configurable number of heads
+by using the ``database.generate`` function, and then installed along with
+the loaders for the plugin by using the ``install`` function. Afterwards, the
+``boot`` function will load the root namespace and install the hooks, and the
+``open_database`` function will dispatch the events that IDA dispatches when
+a database is opened::
+
+    > import standin
+    > db = standin.database.generate(10000)
+    > standin.install(db)
+    > standin.boot()
+    > standin.open_database()
+    > import database, function
+
+Just like "idapythonrc.py", the modules from the "base" and "misc" directories
+are only loaded when they are first used unless the ``MINSC_LAZY`` environment
+variable is set to 0.
+
+Anything that is not modelled is still available as an attribute so that
+the plugin can be loaded. Constants are given an arbitrary value, and
+functions will raise ``NotImplementedError`` if they are actually called.
+"""
+
+import sys, os, imp, ast, bisect, random, types, fnmatch, logging
+import itertools, functools, operator
+import six
+
+### constants that are used for the flags of each address (bytes.hpp)
+MS_VAL, FF_IVL = 0x000000ff, 0x00000100
+MS_CLS, FF_CODE, FF_DATA, FF_TAIL, FF_UNK = 0x00000600, 0x00000600, 0x00000400, 0x00000200, 0x00000000
+MS_COMM, FF_COMM, FF_REF, FF_LINE, FF_NAME, FF_LABL, FF_FLOW, FF_SIGN, FF_BNOT, FF_UNUSED = 0x000ff800, 0x00000800, 0x00001000, 0x00002000, 0x00004000, 0x00008000, 0x00010000, 0x00020000, 0x00040000, 0x00080000
+MS_0TYPE, MS_1TYPE = 0x00f00000, 0x0f000000
+DT_TYPE = 0xf0000000
+FF_BYTE, FF_WORD, FF_DWORD, FF_QWORD, FF_TBYTE, FF_STRLIT, FF_STRUCT, FF_OWORD = 0x00000000, 0x10000000, 0x20000000, 0x30000000, 0x40000000, 0x50000000, 0x60000000, 0x70000000
+FF_FLOAT, FF_DOUBLE, FF_PACKREAL, FF_ALIGN, FF_CUSTOM, FF_YWORD, FF_ZWORD = 0x80000000, 0x90000000, 0xa0000000, 0xb0000000, 0xd0000000, 0xe0000000, 0xf0000000
+FF_0VOID, FF_0NUMH, FF_0NUMD, FF_0CHAR, FF_0SEG, FF_0OFF, FF_0NUMB, FF_0NUMO, FF_0ENUM, FF_0FOP, FF_0STRO, FF_0STK, FF_0FLT, FF_0CUST = (item << 20 for item in range(14))
+FF_1VOID, FF_1NUMH, FF_1NUMD, FF_1CHAR, FF_1SEG, FF_1OFF, FF_1NUMB, FF_1NUMO, FF_1ENUM, FF_1FOP, FF_1STRO, FF_1STK, FF_1FLT, FF_1CUST = (item << 24 for item in range(14))
+MS_CODE, FF_FUNC, FF_IMMD, FF_JUMP = 0xf0000000, 0x10000000, 0x40000000, 0x80000000
+
+### constants for functions, segments, and cross-references
+FUNC_NORET, FUNC_FAR, FUNC_LIB, FUNC_STATICDEF, FUNC_FRAME, FUNC_USERFAR, FUNC_HIDDEN, FUNC_THUNK, FUNC_BOTTOMBP, FUNC_TAIL = 0x1, 0x2, 0x4, 0x8, 0x10, 0x20, 0x40, 0x80, 0x100, 0x8000
+SEG_NORM, SEG_XTRN, SEG_CODE, SEG_DATA, SEG_IMP, SEG_GRP, SEG_NULL, SEG_UNDF, SEG_BSS, SEG_ABSSYM, SEG_COMM, SEG_IMEM = range(12)
+fl_U, fl_CF, fl_CN, fl_JF, fl_JN, fl_USobsolete, fl_F = 0, 16, 17, 18, 19, 20, 21
+dr_U, dr_O, dr_W, dr_R, dr_T, dr_I = 0, 1, 2, 3, 4, 5
+XREF_USER, XREF_TAIL, XREF_BASE, XREF_MASK, XREF_PASTEND, XREF_ALL, XREF_FAR, XREF_DATA = 0x20, 0x40, 0x80, 0x1f, 0x100, 0x00, 0x01, 0x02
+
+### constants for the netnodes
+BADADDR, BADNODE, MAXSTR, MAXNAMELEN = 0xffffffff, 0xffffffff, 0x400, 0x200
+atag, stag, htag, vtag, ntag, ltag = 'A', 'S', 'H', 'V', 'N', 'L'
+
+### everything else that the plugin uses that we actually care about
+AU_NONE, AU_UNK, AU_CODE, AU_WEAK, AU_PROC, AU_TAIL, AU_TRSP, AU_USED, AU_TYPE, AU_LIBF, AU_LBF2, AU_LBF3, AU_CHLB, AU_FINAL = 0, 10, 20, 25, 30, 35, 38, 40, 50, 60, 70, 80, 90, 200
+NW_OPENIDB, NW_CLOSEIDB, NW_INITIDA, NW_TERMIDA, NW_REMOVE = 0x1, 0x2, 0x4, 0x8, 0x10
+SN_CHECK, SN_NOCHECK, SN_PUBLIC, SN_NON_PUBLIC, SN_WEAK, SN_NON_WEAK, SN_AUTO, SN_NON_AUTO, SN_NOLIST, SN_NOWARN, SN_LOCAL = 0x00, 0x01, 0x02, 0x04, 0x08, 0x10, 0x20, 0x40, 0x80, 0x100, 0x200
+GN_VISIBLE, GN_COLORED, GN_DEMANGLED, GN_STRICT, GN_SHORT, GN_LONG, GN_LOCAL, GN_ISRET, GN_NOT_ISRET = 0x1, 0x2, 0x4, 0x8, 0x10, 0x20, 0x40, 0x80, 0x100
+DEFCOLOR, UA_MAXOP = 0xffffffff, 8
+LFLG_PC_FPP, LFLG_PC_FLAT, LFLG_64BIT, LFLG_IS_DLL, LFLG_FLAT_OFF32, LFLG_MSF, LFLG_WIDE_HBF, LFLG_DBG_NOPATH, LFLG_SNAPSHOT, LFLG_PACK, LFLG_COMPRESS, LFLG_KERNMODE = (1 << item for item in range(12))
+PATH_TYPE_CMD, PATH_TYPE_IDB, PATH_TYPE_ID0 = range(3)
+dt_byte, dt_word, dt_dword, dt_float, dt_double, dt_tbyte, dt_packreal, dt_qword, dt_byte16, dt_code, dt_void, dt_fword, dt_bitfild, dt_string, dt_unicode, dt_ldbl, dt_byte32, dt_byte64, dt_half = range(19)
+GUESS_FUNC_FAILED, GUESS_FUNC_TRIVIAL, GUESS_FUNC_OK = 0, 1, 2
+RANGE_KIND_UNKNOWN, RANGE_KIND_FUNC, RANGE_KIND_SEGMENT, RANGE_KIND_HIDDEN_RANGE = range(4)
+CF_CHG1, CF_CHG2, CF_CHG3, CF_CHG4, CF_CHG5, CF_CHG6, CF_CHG7, CF_CHG8 = (1 << (1 + item) for item in range(8))
+CF_USE1, CF_USE2, CF_USE3, CF_USE4, CF_USE5, CF_USE6, CF_USE7, CF_USE8 = (1 << (9 + item) for item in range(8))
+STRTYPE_C, STRTYPE_C_16, STRTYPE_C_32 = 0, 1, 2
+PLFM_386, PLFM_ARM, PLFM_MIPS = 0, 13, 12
+o_void, o_reg, o_mem, o_phrase, o_displ, o_imm, o_far, o_near, o_idpspec0, o_idpspec1, o_idpspec2, o_idpspec3, o_idpspec4, o_idpspec5 = range(14)
+
+class sparse_t(dict):
+    '''A sparse array that keeps its keys in order so that they can be bisected like the b-tree used by IDA.'''
+    def __init__(self):
+        super(sparse_t, self).__init__()
+        self.ordered = []
+
+    def __setitem__(self, key, value):
+        if key not in self:
+            bisect.insort(self.ordered, key)
+        return super(sparse_t, self).__setitem__(key, value)
+
+    def __delitem__(self, key):
+        super(sparse_t, self).__delitem__(key)
+        del(self.ordered[bisect.bisect_left(self.ordered, key)])
+
+    def pop(self, key, *default):
+        if key in self:
+            del(self.ordered[bisect.bisect_left(self.ordered, key)])
+        return super(sparse_t, self).pop(key, *default)
+
+    def clear(self):
+        self.ordered[:] = []
+        return super(sparse_t, self).clear()
+
+    def first(self):
+        return self.ordered[0] if self.ordered else None
+    def last(self):
+        return self.ordered[-1] if self.ordered else None
+    def next(self, key):
+        index = bisect.bisect_right(self.ordered, key)
+        return self.ordered[index] if index < len(self.ordered) else None
+    def prev(self, key):
+        index = bisect.bisect_left(self.ordered, key)
+        return self.ordered[index - 1] if index > 0 else None
+
+class netnode_t(object):
+    '''A netnode composed of a name, a value, and the sparse arrays for each of its tags.'''
+    def __init__(self, index, name=None):
+        self.index, self.name, self.value = index, name, None
+        self.arrays, self.blobs = {}, {}
+
+    def array(self, tag):
+        '''Return the sparse array (dictionary) for the specified `tag`.'''
+        res = self.arrays.get(tag, None)
+        if res is None:
+            res = self.arrays[tag] = sparse_t()
+        return res
+
+class netnode(object):
+    '''A reference to a netnode that is returned by ``idaapi.new_netnode``.'''
+    def __init__(self, index=BADNODE):
+        self.index = index
+
+class range_t(object):
+    '''The boundaries of something in the database.'''
+    def __init__(self, start_ea=BADADDR, end_ea=BADADDR):
+        self.start_ea, self.end_ea = start_ea, end_ea
+    def contains(self, ea):
+        return self.start_ea <= ea < self.end_ea
+    def size(self):
+        return self.end_ea - self.start_ea
+    def __repr__(self):
+        return "<{:s} {:#x}-{:#x}>".format(self.__class__.__name__, self.start_ea, self.end_ea)
+    startEA, endEA = property(operator.attrgetter('start_ea')), property(operator.attrgetter('end_ea'))
+area_t = range_t
+
+class segment_t(range_t):
+    '''A segment within the database.'''
+    def __init__(self, start_ea, end_ea, name, type=SEG_NORM, perm=0, bitness=1, sel=0):
+        super(segment_t, self).__init__(start_ea, end_ea)
+        self.name, self.type, self.perm, self.bitness, self.sel = name, type, perm, bitness, sel
+        self.align, self.comb, self.flags, self.color, self.orgbase = 0, 0, 0, DEFCOLOR, 0
+    def is_16bit(self):
+        return self.bitness == 0
+    def is_32bit(self):
+        return self.bitness == 1
+    def is_64bit(self):
+        return self.bitness == 2
+    def abits(self):
+        return 1 << (4 + self.bitness)
+    def abytes(self):
+        return self.abits() // 8
+
+class func_t(range_t):
+    '''A function chunk within the database.'''
+    def __init__(self, start_ea, end_ea, flags=0, owner=None):
+        super(func_t, self).__init__(start_ea, end_ea)
+        self.flags, self.owner, self.tails, self.referers = flags, owner, [], []
+        self.color, self.frame, self.frsize, self.frregs, self.argsize, self.fpd, self.regvarqty = DEFCOLOR, BADNODE, 0, 0, 0, 0, 0
+    @property
+    def tailqty(self):
+        return len(self.tails)
+    @property
+    def refqty(self):
+        return len(self.referers)
+
+class xrefblk_t(object):
+    '''An iterator for the cross-references to or from an address.'''
+    def __init__(self):
+        self.frm, self.to, self.iscode, self.type, self.user, self.items = BADADDR, BADADDR, False, 0, False, []
+    def __fill(self, iterable):
+        self.items = [item for item in iterable]
+        return self.__next()
+    def __next(self):
+        if not self.items:
+            return False
+        self.frm, self.to, self.type = self.items.pop(0)
+        self.iscode, self.user = self.type in {fl_CF, fl_CN, fl_JF, fl_JN, fl_F}, False
+        return True
+    def first_from(self, ea, flags):
+        return self.__fill((ea, to, type) for to, type in module.database.xrefs_from(ea, flags))
+    def first_to(self, ea, flags):
+        return self.__fill((frm, ea, type) for frm, type in module.database.xrefs_to(ea, flags))
+    def next_from(self):
+        return self.__next()
+    def next_to(self):
+        return self.__next()
+
+class hooks(object):
+    '''A base class for each of the hook types that can be installed.'''
+    def hook(self):
+        module.hooks.append(self) if self not in module.hooks else None
+        return True
+    def unhook(self):
+        module.hooks.remove(self) if self in module.hooks else None
+        return True
+
+    @classmethod
+    def new(cls, name, events):
+        '''Return a new hook type with the specified `name` that exposes a method for each of the specified `events`.'''
+        def method(name):
+            def method(self, *parameters):
+                return 0
+            method.__name__ = name
+            return method
+        return type(name, (cls,), {event : method(event) for event in events})
+
+IDP_Hooks = hooks.new('IDP_Hooks', [
+    'ev_init', 'ev_term', 'ev_newprc', 'ev_newasm', 'ev_newfile', 'ev_oldfile', 'ev_newbinary', 'ev_endbinary',
+    'ev_set_idp_options', 'ev_set_proc_options', 'ev_ana_insn', 'ev_emu_insn', 'ev_out_header', 'ev_out_footer',
+    'ev_auto_queue_empty', 'ev_rename', 'ev_add_cref', 'ev_add_dref', 'ev_del_cref', 'ev_del_dref', 'ev_loader',
+    'ev_func_bounds', 'ev_creating_segm', 'ev_moving_segm', 'ev_undefine', 'ev_get_autocmt',
+])
+IDB_Hooks = hooks.new('IDB_Hooks', [
+    'closebase', 'savebase', 'upgraded', 'auto_empty', 'auto_empty_finally', 'determined_main', 'loader_finished',
+    'byte_patched', 'changing_cmt', 'cmt_changed', 'changing_range_cmt', 'range_cmt_changed', 'extra_cmt_changed',
+    'renamed', 'make_code', 'make_data', 'destroyed_items', 'func_added', 'deleting_func', 'func_updated',
+    'set_func_start', 'set_func_end', 'func_tail_appended', 'deleting_func_tail', 'func_tail_deleted',
+    'tail_owner_changed', 'func_noret_changed', 'thunk_func_created', 'segm_added', 'deleting_segm', 'segm_deleted',
+    'changing_segm_start', 'segm_start_changed', 'changing_segm_end', 'segm_end_changed', 'changing_segm_name',
+    'segm_name_changed', 'changing_segm_class', 'segm_class_changed', 'segm_attrs_updated', 'segm_moved',
+    'allsegs_moved', 'item_color_changed', 'callee_addr_changed', 'sgr_changed', 'ti_changed', 'op_ti_changed',
+    'op_type_changed', 'enum_created', 'deleting_enum', 'enum_deleted', 'struc_created', 'deleting_struc',
+    'struc_deleted', 'renaming_struc_member', 'struc_member_renamed', 'local_types_changed', 'stkpnts_changed',
+])
+UI_Hooks = hooks.new('UI_Hooks', [
+    'ready_to_run', 'database_inited', 'database_closed', 'saving', 'saved', 'term', 'idcstart', 'idcstop',
+    'suspend', 'resume', 'current_widget_changed', 'screen_ea_changed', 'updating_actions', 'updated_actions',
+    'populating_widget_popup', 'finish_populating_widget_popup', 'get_ea_hint', 'get_item_hint', 'get_widget_config',
+    'preprocess_action', 'postprocess_action', 'range', 'plugin_loaded', 'plugin_unloading',
+])
+DBG_Hooks = hooks.new('DBG_Hooks', [])
+
+class PluginForm(object): pass
+
+class database(object):
+    """
+    This class models the contents of a database. The heads are kept in a
+    sorted list along with their flags and sizes, the function chunks are
+    kept in a sorted list, and everything else is kept in dictionaries that
+    are keyed by an address.
+    """
+    def __init__(self):
+        self.segments, self.heads, self.flags, self.sizes = [], [], {}, {}
+        self.chunks, self.chunk = [], {}
+        self.comments, self.function_comments, self.names = {}, {}, {}
+        self.crefs, self.drefs = {}, {}
+        self.nodes, self.nodenames = {}, {}
+        self.screen = BADADDR
+
+    ## segments
+    def add_segment(self, start, end, name, **attributes):
+        seg = segment_t(start, end, name, **attributes)
+        bisect.insort(self.segments, (start, seg))
+        return seg
+
+    def segment(self, ea):
+        index = bisect.bisect_right(self.segments, (ea, None)) - 1
+        candidates = self.segments[max(0, index) : index + 2]
+        return next((seg for _, seg in candidates if seg.start_ea <= ea < seg.end_ea), None)
+
+    def bounds(self):
+        if not self.segments:
+            return BADADDR, BADADDR
+        return self.segments[0][1].start_ea, self.segments[-1][1].end_ea
+
+    ## heads
+    def add_head(self, ea, size, flags):
+        index = bisect.bisect_left(self.heads, ea)
+        if index >= len(self.heads) or self.heads[index] != ea:
+            self.heads.insert(index, ea)
+        self.flags[ea], self.sizes[ea] = flags, size
+
+    def head(self, ea):
+        '''Return the head containing the address `ea`.'''
+        index = bisect.bisect_right(self.heads, ea) - 1
+        if index >= 0:
+            res = self.heads[index]
+            if res <= ea < res + self.sizes[res]:
+                return res
+        return None
+
+    def next_head(self, ea, maximum):
+        index = bisect.bisect_right(self.heads, ea)
+        if index < len(self.heads) and self.heads[index] < maximum:
+            return self.heads[index]
+        return BADADDR
+
+    def prev_head(self, ea, minimum):
+        index = bisect.bisect_left(self.heads, ea) - 1
+        if index >= 0 and self.heads[index] >= minimum:
+            return self.heads[index]
+        return BADADDR
+
+    def get_flags(self, ea):
+        res = self.head(ea)
+        if res is None:
+            return FF_UNK | FF_IVL if self.segment(ea) else 0
+        elif res != ea:
+            return FF_TAIL | FF_IVL
+        return self.flags[res] | FF_IVL
+
+    def update_flags(self, ea, set=0, clear=0):
+        if ea in self.flags:
+            self.flags[ea] = (self.flags[ea] & ~clear) | set
+        return
+
+    ## functions
+    def add_chunk(self, start, end, flags=0, owner=None):
+        res = func_t(start, end, flags | (FUNC_TAIL if owner else 0), owner)
+        bisect.insort(self.chunks, start)
+        self.chunk[start] = res
+        if owner:
+            owner.tails.append(res)
+            owner.tails.sort(key=operator.attrgetter('start_ea'))
+            res.referers.append(owner.start_ea)
+        else:
+            self.update_flags(start, set=FF_FUNC)
+        return res
+
+    def remove_chunk(self, start):
+        res = self.chunk.pop(start)
+        del self.chunks[bisect.bisect_left(self.chunks, start)]
+        if res.owner:
+            res.owner.tails.remove(res)
+        else:
+            [self.remove_chunk(tail.start_ea) for tail in res.tails[:]]
+            [self.function_comments.pop((start, repeatable), None) for repeatable in [False, True]]
+            self.update_flags(start, clear=FF_FUNC)
+        return res
+
+    def fchunk(self, ea):
+        index = bisect.bisect_right(self.chunks, ea) - 1
+        if index >= 0:
+            res = self.chunk[self.chunks[index]]
+            if res.start_ea <= ea < res.end_ea:
+                return res
+        return None
+
+    def func(self, ea):
+        res = self.fchunk(ea)
+        return res.owner if res and res.owner else res
+
+    def next_chunk(self, ea, tail=None):
+        index = bisect.bisect_right(self.chunks, ea)
+        for start in self.chunks[index:]:
+            res = self.chunk[start]
+            if tail is None or bool(res.flags & FUNC_TAIL) == tail:
+                return res
+            continue
+        return None
+
+    def prev_chunk(self, ea, tail=None):
+        index = bisect.bisect_left(self.chunks, ea) - 1
+        for start in reversed(self.chunks[:max(0, index + 1)]):
+            res = self.chunk[start]
+            if tail is None or bool(res.flags & FUNC_TAIL) == tail:
+                return res
+            continue
+        return None
+
+    def functions(self):
+        return [self.chunk[ea] for ea in self.chunks if not self.chunk[ea].flags & FUNC_TAIL]
+
+    ## comments and names
+    def set_comment(self, ea, string, repeatable):
+        key = ea, bool(repeatable)
+        if string:
+            self.comments[key] = string
+        else:
+            self.comments.pop(key, None)
+        has = any((ea, item) in self.comments for item in [False, True])
+        self.update_flags(ea, set=FF_COMM) if has else self.update_flags(ea, clear=FF_COMM)
+        return True
+
+    def set_name(self, ea, string):
+        if string:
+            self.names[ea] = string
+            self.update_flags(ea, set=FF_NAME)
+        else:
+            self.names.pop(ea, None)
+            self.update_flags(ea, clear=FF_NAME)
+        return True
+
+    ## cross-references
+    def add_xref(self, frm, to, type, code=True):
+        table = self.crefs if code else self.drefs
+        table.setdefault(('from', frm), []).append((to, type))
+        table.setdefault(('to', to), []).append((frm, type))
+        self.update_flags(to, set=FF_REF)
+
+    def xrefs_from(self, ea, flags=XREF_ALL):
+        tables = [self.drefs] if flags & XREF_DATA else [self.crefs, self.drefs]
+        return [item for table in tables for item in table.get(('from', ea), [])]
+
+    def xrefs_to(self, ea, flags=XREF_ALL):
+        tables = [self.drefs] if flags & XREF_DATA else [self.crefs, self.drefs]
+        return [item for table in tables for item in table.get(('to', ea), [])]
+
+    ## netnodes
+    def node(self, index):
+        '''Return the netnode for `index` creating it if necessary, as every address in a database is also a netnode.'''
+        if index not in self.nodes:
+            self.nodes[index] = netnode_t(index)
+        return self.nodes[index]
+
+    def new_node(self, name=None):
+        index = self.counter = getattr(self, 'counter', 0xff000000) + 1
+        self.nodes[index] = res = netnode_t(index, name)
+        if name is not None:
+            self.nodenames[name] = index
+        return res
+
+    @classmethod
+    def generate(cls, count, seed=0x1234, **options):
+        """Generate a database containing the specified `count` of heads.
+
+        The `seed` is used to make the contents of the database reproducible. Each
+        of the available `options` are used to adjust the density of the things
+        that are generated. These can be ``function`` (the average number of heads
+        for each function), ``tail`` (the ratio of functions with a tail chunk),
+        ``comment`` (the ratio of heads with a comment), ``tag`` (the ratio of
+        comments that are encoded as tags), ``name`` (the ratio of data that is
+        named), and ``xref`` (the ratio of instructions with a call).
+        """
+        rng = random.Random(seed)
+        density = dict(function=40, tail=0.05, comment=0.05, tag=0.8, name=0.25, xref=0.1, data=0.1)
+        density.update(options)
+        res = cls()
+
+        # Figure out the number of code and data heads so that we can make
+        # a segment for each of them.
+        data = int(count * density['data'])
+        code = count - data
+        text, ea = res.add_segment(0x401000, 0x401000, '.text', type=SEG_CODE, perm=5), 0x401000
+
+        # Generate each function (with some of them getting a tail) by
+        # using an average size for each one.
+        functions, tails = [], []
+        while code > 0:
+            length = min(code, max(1, int(rng.expovariate(1. / density['function']))))
+            start = ea
+            for index in range(length):
+                size = rng.choice([1, 2, 3, 4, 5, 5, 6, 7])
+                res.add_head(ea, size, FF_CODE | FF_FLOW)
+                ea += size
+            code -= length
+            functions.append((start, ea))
+
+            # Add some alignment between each function
+            if ea % 0x10:
+                res.add_head(ea, 0x10 - ea % 0x10, FF_DATA | FF_ALIGN)
+                ea += 0x10 - ea % 0x10
+            continue
+
+        # Now we can add the functions and assign some tails to them.
+        for start, end in functions:
+            fn = res.add_chunk(start, end, FUNC_FRAME)
+            if rng.random() < density['tail'] and end - start > 0x20:
+                tails.append(fn)
+            res.set_name(start, "sub_{:X}".format(start) if rng.random() < 0.5 else "function_{:d}".format(len(res.names)))
+        for fn in tails:
+            middle = res.next_head(fn.start_ea + (fn.end_ea - fn.start_ea) // 2, fn.end_ea)
+            if middle in {BADADDR}:
+                continue
+            res.chunks.remove(fn.start_ea), res.chunk.pop(fn.start_ea)
+            owner = res.add_chunk(fn.start_ea, middle, fn.flags)
+            res.add_chunk(middle, fn.end_ea, owner=owner)
+        text.end_ea = ea
+
+        # Generate the data segment after the code segment.
+        ea = (ea + 0xfff) & ~0xfff
+        rdata = res.add_segment(ea, ea, '.data', type=SEG_DATA, perm=6)
+        for index in range(data):
+            size = rng.choice([1, 2, 4, 4, 4, 8])
+            flags = {1: FF_BYTE, 2: FF_WORD, 4: FF_DWORD, 8: FF_QWORD}[size]
+            res.add_head(ea, size, FF_DATA | flags)
+            if rng.random() < density['name']:
+                res.set_name(ea, "data_{:x}".format(ea))
+            ea += size
+        rdata.end_ea = ea
+
+        # Sprinkle some comments and cross-references throughout the database.
+        names = ['note', 'synopsis', 'type', 'return', 'marks', 'todo', 'string', 'frequency']
+        functions = res.functions()
+        for ea in res.heads:
+            if rng.random() < density['comment']:
+                if rng.random() < density['tag']:
+                    tags = {name : cls.__value__(rng) for name in rng.sample(names, rng.randint(1, 3))}
+                    string = '\n'.join("[{:s}] {:s}".format(name, value) for name, value in tags.items())
+                else:
+                    string = "a plain comment at {:#x}".format(ea)
+                res.set_comment(ea, string, rng.random() < 0.3)
+
+            flags = res.flags[ea]
+            if flags & MS_CLS == FF_CODE and functions and rng.random() < density['xref']:
+                res.add_xref(ea, rng.choice(functions).start_ea, fl_CN)
+            elif flags & MS_CLS == FF_DATA and functions and rng.random() < density['xref']:
+                res.add_xref(rng.choice(res.heads), ea, dr_R, code=False)
+            continue
+
+        # Give some of the functions a comment too.
+        for fn in functions:
+            if rng.random() < density['comment'] * 4:
+                res.function_comments[fn.start_ea, False] = "[synopsis] function {:#x}\n[frequency] {:#x}".format(fn.start_ea, rng.randint(0, 100))
+            continue
+
+        res.screen = text.start_ea
+        return res
+
+    @staticmethod
+    def __value__(rng):
+        choice = rng.randint(0, 3)
+        if choice == 0:
+            return "{:#x}".format(rng.randint(0, 0x10000))
+        elif choice == 1:
+            return "some text {:d}".format(rng.randint(0, 1000))
+        elif choice == 2:
+            return "[{:#x}, {:#x}]".format(rng.randint(0, 0x100), rng.randint(0, 0x100))
+        return "set([{:#x}])".format(rng.randint(0, 0x100))
+
+class module(types.ModuleType):
+    """
+    This class is used to create the stand-in for the ``idaapi`` and ``idc``
+    modules. Any attribute that is not defined by the stand-in is created on
+    demand. Constants (which are expected to be uppercase) are given a unique
+    value, types are given an empty class, and anything else is a function
+    that raises ``NotImplementedError``.
+    """
+    database, hooks, notifications, missing = None, [], {}, {}
+
+    @classmethod
+    def event(cls, type, name, *parameters):
+        '''Dispatch the event `name` with the given `parameters` to each installed hook of the specified `type`.'''
+        for instance in cls.hooks[:]:
+            if isinstance(instance, type):
+                getattr(instance, name)(*parameters)
+            continue
+        return
+
+    @classmethod
+    def notify(cls, code, *parameters):
+        '''Dispatch the notification `code` with the given `parameters` to each of the registered callables.'''
+        for callable in cls.notifications.get(code, [])[:]:
+            callable(code, *parameters)
+        return
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+
+        if name.isupper() or name[:1].isupper() and '_' in name and name.split('_', 1)[0].isupper():
+            res = 0x40000000 + len(self.missing)
+        elif name.endswith('_t') or name[:1].isupper():
+            res = type(name, (object,), {'__module__': self.__name__})
+        else:
+            def res(*args, **kwargs):
+                raise NotImplementedError("{:s}.{:s}".format(self.__name__, name))
+            res.__name__ = name
+        self.missing[name] = res
+        setattr(self, name, res)
+        return res
+
+class builtin(object):
+    """
+    This class wraps a function so that it behaves like one of the functions
+    exported by SWIG. As these are not descriptors, they can be assigned to a
+    class without being turned into a method.
+    """
+    __slots__ = ('__wrapped__', '__name__')
+    def __init__(self, callable):
+        self.__wrapped__, self.__name__ = callable, callable.__name__
+    def __call__(self, *parameters, **keywords):
+        return self.__wrapped__(*parameters, **keywords)
+    def __repr__(self):
+        return "<built-in function {:s}>".format(self.__name__)
+
+def api(database):
+    '''Return a dictionary containing the functions that are implemented by the stand-in for the specified `database`.'''
+    D, res = database, {}
+    def register(*names):
+        def decorate(F):
+            [res.__setitem__(name, F) for name in names]
+            return F
+        return decorate
+
+    ## version and database information
+    res.update(__version__=7.4, __version_major__=7, __version_minor__=4, IDA_SDK_VERSION=740)
+    register('get_kernel_version')(lambda: '7.4')
+    register('get_user_idadir')(lambda: os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    register('get_idp_name')(lambda: 'metapc')
+    register('ph_get_id')(lambda: 0)
+    register('as_uint32')(lambda value: value & 0xffffffff)
+    register('as_int32')(lambda value: value - 0x100000000 if value & 0x80000000 else value)
+    register('get_root_filename')(lambda: 'standin.exe')
+    register('get_input_file_path')(lambda: os.path.join(os.getcwd(), 'standin.exe'))
+    register('get_path')(lambda type: os.path.join(os.getcwd(), 'standin.idb'))
+    register('get_imagebase')(lambda: 0x400000)
+
+    class inf(object):
+        tag, version = 'IDA', 700
+        procname, filetype, ostype, apptype, lflags, cc = 'metapc', 11, 0, 0, 0, type('cc', (object,), {'cm': 0, 'size_i': 4, 'size_b': 4, 'size_e': 4, 'defalign': 0, 'size_s': 2, 'size_l': 4, 'size_ll': 8})()
+        @property
+        def min_ea(self):
+            return D.bounds()[0]
+        @property
+        def max_ea(self):
+            return D.bounds()[1]
+        minEA, maxEA = min_ea, max_ea
+        omin_ea = omax_ea = min_ea
+        def is_64bit(self):
+            return False
+        def is_32bit(self):
+            return True
+        def is_be(self):
+            return False
+        mf = False
+    information = inf()
+    register('get_inf_structure')(lambda: information)
+    res['ph'] = type('processor_t', (object,), {'id': PLFM_386, 'flag': 0, 'cnbits': 8, 'dnbits': 8, 'regnames': [], 'instruc': []})()
+    res['cvar'] = type('cvar', (object,), {'inf': information, 'database_idb': os.path.join(os.getcwd(), 'standin.idb')})()
+
+    ## segments
+    register('getseg')(lambda ea: D.segment(ea))
+    register('get_segm_qty')(lambda: len(D.segments))
+    register('getnseg')(lambda index: D.segments[index][1] if 0 <= index < len(D.segments) else None)
+    register('get_segm_num')(lambda ea: next((index for index, (_, seg) in enumerate(D.segments) if seg.contains(ea)), -1))
+    register('get_first_seg')(lambda: D.segments[0][1] if D.segments else None)
+    register('get_last_seg')(lambda: D.segments[-1][1] if D.segments else None)
+    register('get_next_seg')(lambda ea: next((seg for _, seg in D.segments if seg.start_ea > ea), None))
+    register('get_prev_seg')(lambda ea: next((seg for _, seg in reversed(D.segments) if seg.end_ea <= ea), None))
+    register('get_segm_by_name')(lambda name: next((seg for _, seg in D.segments if seg.name == name), None))
+    register('get_segm_name', 'get_visible_segm_name', 'get_true_segm_name')(lambda seg, *flags: seg.name if seg else None)
+    register('get_segm_class')(lambda seg: 'CODE' if seg.type == SEG_CODE else 'DATA')
+    register('segtype')(lambda ea: D.segment(ea).type if D.segment(ea) else SEG_UNDF)
+
+    ## heads and flags
+    register('get_flags', 'get_full_flags', 'getFlags', 'get_flags_novalue')(D.get_flags)
+    register('get_item_head')(lambda ea: D.head(ea) if D.head(ea) is not None else ea)
+    register('get_item_end')(lambda ea: D.head(ea) + D.sizes[D.head(ea)] if D.head(ea) is not None else ea + 1)
+    register('get_item_size')(lambda ea: D.sizes[D.head(ea)] if D.head(ea) is not None else 1)
+    register('next_head')(D.next_head)
+    register('prev_head')(D.prev_head)
+    register('next_not_tail')(lambda ea: D.next_head(ea, BADADDR))
+    register('prev_not_tail')(lambda ea: D.prev_head(ea, 0))
+    register('next_addr', 'nextaddr')(lambda ea: ea + 1 if D.segment(ea + 1) else BADADDR)
+    register('prev_addr', 'prevaddr')(lambda ea: ea - 1 if D.segment(ea - 1) else BADADDR)
+    register('is_mapped', 'isEnabled')(lambda ea: D.segment(ea) is not None)
+    register('is_loaded', 'isLoaded')(lambda ea: D.segment(ea) is not None)
+    register('is_code', 'isCode')(lambda F: F & MS_CLS == FF_CODE)
+    register('is_data', 'isData')(lambda F: F & MS_CLS == FF_DATA)
+    register('is_tail', 'isTail')(lambda F: F & MS_CLS == FF_TAIL)
+    register('is_unknown', 'isUnknown')(lambda F: F & MS_CLS == FF_UNK)
+    register('is_head', 'isHead')(lambda F: F & FF_DATA != 0)
+    register('is_flow', 'isFlow')(lambda F: F & FF_FLOW != 0)
+    register('has_cmt')(lambda F: F & FF_COMM != 0)
+    register('has_name', 'has_user_name')(lambda F: F & FF_NAME != 0)
+    register('has_dummy_name', 'has_auto_name')(lambda F: False)
+    register('has_xref', 'hasRef')(lambda F: F & FF_REF != 0)
+    register('is_func', 'isFunc')(lambda F: F & MS_CODE == FF_FUNC)
+    register('is_align', 'isAlign')(lambda F: F & DT_TYPE == FF_ALIGN)
+    register('get_item_color')(lambda ea: DEFCOLOR)
+    register('get_color')(lambda ea, what: DEFCOLOR)
+    register('is_member_id')(lambda id: False)
+    register('get_opinfo')(lambda *args: None)
+    register('get_tinfo', 'get_tinfo2')(lambda *args: False)
+    register('guess_tinfo', 'guess_tinfo2')(lambda *args: GUESS_FUNC_FAILED)
+    register('print_type')(lambda ea, flags: None)
+    register('get_str_type', 'get_strlit_type')(lambda ea: -1)
+    for name, value in [('byte', FF_BYTE), ('word', FF_WORD), ('dword', FF_DWORD), ('qword', FF_QWORD), ('tbyte', FF_TBYTE), ('oword', FF_OWORD), ('yword', FF_YWORD), ('zword', FF_ZWORD), ('float', FF_FLOAT), ('double', FF_DOUBLE), ('packreal', FF_PACKREAL), ('strlit', FF_STRLIT), ('stru', FF_STRUCT), ('align', FF_ALIGN), ('custom', FF_CUSTOM)]:
+        register("{:s}_flag".format(name))(functools.partial(operator.pos, value))
+    register('off_flag')(lambda: FF_0OFF | FF_1OFF)
+    register('char_flag')(lambda: FF_0CHAR | FF_1CHAR)
+    register('num_flag', 'hex_flag')(lambda: FF_0NUMH | FF_1NUMH)
+    register('dec_flag')(lambda: FF_0NUMD | FF_1NUMD)
+    register('oct_flag')(lambda: FF_0NUMO | FF_1NUMO)
+    register('bin_flag')(lambda: FF_0NUMB | FF_1NUMB)
+    register('enum_flag')(lambda: FF_0ENUM | FF_1ENUM)
+    register('stroff_flag')(lambda: FF_0STRO | FF_1STRO)
+    register('stkvar_flag')(lambda: FF_0STK | FF_1STK)
+    register('get_dtype_by_size')(lambda size: {1: dt_byte, 2: dt_word, 4: dt_dword, 6: dt_fword, 8: dt_qword, 10: dt_tbyte, 16: dt_byte16, 32: dt_byte32, 64: dt_byte64}.get(size, -1))
+    register('get_dtype_size')(lambda dtype: {dt_byte: 1, dt_word: 2, dt_dword: 4, dt_float: 4, dt_double: 8, dt_tbyte: 10, dt_qword: 8, dt_byte16: 16, dt_fword: 6, dt_ldbl: 8, dt_byte32: 32, dt_byte64: 64, dt_half: 2}.get(dtype, 0))
+    register('get_type_flags')(lambda F: F & DT_TYPE)
+    register('get_data_elsize')(lambda ea, F, *info: {FF_BYTE: 1, FF_WORD: 2, FF_DWORD: 4, FF_QWORD: 8}.get(F & DT_TYPE, 1))
+
+    ## functions and their chunks
+    register('get_func')(lambda ea: D.func(ea))
+    register('get_fchunk')(lambda ea: D.fchunk(ea))
+    register('get_func_qty')(lambda: len(D.functions()))
+    register('getn_func')(lambda index: D.functions()[index])
+    register('get_func_num')(lambda ea: next((index for index, fn in enumerate(D.functions()) if fn.start_ea == ea), -1))
+    register('get_next_func')(lambda ea: D.next_chunk(ea, tail=False))
+    register('get_prev_func')(lambda ea: D.prev_chunk(ea, tail=False))
+    register('get_next_fchunk')(lambda ea: D.next_chunk(ea))
+    register('get_prev_fchunk')(lambda ea: D.prev_chunk(ea))
+    register('get_func_name')(lambda ea: D.names.get(D.func(ea).start_ea) if D.func(ea) else None)
+    register('get_frame')(lambda fn: None)
+    register('get_spd', 'get_sp_delta')(lambda fn, ea: 0)
+    register('get_fchunk_num')(lambda ea: -1)
+    register('func_contains')(lambda fn, ea: any(ch.contains(ea) for ch in [fn] + fn.tails))
+    register('is_same_func')(lambda ea1, ea2: D.func(ea1) is D.func(ea2))
+    @register('add_func')
+    def add_func(start, end=BADADDR):
+        seg, following = D.segment(start), D.next_chunk(start)
+        if seg is None or D.fchunk(start):
+            return False
+        if end == BADADDR:
+            end = min(seg.end_ea, following.start_ea) if following else seg.end_ea
+        res = D.add_chunk(start, end)
+        module.event(IDB_Hooks, 'func_added', res)
+        return True
+    @register('del_func')
+    def del_func(ea):
+        res = D.func(ea)
+        if res is None:
+            return False
+        module.event(IDB_Hooks, 'deleting_func', res)
+        D.remove_chunk(res.start_ea)
+        return True
+    register('get_func_cmt')(lambda fn, repeatable: D.function_comments.get((fn.start_ea, bool(repeatable)), None))
+    @register('set_func_cmt')
+    def set_func_cmt(fn, cmt, repeatable):
+        module.event(IDB_Hooks, 'changing_range_cmt', RANGE_KIND_FUNC, fn, cmt, repeatable)
+        if cmt:
+            D.function_comments[fn.start_ea, bool(repeatable)] = cmt
+        else:
+            D.function_comments.pop((fn.start_ea, bool(repeatable)), None)
+        module.event(IDB_Hooks, 'range_cmt_changed', RANGE_KIND_FUNC, fn, cmt, repeatable)
+        return True
+
+    class func_tail_iterator_t(object):
+        def __init__(self, fn, ea=BADADDR):
+            self.items, self.index = [fn] + fn.tails, -1
+        def first(self):
+            self.index = 0
+            return True
+        def next(self):
+            self.index += 1
+            return self.index < len(self.items)
+        def main(self):
+            return self.first()
+        def chunk(self):
+            return self.items[self.index]
+    res['func_tail_iterator_t'] = func_tail_iterator_t
+
+    ## comments
+    register('get_cmt', 'GetCommentEx')(lambda ea, repeatable: D.comments.get((ea, bool(repeatable)), None))
+    @register('set_cmt')
+    def set_cmt(ea, cmt, repeatable):
+        module.event(IDB_Hooks, 'changing_cmt', ea, repeatable, cmt)
+        res = D.set_comment(ea, cmt, repeatable)
+        module.event(IDB_Hooks, 'cmt_changed', ea, repeatable)
+        return res
+    register('get_extra_cmt')(lambda ea, what: None)
+
+    ## names
+    register('get_name', 'get_true_name', 'get_ea_name', 'get_visible_name', 'get_short_name', 'get_long_name')(lambda ea, *flags: D.names.get(ea, ''))
+    @register('set_name')
+    def set_name(ea, name, *flags):
+        module.event(IDP_Hooks, 'ev_rename', ea, name)
+        return D.set_name(ea, name)
+    register('get_name_ea')(lambda ea, name: next((item for item, string in D.names.items() if string == name), BADADDR))
+    register('demangle_name')(lambda name, *flags: None)
+    register('get_nlist_size')(lambda: len(D.names))
+    register('get_nlist_ea')(lambda index: sorted(D.names)[index])
+    register('get_nlist_name')(lambda index: D.names[sorted(D.names)[index]])
+    register('get_nlist_idx')(lambda ea: sorted(D.names).index(ea))
+    register('is_in_nlist')(lambda ea: ea in D.names)
+
+    ## cross-references
+    res['xrefblk_t'] = xrefblk_t
+    def first(items):
+        return items[0][0] if items else BADADDR
+    def following(items, current):
+        eas = [ea for ea, _ in items]
+        return eas[eas.index(current) + 1] if current in eas and eas.index(current) + 1 < len(eas) else BADADDR
+    register('get_first_cref_from')(lambda ea: first(D.crefs.get(('from', ea), [])))
+    register('get_next_cref_from')(lambda ea, current: following(D.crefs.get(('from', ea), []), current))
+    register('get_first_cref_to')(lambda ea: first(D.crefs.get(('to', ea), [])))
+    register('get_next_cref_to')(lambda ea, current: following(D.crefs.get(('to', ea), []), current))
+    register('get_first_dref_from')(lambda ea: first(D.drefs.get(('from', ea), [])))
+    register('get_next_dref_from')(lambda ea, current: following(D.drefs.get(('from', ea), []), current))
+    register('get_first_dref_to')(lambda ea: first(D.drefs.get(('to', ea), [])))
+    register('get_next_dref_to')(lambda ea, current: following(D.drefs.get(('to', ea), []), current))
+    register('get_first_fcref_from')(lambda ea: first([item for item in D.crefs.get(('from', ea), []) if item[1] != fl_F]))
+    register('get_first_fcref_to')(lambda ea: first([item for item in D.crefs.get(('to', ea), []) if item[1] != fl_F]))
+
+    ## user interface
+    register('get_screen_ea', 'ScreenEA')(lambda: D.screen)
+    register('jumpto')(lambda ea, *args: setattr(D, 'screen', ea) or True)
+    register('refresh_idaview_anyway', 'request_refresh', 'refresh_lists', 'refresh_choosers', 'beep', 'show_auto', 'showAuto', 'show_addr', 'showAddr', 'msg', 'replace_wait_box', 'show_wait_box', 'hide_wait_box')(lambda *args, **kwargs: None)
+    register('user_cancelled', 'wasBreak')(lambda: False)
+    register('auto_wait', 'autoWait', 'auto_is_ok', 'autoIsOk')(lambda: True)
+    register('get_current_viewer')(lambda: None)
+    register('register_timer')(lambda interval, callable: object())
+    register('unregister_timer')(lambda timer: True)
+    @register('notify_when')
+    def notify_when(when, callable):
+        for code in [NW_OPENIDB, NW_CLOSEIDB, NW_INITIDA, NW_TERMIDA]:
+            items = module.notifications.setdefault(code, [])
+            if when & code and when & NW_REMOVE:
+                items[:] = [item for item in items if item != callable]
+            elif when & code:
+                items.append(callable)
+            continue
+        return True
+    res.update(IDP_Hooks=IDP_Hooks, IDB_Hooks=IDB_Hooks, UI_Hooks=UI_Hooks, DBG_Hooks=DBG_Hooks, PluginForm=PluginForm)
+    res.update(range_t=range_t, area_t=area_t, segment_t=segment_t, func_t=func_t)
+
+    ## netnodes
+    res['netnode'] = netnode
+    def fetch(node):
+        if node.index == BADNODE:
+            raise ValueError("Unable to use a netnode with the identifier {:#x}.".format(node.index))
+        return D.node(node.index)
+
+    @register('new_netnode')
+    def new_netnode(*args):
+        if not args:
+            return netnode()
+        elif isinstance(args[0], six.integer_types):
+            return netnode(args[0])
+        name, _, create = (args + (None, False))[:3]
+        if name in D.nodenames:
+            return netnode(D.nodenames[name])
+        return netnode(D.new_node(name).index) if create else netnode()
+    register('delete_netnode')(lambda node: None)
+    register('netnode_index')(lambda node: node.index)
+    @register('netnode_kill')
+    def netnode_kill(node):
+        res = D.nodes.pop(node.index, None)
+        if res is not None and res.name is not None:
+            D.nodenames.pop(res.name, None)
+        return
+    register('netnode_get_name', 'netnode_name')(lambda node: fetch(node).name)
+    register('netnode_rename')(lambda node, name, *length: setattr(fetch(node), 'name', name) or D.nodenames.__setitem__(name, node.index) or True)
+    register('netnode_value_exists')(lambda node: fetch(node).value is not None)
+    register('netnode_valobj', 'netnode_valstr')(lambda node: fetch(node).value)
+    register('netnode_long_value')(lambda node: fetch(node).value or 0)
+    register('netnode_set', 'netnode_set_long')(lambda node, value: setattr(fetch(node), 'value', value) or True)
+    register('netnode_delvalue')(lambda node: setattr(fetch(node), 'value', None) or True)
+
+    def netnode_start(node):
+        if not D.nodes:
+            return False
+        node.index = min(D.nodes)
+        return True
+    def netnode_end(node):
+        if not D.nodes:
+            return False
+        node.index = max(D.nodes)
+        return True
+    def netnode_next(node):
+        items = sorted(index for index in D.nodes if index > node.index)
+        if not items:
+            return False
+        node.index = items[0]
+        return True
+    def netnode_prev(node):
+        items = sorted(index for index in D.nodes if index < node.index)
+        if not items:
+            return False
+        node.index = items[-1]
+        return True
+    res.update(netnode_start=netnode_start, netnode_end=netnode_end, netnode_next=netnode_next, netnode_prev=netnode_prev)
+
+    # blobs
+    register('netnode_blobsize')(lambda node, start, tag: len(fetch(node).blobs.get((start, tag), b'')))
+    register('netnode_getblob')(lambda node, start, tag: fetch(node).blobs.get((start, tag), None))
+    register('netnode_setblob')(lambda node, buffer, start, tag: fetch(node).blobs.__setitem__((start, tag), bytes(buffer)) or True)
+    register('netnode_delblob')(lambda node, start, tag: 1 if fetch(node).blobs.pop((start, tag), None) is not None else 0)
+
+    # sparse arrays that are keyed by an integer
+    def iterator(kind, default):
+        def first(node, tag=default):
+            res = fetch(node).array(tag).first()
+            return BADADDR if res is None else res
+        def last(node, tag=default):
+            res = fetch(node).array(tag).last()
+            return BADADDR if res is None else res
+        def next(node, index, tag=default):
+            res = fetch(node).array(tag).next(index)
+            return BADADDR if res is None else res
+        def prev(node, index, tag=default):
+            res = fetch(node).array(tag).prev(index)
+            return BADADDR if res is None else res
+        return {"netnode_{:s}{:s}".format(kind, name) : F for name, F in [('first', first), ('last', last), ('next', next), ('prev', prev)]}
+    [res.update(iterator(kind, tag)) for kind, tag in [('alt', atag), ('sup', stag), ('char', atag)]]
+    register('netnode_altval')(lambda node, index, tag=atag: fetch(node).array(tag).get(index, 0))
+    register('netnode_altset')(lambda node, index, value, tag=atag: fetch(node).array(tag).__setitem__(index, value) or True)
+    register('netnode_altdel')(lambda node, index, tag=atag: fetch(node).array(tag).pop(index, None) is not None)
+    register('netnode_charval')(lambda node, index, tag=atag: fetch(node).array(tag).get(index, 0))
+    register('netnode_charset')(lambda node, index, value, tag=atag: fetch(node).array(tag).__setitem__(index, value) or True)
+    register('netnode_chardel')(lambda node, index, tag=atag: fetch(node).array(tag).pop(index, None) is not None)
+    register('netnode_supval')(lambda node, index, tag=stag: fetch(node).array(tag).get(index, None))
+    register('netnode_supstr')(lambda node, index, tag=stag: fetch(node).array(tag).get(index, None))
+    register('netnode_supset')(lambda node, index, value, tag=stag: fetch(node).array(tag).__setitem__(index, bytes(value)) or True)
+    register('netnode_supdel')(lambda node, index, tag=stag: fetch(node).array(tag).pop(index, None) is not None)
+
+    # the sparse array that is keyed by a string
+    def hashfirst(node, tag=htag):
+        return fetch(node).array(tag).first()
+    def hashlast(node, tag=htag):
+        return fetch(node).array(tag).last()
+    def hashnext(node, key, tag=htag):
+        return fetch(node).array(tag).next(key)
+    def hashprev(node, key, tag=htag):
+        return fetch(node).array(tag).prev(key)
+    res.update(netnode_hashfirst=hashfirst, netnode_hashlast=hashlast, netnode_hashnext=hashnext, netnode_hashprev=hashprev)
+    register('netnode_hashval', 'netnode_hashstr', 'netnode_hashstr_buf')(lambda node, key, tag=htag: fetch(node).array(tag).get(key, None))
+    register('netnode_hashval_long')(lambda node, key, tag=htag: fetch(node).array(tag).get(key, 0) or 0)
+    register('netnode_hashset', 'netnode_hashset_buf', 'netnode_hashset_idx')(lambda node, key, value, tag=htag: fetch(node).array(tag).__setitem__(key, value) or True)
+    register('netnode_hashdel')(lambda node, key, tag=htag: fetch(node).array(tag).pop(key, None) is not None)
+    return {name : builtin(F) if isinstance(F, types.FunctionType) else F for name, F in res.items()}
+
+def lazy_module(root):
+    """Return the module type from the "idapythonrc.py" within `root` that is used for a module that is loaded when it is first used.
+
+    As the rest of "idapythonrc.py" can only be executed within IDA, only the
+    definition of the class is compiled from it.
+    """
+    path = os.path.join(root, 'idapythonrc.py')
+    with open(path, 'rU') as infile:
+        tree = ast.parse(infile.read(), path)
+    tree.body = [node for node in tree.body if isinstance(node, ast.ClassDef) and node.name == 'lazy_module']
+    namespace = {'__name__': 'idapythonrc', 'types': types}
+    exec(compile(tree, path, 'exec'), namespace)
+    return namespace['lazy_module']
+
+class loader(object):
+    """
+    This class is a loader that is similar to the ones that are defined within
+    "idapythonrc.py". It is used to expose each of the files in a directory
+    as a module, or as a submodule of a module that is also created. If `lazy`
+    is given, then it is the type used to create a module that is loaded when
+    it is first used.
+    """
+    sys = sys
+    def __init__(self, path, include='*.py', exclude=None, submodule=None, lazy=None):
+        self.path, self.include, self.exclude, self.submodule, self.lazy = path, include, exclude, submodule, lazy
+
+    def available(self):
+        '''Return a dictionary of the name of each module along with its path.'''
+        res = {}
+        if not os.path.isdir(self.path):
+            return res
+        for filename in fnmatch.filter(os.listdir(self.path), self.include):
+            if self.exclude and fnmatch.fnmatch(filename, self.exclude):
+                continue
+            name, _ = os.path.splitext(filename)
+            res[name[1:] if self.include.startswith('_') else name] = os.path.join(self.path, filename)
+        return res
+
+    def find_module(self, fullname, path=None):
+        if path is not None:
+            return None
+        elif self.submodule:
+            return self if fullname == self.submodule else None
+        return self if fullname in self.available() else None
+
+    def load(self, fullname, path):
+        with open(path, 'rU') as infile:
+            return imp.load_module(fullname, infile, path, ('.py', 'U', imp.PY_SOURCE))
+    new_api = load
+
+    def load_module(self, fullname):
+        if fullname in sys.modules:
+            return sys.modules[fullname]
+        elif not self.submodule and self.lazy:
+            res = sys.modules[fullname] = self.lazy(fullname, self, self.available()[fullname])
+            return res
+        elif not self.submodule:
+            return self.load(fullname, self.available()[fullname])
+
+        # if it's a submodule, then load every module that composes it. we
+        # iterate through them in the very same order as "idapythonrc.py"
+        # since some of them depend on the others having been loaded first.
+        res = sys.modules[fullname] = imp.new_module(fullname)
+        res.__package__ = fullname
+        for name, path in self.available().items():
+            try:
+                module = self.load('.'.join([fullname, name]), path)
+            except Exception:
+                logging.warning("{:s} : Unable to import module {:s} from {!s}".format(fullname, name, path), exc_info=True)
+            else:
+                setattr(res, name, module)
+            continue
+        return res
+
+def install(database, root=None, lazy=None):
+    """Install the stand-in for the specified `database` and the loaders for the plugin.
+
+    If `root` is specified, then use it as the path to the plugin. If `lazy`
+    is specified, then it determines whether the public api is loaded when it
+    is first used instead of the ``MINSC_LAZY`` environment variable.
+    """
+    root = root or os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    lazy = os.getenv('MINSC_LAZY', '1').lower() not in {'0', 'no', 'false', 'off'} if lazy is None else lazy
+    module.database = database
+
+    # create the idaapi module along with the other modules that are aliased to it.
+    idaapi = sys.modules['idaapi'] = module('idaapi')
+    constants = ((name, value) for name, value in globals().items() if isinstance(value, six.integer_types + six.string_types) and not name.startswith('_'))
+    for name, value in itertools.chain(constants, api(database).items()):
+        setattr(idaapi, name, value)
+    for name in ['idc', 'ida_idaapi', 'ida_kernwin', 'ida_diskio']:
+        sys.modules[name] = idaapi
+    sys.modules['ida'] = module('ida')
+
+    # now we can add the loaders (in the same order as "idapythonrc.py").
+    sys.meta_path.append(loader(os.path.join(root, 'base'), include='_*.py', submodule='internal'))
+    cls = lazy_module(root) if lazy else None
+    sys.meta_path.append(loader(os.path.join(root, 'base'), exclude='_*.py', lazy=cls))
+    sys.meta_path.append(loader(os.path.join(root, 'misc'), lazy=cls))
+    for subdir in ['custom', 'app']:
+        sys.meta_path.append(loader(os.path.join(root, subdir), submodule=subdir))
+    return idaapi
+
+def boot(root=None):
+    """Load the root namespace of the plugin and notify it that IDA has started.
+
+    This is the same thing that "idapythonrc.py" does when IDA starts, and
+    will result in all of the hooks from "misc/hooks.py" being installed.
+    """
+    root = root or os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    res = imp.load_source('__root__', os.path.join(root, '__root__.py'))
+    module.notify(NW_INITIDA)
+    return res
+
+def open_database(new=True):
+    """Dispatch the events that IDA dispatches when a database is opened.
+
+    If `new` is true, then the events are for a database that was just
+    created and will result in the tag cache being built once the auto
+    queue is empty. Otherwise, the events are for an existing database.
+    """
+    path = os.path.join(os.getcwd(), 'standin.idb')
+    module.notify(NW_OPENIDB, not new)
+    module.event(IDP_Hooks, 'ev_init', 'metapc')
+    module.event(IDP_Hooks, 'ev_newprc', 0, False)
+    module.event(IDP_Hooks, 'ev_newfile' if new else 'ev_oldfile', path)
+    module.event(IDP_Hooks, 'ev_auto_queue_empty', AU_FINAL)
+    module.event(UI_Hooks, 'database_inited', not new, path)
+    return
+
+def annotate(database):
+    """Re-apply the global comments and the function comments from `database` so that the hooks will see them.
+
+    When a new database is opened, the tag cache is only built for the contents
+    of each function. Any of the other comments would have been entered by the
+    user at some point, so this re-applies them just like a user would.
+    """
+    api = sys.modules['idaapi']
+    for (ea, repeatable), string in sorted(database.comments.items()):
+        if database.func(ea) is None:
+            database.set_comment(ea, None, repeatable)
+            api.set_cmt(ea, string, repeatable)
+        continue
+    for (ea, repeatable), string in sorted(database.function_comments.items()):
+        database.function_comments.pop((ea, repeatable))
+        api.set_func_cmt(database.func(ea), string, repeatable)
+    return
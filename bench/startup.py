@@ -0,0 +1,80 @@
+"""
+Startup benchmark
+
+This script reports how long each of the modules belonging to the
+plugin took to load when IDA started. The load time of a module includes
+the time spent loading any of the modules that it imported. Alongside the load time of each
+module, it also reports the time spent generating the documentation for
+the functions decorated with ``utils.multicase`` within the module. The
+time it takes to regenerate the documentation of every case whenever a
+case is added (which is how it was done prior to the documentation for
+each case being saved) is compared against the time it takes to generate
+the documentation for each case only once.
+
+As this script requires the modules to have been loaded by the loaders
+from "idapythonrc.py", it is intended to be executed from the IDAPython
+prompt as follows::
+
+    > exec(open('bench/startup.py').read())
+
+"""
+
+import sys, six, time
+import internal
+from internal import utils
+
+def timings():
+    '''Return a dictionary of the number of seconds that it took to load each module.'''
+    loaders = [loader for loader in sys.meta_path if isinstance(getattr(loader, 'timings', None), dict)]
+    return {name : elapsed for loader in loaders for name, elapsed in loader.timings.items()}
+
+def wrappers(module):
+    '''Yield each multicased function that is defined within the specified `module`.'''
+    visited, stack = set(), [module.__dict__]
+    while stack:
+        namespace = stack.pop()
+        for item in namespace.values():
+            item = getattr(item, '__func__', item)
+            if id(item) in visited or getattr(item, '__module__', None) != module.__name__:
+                continue
+            visited.add(id(item))
+
+            if isinstance(item, six.class_types):
+                stack.append(item.__dict__)
+            elif hasattr(item, utils.multicase.cache_name):
+                yield item
+            continue
+        continue
+    return
+
+def document(F, cached):
+    '''Return the number of seconds spent documenting each case of `F` as it is added.'''
+    name, cache = F.__name__, [item for _, item in getattr(F, utils.multicase.cache_name)]
+    rendered = {} if cached else None
+
+    ts = time.time()
+    for index in six.moves.range(len(cache)):
+        utils.multicase.document(name, cache[:1 + index], rendered)
+    return time.time() - ts
+
+def run():
+    '''Report the load time and the documentation time for each module that was loaded.'''
+    results = []
+    for name, elapsed in sorted(timings().items(), key=lambda item: item[1], reverse=True):
+        module = sys.modules.get(name, None)
+        Fs = [] if module is None else [F for F in wrappers(module)]
+        before, after = (sum(document(F, cached) for F in Fs) for cached in [False, True])
+        results.append((name, elapsed, len(Fs), before, after))
+
+    six.print_(u"{:<32s} {:>10s} {:>10s} {:>12s} {:>12s}".format('module', 'load', 'multicase', 'docs-before', 'docs-after'))
+    for name, elapsed, count, before, after in results:
+        six.print_(u"{:<32s} {:>9.3f}s {:>10d} {:>11.3f}s {:>11.3f}s".format(name, elapsed, count, before, after))
+
+    # the load time for a module includes the modules that it imported, so
+    # we only total the time that was spent on documentation.
+    before, after = (sum(item) for item in zip(*[(before, after) for _, _, _, before, after in results] or [(0., 0.)]))
+    six.print_(u"{:<32s} {:>10s} {:>10s} {:>11.3f}s {:>11.3f}s".format('total', '', '', before, after))
+    return results
+
+if __name__ == '__main__':
+    run()
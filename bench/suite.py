@@ -0,0 +1,489 @@
+"""
+Benchmark suite
+
+This script measures a number of the hot paths of the plugin without IDA
+by loading the real modules from the "base", "misc", and "custom" directories
+against the synthetic database from "bench/standin.py". Each benchmark is run
+against a database containing a specific number of heads, and its results are
+written as JSON so that they can be saved as a baseline and then compared
+against later::
+
+    $ python2 bench/suite.py --size 10000 --save
+    $ python2 bench/suite.py --size 10000 --compare
+
+If more than one size is given, then each one is measured in its own process
+since the stand-in can only be installed once. The benchmarks that are run can
+be chosen by specifying their names as the remaining arguments.
+
+The time it takes to load the root namespace is reported as "boot". Like
+"idapythonrc.py", the public api is loaded when it is first used unless the
+``MINSC_LAZY`` environment variable is set to 0, so both can be compared::
+
+    $ python2 bench/suite.py multicase
+    $ MINSC_LAZY=0 python2 bench/suite.py multicase
+"""
+
+import sys, os, json, time, platform, subprocess, argparse
+import itertools, functools, operator, collections, logging, timeit, contextlib
+
+import standin
+
+BASELINES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines')
+
+class benchmark(object):
+    """
+    This namespace contains each of the available benchmarks. A benchmark is
+    a function that is given the stand-in database and returns a callable
+    along with the number of operations that the callable performs.
+    """
+    available = collections.OrderedDict()
+
+    def __new__(cls, name):
+        def decorate(F):
+            cls.available[name] = F
+            return F
+        return decorate
+
+    @classmethod
+    def measure(cls, name, database, repeat=3):
+        '''Run the benchmark `name` against `database` for `repeat` times and return its results.'''
+        F, count = cls.available[name](database)
+        timings = []
+        for _ in range(repeat):
+            ts = timeit.default_timer()
+            F()
+            timings.append(timeit.default_timer() - ts)
+        best = min(timings)
+        return {
+            'operations': count,
+            'best': best,
+            'median': sorted(timings)[len(timings) // 2],
+            'rate': count / best if best else float('inf'),
+        }
+
+@contextlib.contextmanager
+def quiet():
+    '''Discard anything that is written to stdout or stderr.'''
+    stdout, stderr = sys.stdout, sys.stderr
+
+    # We never close this file since some of the modules will keep a
+    # reference to whatever stderr was at the time they were loaded.
+    sys.stdout = sys.stderr = quiet.null = getattr(quiet, 'null', None) or open(os.devnull, 'w')
+    try:
+        yield
+    finally:
+        sys.stdout, sys.stderr = stdout, stderr
+    return
+
+def sample(items, count):
+    '''Return at most `count` items distributed evenly throughout `items`.'''
+    step = max(1, len(items) // count)
+    return items[::step][:count]
+
+@benchmark('multicase')
+def multicase(D):
+    '''Dispatch a handful of multicased functions with an address.'''
+    import database, function
+    heads = sample(D.heads[:-1], 20000)
+    functions = [fn.start_ea for fn in D.functions()][:len(heads)]
+    def run():
+        for ea in heads:
+            database.comment(ea)
+            database.address.next(ea)
+        for ea in functions:
+            function.address(ea)
+        return
+    return run, 2 * len(heads) + len(functions)
+
+@benchmark('comment.decode')
+def comment_decode(D):
+    '''Decode every comment in the database into its tags.'''
+    import internal
+    comments = [internal.utils.string.of(item) for _, item in sorted(D.comments.items())]
+    def run():
+        [internal.comment.decode(item) for item in comments]
+    return run, len(comments)
+
+@benchmark('comment.encode')
+def comment_encode(D):
+    '''Encode the tags of every comment in the database.'''
+    import internal
+    decoded = [internal.comment.decode(internal.utils.string.of(item)) for _, item in sorted(D.comments.items())]
+    def run():
+        [internal.comment.encode(item) for item in decoded]
+    return run, len(decoded)
+
+@benchmark('contents.inc/dec')
+def contents_incdec(D):
+    '''Increment and then decrement the reference count for a tag within each function.'''
+    import internal
+    items = sample([ea for ea in D.heads if D.func(ea)], 5000)
+    def run():
+        for ea in items:
+            internal.comment.contents.inc(ea, u'benchmark')
+        for ea in items:
+            internal.comment.contents.dec(ea, u'benchmark')
+        return
+    return run, 2 * len(items)
+
+@benchmark('contents.batch')
+def contents_batch(D):
+    '''Increment and then decrement the reference count for a tag within each function in a batch.'''
+    import internal
+    items = sample([ea for ea in D.heads if D.func(ea)], 5000)
+    def run():
+        with internal.comment.contents.batch():
+            for ea in items:
+                internal.comment.contents.inc(ea, u'benchmark')
+            for ea in items:
+                internal.comment.contents.dec(ea, u'benchmark')
+            pass
+        return
+    return run, 2 * len(items)
+
+@benchmark('contents.shards')
+def contents_shards(D):
+    '''Increment and then decrement the reference count for a tag at thousands of addresses within a single function.'''
+    import random, internal
+    key, count = D.functions()[0].start_ea, 0x10 * internal.comment.contents.threshold
+    items = random.Random(count).sample(range(key, key + 0x10 * count), count)
+    def run():
+        for ea in items:
+            internal.comment.contents.inc(ea, u'benchmark', target=key)
+        for ea in items:
+            internal.comment.contents.dec(ea, u'benchmark', target=key)
+        return
+    return run, 2 * len(items)
+
+@benchmark('globals.inc/dec')
+def globals_incdec(D):
+    '''Increment and then decrement the reference count for a global tag.'''
+    import internal
+    items = sample(D.heads, 5000)
+    def run():
+        for ea in items:
+            internal.comment.globals.inc(ea, u'benchmark')
+        for ea in items:
+            internal.comment.globals.dec(ea, u'benchmark')
+        return
+    return run, 2 * len(items)
+
+def rewrite_comments(D, deferred):
+    '''Return a callable that rewrites and then restores the comments at a number of addresses within functions through the hooks.'''
+    import idaapi, internal
+    items = sample([ea for ea in D.heads if D.func(ea)], 2000)
+    original = [idaapi.get_cmt(ea, False) or '' for ea in items]
+    def run():
+        deferred and internal.comment.deferred.enable(interval=0)
+        try:
+            for ea, string in zip(items, original):
+                idaapi.set_cmt(ea, "[benchmark] {:d}\n[rewritten] 1".format(ea), False)
+            for ea, string in zip(items, original):
+                idaapi.set_cmt(ea, string, False)
+        finally:
+            deferred and internal.comment.deferred.disable()
+        return
+    return run, 2 * len(items)
+
+@benchmark('hooks.comments')
+def hooks_comments(D):
+    '''Rewrite the comments at a number of addresses updating the tag cache for each one.'''
+    return rewrite_comments(D, False)
+
+@benchmark('hooks.comments.deferred')
+def hooks_comments_deferred(D):
+    '''Rewrite the comments at a number of addresses deferring the updates to the tag cache.'''
+    return rewrite_comments(D, True)
+
+@benchmark('hooks.rebase')
+def hooks_rebase(D):
+    '''Rebase the tag cache for every segment in the database onto the same address.'''
+    import hooks
+    class segment(object):
+        def __init__(self, start, end):
+            self._from, self.to, self.size = start, start, end - start
+    class info(list):
+        def size(self):
+            return len(self)
+    segments = info(segment(seg.start_ea, seg.end_ea) for _, seg in D.segments)
+    def run():
+        with quiet():
+            hooks.rebase(segments)
+        return
+    return run, len(D.functions())
+
+@benchmark('hooks.segm_moved')
+def hooks_segm_moved(D):
+    '''Relocate the tag cache for the last segment in the database onto the same address.'''
+    import hooks
+    _, seg = D.segments[-1]
+    def run():
+        with quiet():
+            hooks.segm_moved(seg.start_ea, seg.start_ea, seg.end_ea - seg.start_ea)
+        return
+    return run, len([ea for ea, _ in D.comments if seg.start_ea <= ea < seg.end_ea])
+
+@benchmark('prioritybase.apply')
+def prioritybase_apply(D):
+    '''Dispatch an event to a priority hook with a number of callables attached to it.'''
+    import idaapi, internal
+    hook = internal.interface.priorityhook(idaapi.IDB_Hooks)
+    def callable(index):
+        def callback(*parameters):
+            return
+        return callback
+    callables = [callable(index) for index in range(8)]
+    [hook.add('byte_patched', F, priority) for priority, F in enumerate(callables)]
+    hook.hook()
+    count = 20000
+    def run():
+        for ea in range(count):
+            hook.object.byte_patched(ea, 0)
+        return
+    return run, count
+
+@benchmark('prioritybase.overhead')
+def prioritybase_overhead(D):
+    '''Dispatch an event to a priority hook with a single callable to measure the overhead of dispatching.'''
+    import idaapi, internal
+    hook = internal.interface.priorityhook(idaapi.IDB_Hooks)
+    hook.add('byte_patched', lambda *parameters: None, 0)
+    hook.hook()
+    count = 50000
+    def run():
+        for ea in range(count):
+            hook.object.byte_patched(ea, 0)
+        return
+    return run, count
+
+@benchmark('prioritybase.profile')
+def prioritybase_profile(D):
+    '''Dispatch an event to a priority hook with a number of callables attached to it while collecting statistics.'''
+    import idaapi, internal
+    hook = internal.interface.priorityhook(idaapi.IDB_Hooks)
+    def callable(index):
+        def callback(*parameters):
+            return
+        return callback
+    callables = [callable(index) for index in range(8)]
+    [hook.add('byte_patched', F, priority) for priority, F in enumerate(callables)]
+    hook.profile(True)
+    hook.hook()
+    count = 20000
+    def run():
+        for ea in range(count):
+            hook.object.byte_patched(ea, 0)
+        return
+    return run, count
+
+@benchmark('database.functions')
+def database_functions(D):
+    '''Iterate through all of the functions in the database.'''
+    import database
+    def run():
+        [ea for ea in database.functions()]
+    return run, len(D.functions())
+
+@benchmark('database.tag')
+def database_tag(D):
+    '''Read the tags from every address that has a comment.'''
+    import database
+    items = sorted({ea for ea, _ in D.comments})
+    def run():
+        [database.tag(ea) for ea in items]
+    return run, len(items)
+
+@benchmark('database.tag.key')
+def database_tag_key(D):
+    '''Read a single tag from every address that has a comment.'''
+    import database
+    items = sorted({ea for ea, _ in D.comments})
+    def run():
+        for ea in items:
+            try:
+                database.tag(ea, u'note')
+            except Exception:
+                pass
+            continue
+        return
+    return run, len(items)
+
+@benchmark('database.select')
+def database_select(D):
+    '''Query the global tags for each tag name and for every pair of them.'''
+    import itertools, database, internal
+    names = sorted(name for name in internal.comment.globals.name() if not name.startswith('__'))
+    queries = [[name] for name in names] + [list(pair) for pair in itertools.combinations(names, 2)]
+    def run():
+        with quiet():
+            [[ea for ea, _ in database.select(And=query)] for query in queries]
+        return
+    return run, len(queries)
+
+@benchmark('database.selectcontents')
+def database_selectcontents(D):
+    '''Query the contents of every function for each tag name and for every pair of them.'''
+    import itertools, database, internal
+    names = sorted({name for ea, _ in internal.comment.contents.iterate() for name in internal.comment.contents.name(ea)})
+    queries = [[name] for name in names] + [list(pair) for pair in itertools.combinations(names, 2)]
+    def run():
+        with quiet():
+            [[ea for ea, _ in database.selectcontents(And=query)] for query in queries]
+        return
+    return run, len(queries)
+
+@benchmark('database.address.nexttag')
+def database_address_nexttag(D):
+    '''Walk forwards and then backwards through every tagged address in the database.'''
+    import database
+    items = sorted({ea for ea, _ in D.comments})
+    def run():
+        [database.address.nexttag(ea) for ea in items[:-1]]
+        [database.address.prevtag(ea) for ea in items[1:]]
+    return run, 2 * (len(items) - 1)
+
+@benchmark('database.tags.range')
+def database_tags_range(D):
+    '''List the tags for every address within each function in the database.'''
+    import database
+    bounds = [(fn.start_ea, fn.end_ea) for fn in D.functions()]
+    def run():
+        [[ea for ea, _ in database.tags.range(left, right)] for left, right in bounds]
+    return run, len(bounds)
+
+@benchmark('custom.tagfix.verify')
+def custom_tagfix_verify(D):
+    '''Verify the tag cache for every function and global address in the database.'''
+    import custom
+    def run():
+        custom.tagfix.verify.reset()
+        custom.tagfix.verify.step(heads=len(D.heads), addresses=len(D.heads))
+    return run, len(D.functions()) + len(D.heads)
+
+@benchmark('custom.tags.export')
+def custom_tags_export(D):
+    '''Export all of the tags in the database using the tag cache.'''
+    import custom
+    def run():
+        with quiet():
+            Globals, Contents, Frames = custom.tags.export()
+        return
+    return run, len(D.comments)
+
+def measure(size, names, repeat=3, seed=0x1234):
+    '''Return the results for each of the benchmarks in `names` against a database composed of `size` heads.'''
+    ts = timeit.default_timer()
+    D = standin.database.generate(size, seed=seed)
+    standin.install(D)
+    generated = timeit.default_timer() - ts
+
+    # Loading the root namespace is what IDA does at startup, so we measure
+    # it by itself. Each module that is loaded lazily isn't included.
+    ts = timeit.default_timer()
+    with quiet():
+        standin.boot()
+    results = collections.OrderedDict()
+    results['boot'] = {'operations': 1, 'best': timeit.default_timer() - ts}
+    results['boot']['median'] = results['boot']['best']
+    results['boot']['rate'] = results['boot']['operations'] / results['boot']['best']
+
+    # Opening the database will prebuild the tag cache, so we measure it too.
+    ts = timeit.default_timer()
+    with quiet():
+        standin.open_database(new=True)
+    results['prebuild'] = {'operations': len(D.functions()), 'best': timeit.default_timer() - ts}
+    results['prebuild']['median'] = results['prebuild']['best']
+    results['prebuild']['rate'] = results['prebuild']['operations'] / results['prebuild']['best']
+
+    # Now we can apply the rest of the comments in the database through the
+    # hooks in order to populate the globals in the tag cache.
+    ts = timeit.default_timer()
+    with quiet():
+        standin.annotate(D)
+    results['annotate'] = {'operations': len(D.comments) + len(D.function_comments), 'best': timeit.default_timer() - ts}
+    results['annotate']['median'] = results['annotate']['best']
+    results['annotate']['rate'] = results['annotate']['operations'] / results['annotate']['best']
+
+    for name in names:
+        results[name] = benchmark.measure(name, D, repeat=repeat)
+
+    return {
+        'size': size,
+        'heads': len(D.heads),
+        'functions': len(D.functions()),
+        'comments': len(D.comments),
+        'generated': generated,
+        'python': platform.python_version(),
+        'results': results,
+    }
+
+def baseline(size):
+    '''Return the path to the baseline for a database composed of `size` heads.'''
+    return os.path.join(BASELINES, "{:d}.json".format(size))
+
+def report(result, previous=None):
+    '''Write the specified `result` to stdout comparing it against the result in `previous` if provided.'''
+    sys.stdout.write("size={size:d} heads={heads:d} functions={functions:d} comments={comments:d}\n".format(**result))
+    for name, item in result['results'].items():
+        line = "{:<20s} {:>12.6f}s {:>14.1f}/s".format(name, item['best'], item['rate'])
+        if previous and name in previous['results']:
+            ratio = previous['results'][name]['best'] / item['best'] if item['best'] else float('inf')
+            line += "  {:>6.2f}x baseline".format(ratio)
+        sys.stdout.write(line + '\n')
+    return
+
+def main(arguments):
+    parser = argparse.ArgumentParser(description='Measure the plugin against a synthetic database.')
+    parser.add_argument('names', nargs='*', help='the benchmarks to run (default: all)')
+    parser.add_argument('--size', type=int, action='append', help='the number of heads in the database (default: 10000)')
+    parser.add_argument('--repeat', type=int, default=3, help='the number of times to repeat each benchmark')
+    parser.add_argument('--save', action='store_true', help='save the results as the baseline for each size')
+    parser.add_argument('--compare', action='store_true', help='compare the results against the baseline for each size')
+    parser.add_argument('--json', action='store_true', help='write the results as json')
+    parser.add_argument('--list', action='store_true', help='list the available benchmarks')
+    res = parser.parse_args(arguments)
+
+    if res.list:
+        [sys.stdout.write("{:<20s} {:s}\n".format(name, F.__doc__)) for name, F in benchmark.available.items()]
+        return 0
+
+    names = res.names or [name for name in benchmark.available]
+    unknown = [name for name in names if name not in benchmark.available]
+    if unknown:
+        parser.error("unknown benchmark: {:s}".format(', '.join(unknown)))
+    sizes = res.size or [10000]
+
+    # If we were given more than one size, then run ourselves for each one.
+    if len(sizes) > 1:
+        options = [option for option, enabled in [('--save', res.save), ('--compare', res.compare), ('--json', res.json)] if enabled]
+        for size in sizes:
+            subprocess.check_call([sys.executable, os.path.abspath(__file__), '--size', str(size), '--repeat', str(res.repeat)] + options + names)
+        return 0
+
+    # Configure logging before any of the modules are loaded so that errors
+    # are still written to stderr when we discard the output of the plugin.
+    logging.basicConfig(level=logging.ERROR)
+    [size] = sizes
+    result = measure(size, names, repeat=res.repeat)
+
+    previous = None
+    if res.compare and os.path.exists(baseline(size)):
+        with open(baseline(size)) as infile:
+            previous = json.load(infile)
+
+    if res.json:
+        json.dump(result, sys.stdout, indent=2, sort_keys=True, separators=(',', ': '))
+        sys.stdout.write('\n')
+    else:
+        report(result, previous)
+
+    if res.save:
+        os.path.isdir(BASELINES) or os.makedirs(BASELINES)
+        with open(baseline(size), 'w') as outfile:
+            json.dump(result, outfile, indent=2, sort_keys=True, separators=(',', ': '))
+            outfile.write('\n')
+        return 0
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
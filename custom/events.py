@@ -0,0 +1,133 @@
+"""
+Events module
+
+This module is provided to a user to allow one to record the events that
+are dispatched by IDA to each of the components that are hooked by the
+``ui.hook`` namespace. Each event is written to a file along with the number
+of seconds since the recording was started, the name of its component, and
+its parameters after converting them into plain values. The file can then be
+replayed outside of IDA against the hooks from "misc/hooks.py" with the
+stand-in by using "bench/replay.py".
+
+If the path for the recording ends in ".gz", then it will be compressed.
+
+To record the events during an analysis session to a file::
+
+    > custom.events.recorder.start('events.json.gz')
+    > custom.events.recorder.stop()
+
+To read the events that were recorded to a file::
+
+    > header, events = custom.events.load('events.json.gz')
+    > for elapsed, component, name, parameters in events: ...
+
+"""
+
+import six, sys, logging
+import functools, operator, itertools, types
+import json, gzip, time
+
+import ui
+import internal
+
+import idaapi
+
+version = 1
+
+def encode(value):
+    '''Convert the parameter `value` of an event into a plain value that can be written to a file.'''
+    if value is None or isinstance(value, (bool, float) + six.integer_types + (six.text_type,)):
+        return value
+    elif isinstance(value, bytes):
+        return value.decode('utf8', 'replace')
+    elif isinstance(value, (list, tuple)):
+        return [encode(item) for item in value]
+
+    # anything that has boundaries (a segment, function, or area) is written
+    # as its boundaries along with its flags if it has any.
+    cls = value.__class__
+    if any(hasattr(value, attribute) for attribute in ['start_ea', 'startEA']):
+        res = {'type': cls.__name__, 'start': internal.interface.range.start(value), 'end': internal.interface.range.end(value)}
+        res.update({'flags': value.flags} if isinstance(getattr(value, 'flags', None), six.integer_types) else {})
+        return res
+
+    # the information for the segments that were moved has an item for each one.
+    elif hasattr(value, 'size') and hasattr(value, '__getitem__') and cls.__name__.startswith('segm_move_info'):
+        return {'type': cls.__name__, 'items': [[value[index]._from, value[index].to, value[index].size] for index in range(value.size())]}
+    return {'type': cls.__name__, 'repr': "{!r}".format(value)}
+
+def open_file(path, mode):
+    '''Open the file at `path` with the specified `mode` compressing it if its name ends in ".gz".'''
+    return gzip.open(path, mode) if path.endswith('.gz') else open(path, mode)
+
+def load(path):
+    """Load the recording from the file at `path`.
+
+    Returns the tuple `(header, events)` where `header` is a dictionary
+    describing the recording and `events` yields the tuple `(elapsed,
+    component, name, parameters)` for each event that was recorded.
+    """
+    fp = open_file(path, 'rb')
+    header = json.loads(fp.readline().decode('utf8'))
+    if header.get('version', None) != version:
+        fp.close()
+        raise internal.exceptions.InvalidTypeOrValueError(u"{:s}.load({!r}) : The version of the recording ({!r}) is not supported ({:d}).".format(__name__, path, header.get('version', None), version))
+
+    def events(fp):
+        with fp:
+            for line in fp:
+                elapsed, component, name, parameters = json.loads(line.decode('utf8'))
+                yield elapsed, component, name, parameters
+            pass
+        return
+    return header, events(fp)
+
+class recorder(object):
+    """
+    This namespace is used to write each event that is dispatched to the
+    components of ``ui.hook`` to a file while it is recording. The file
+    begins with a header that describes the recording and is followed by
+    an event for each line.
+    """
+    file, started, count = None, None, 0
+
+    @classmethod
+    def start(cls, path, **attributes):
+        '''Start recording the events to the file at `path` with any `attributes` added to its header.'''
+        if cls.file is not None:
+            raise internal.exceptions.InvalidTypeOrValueError(u"{:s}.start({!r}) : Unable to start recording due to already recording to {!r}.".format('.'.join([__name__, cls.__name__]), path, cls.file.name))
+
+        cls.file, cls.started, cls.count = open_file(path, 'wb'), time.time(), 0
+        header = {'version': version, 'started': cls.started, 'ida': idaapi.__version__, 'database': idaapi.get_root_filename()}
+        header.update(attributes)
+        cls.write(header)
+        ui.hook.record(cls.event)
+        return True
+
+    @classmethod
+    def stop(cls):
+        '''Stop recording the events and return how many of them were recorded.'''
+        if cls.file is None:
+            return 0
+        ui.hook.record(None)
+        cls.file.close()
+        cls.file, count = None, cls.count
+        six.print_(u"Recorded {:d} event{:s} over {:.3f}s.".format(count, '' if count == 1 else 's', time.time() - cls.started), file=sys.stderr)
+        return count
+
+    @classmethod
+    def write(cls, item):
+        '''Write the specified `item` to the file being recorded to on its own line.'''
+        data = json.dumps(item, separators=(',', ':'))
+        cls.file.write((data + '\n').encode('utf8'))
+
+    @classmethod
+    def event(cls, component, name, parameters):
+        '''Write the event `name` for `component` along with its `parameters` to the file being recorded to.'''
+        try:
+            cls.write([round(time.time() - cls.started, 6), component, name, encode(parameters)])
+        except Exception as E:
+            logging.warning(u"{:s}.event({!r}, {!r}) : An exception {!r} was raised while trying to record the event.".format('.'.join([__name__, cls.__name__]), component, name, E), exc_info=True)
+        else:
+            cls.count += 1
+        return
@@ -17,9 +17,22 @@ Likewise to rebuild the cache for just the globals or the contents::
     > custom.tagfix.globals()
     > custom.tagfix.contents()
 
+To rebuild the index of the addresses containing each tag name::
+
+    > custom.tagfix.index()
+
+To re-write the cache for the contents using a different codec::
+
+    > custom.tagfix.migrate('zlib', 1)
+
+To continuously verify (and repair) the cache a few heads at a time::
+
+    > custom.tagfix.verify.start(repair=True)
+    > custom.tagfix.verify.stop()
+
 """
 
-import six, sys, logging
+import six, sys, logging, collections
 import functools, operator, itertools, types
 
 import database as db, function as func, ui
@@ -222,10 +235,413 @@ def extracomments():
         if count: [ ctx.inc(ea, '__extra_suffix__') for i in range(count) ]
     return
 
+def names(ea, F):
+    '''Yield the name of each tag that is referenced at the address `ea` using `F` to fetch its comments.'''
+    repeatable, nonrepeatable = (F(ea, repeatable=item) for item in [True, False])
+    for items in map(internal.comment.decode, [repeatable, nonrepeatable]):
+        for name in items:
+            yield name
+        continue
+    if db.type.has_customname(ea):
+        yield '__name__'
+    for name, where in [('__extra_prefix__', idaapi.E_PREV), ('__extra_suffix__', idaapi.E_NEXT)]:
+        for i in range(db.extra.__count__(ea, where) or 0):
+            yield name
+        continue
+    return
+
+def index():
+    '''Re-build the index of the addresses and functions containing each tag name in the database.'''
+    Globals, Contents, Locations = internal.comment.globals.index, internal.comment.contents.index, internal.comment.contents.locations
+
+    # the contents already has the reference count for each tag name, so we
+    # only need to copy them into the index for each function. the addresses
+    # for each function are also there, but we need to decode their tags.
+    Contents.initialize(), Locations.initialize()
+    functions = [ea for ea, _ in internal.comment.contents.iterate()]
+    for i, ea in enumerate(functions):
+        six.print_(u"index: updating contents for function {:#x} : {:d} of {:d}".format(ea, i, len(functions)), file=output)
+        state = internal.comment.contents._read(ea, ea) or {}
+        [ Contents.set(ea, name, count) for name, count in state.get(internal.comment.tagging.__tags__, {}).items() ]
+        [ Locations.inc(item, name) for item in sorted(state.get(internal.comment.tagging.__address__, {})) for name in names(item, db.comment) ]
+
+    # the globals only have the reference count for each address, so we need
+    # to decode the tags at each address in order to count their names.
+    Globals.initialize()
+    addresses = internal.comment.globals.address()
+    six.print_(u"index: updating {:d} global address{:s}".format(len(addresses), '' if len(addresses) == 1 else 'es'), file=output)
+    for ea in addresses:
+        ui.navigation.auto(ea)
+        F = func.comment if func.within(ea) and func.address(ea) == ea else db.comment
+        [ Globals.inc(ea, name) for name in names(ea, F) ]
+    return len(functions), len(addresses)
+
+class verify(object):
+    """
+    This namespace is used to incrementally verify the cache against the
+    tags that are decoded from the comments in the database. Each time it
+    is stepped, only a bounded number of heads within functions and global
+    addresses are checked. As the tags for a function are totaled, each
+    function is checked as a whole until the number of heads is reached.
+    The position of each is kept in the netnode specified by
+    `verify.__node__` so that verification resumes from where it left off
+    when the database is opened again. When the end of the database has
+    been reached, the position wraps back around to the beginning.
+
+    The implicit tags (such as "__name__") are not verified. The reference
+    count of each address is only checked to be at least the number of tags
+    that were decoded from its comments and to not reference an address
+    without any tags. If the index of the cache is ready, then the reference
+    count for each tag name that was decoded or that the index contains at
+    each address is also checked against it.
+
+    Each mismatch is a tuple of the form `(kind, address, name, stored,
+    expected)` where `kind` is either "contents" or "globals" and `name` is
+    ``None`` if the mismatch is for the reference count of the address.
+    The most recent mismatches are kept in `verify.mismatches`.
+
+    To verify the next few heads and addresses, or to do it from a timer::
+
+        > res = custom.tagfix.verify.step(heads=0x800, addresses=0x400)
+        > custom.tagfix.verify.start(interval=1000, repair=True)
+        > custom.tagfix.verify.stop()
+
+    """
+
+    # netnode(name).alt[0] = address of the next function to verify
+    # netnode(name).alt[1] = address of the next global to verify
+    # netnode(name).alt[2] = number of times the database was verified
+
+    __node__ = '$ tagfix verify'
+    __function__, __address__, __passes__ = 0, 1, 2
+
+    # the default number of items that are verified for each tick of the timer
+    heads, addresses, interval = 0x400, 0x400, 1000
+
+    mismatches = collections.deque(maxlen=0x400)
+    running, repair = False, False
+
+    @classmethod
+    def node(cls):
+        '''Return the netnode containing the position of the verifier creating it if necessary.'''
+        node = internal.netnode.get(cls.__node__)
+        return internal.netnode.new(cls.__node__) if node == idaapi.BADADDR else node
+
+    @classmethod
+    def cursor(cls):
+        '''Return the address of the next function and the next global address that will be verified.'''
+        node, (left, _) = cls.node(), db.config.bounds()
+        function, address = (internal.netnode.alt.get(node, index) for index in [cls.__function__, cls.__address__])
+        return function or left, address or left
+
+    @classmethod
+    def reset(cls):
+        '''Reset the position of the verifier back to the beginning of the database.'''
+        node = cls.node()
+        [ internal.netnode.alt.remove(node, index) for index in [cls.__function__, cls.__address__, cls.__passes__] ]
+        cls.mismatches.clear()
+
+    @staticmethod
+    def implicit(name):
+        '''Return whether the tag `name` is an implicit tag that is not verified.'''
+        return name.startswith('__') and name.endswith('__')
+
+    @classmethod
+    def decode(cls, ea, F):
+        '''Return the number of references (``dict``) for each tag name that is decoded from the comments at `ea` using `F` to fetch them.'''
+        res = {}
+        repeatable, nonrepeatable = (F(ea, repeatable=item) for item in [True, False])
+        for items in map(internal.comment.decode, [repeatable, nonrepeatable]):
+            for name in items:
+                if not cls.implicit(name):
+                    res[name] = res.get(name, 0) + 1
+                continue
+            continue
+        return res
+
+    @classmethod
+    def recorded(cls, index, start, stop):
+        """Return the reference count (``dict``) for each tag name at each address from `start` up to `stop` within `index`.
+
+        If `index` is not ready, then return ``None``.
+        """
+        if not index.ready():
+            return None
+
+        res = {}
+        for ea, name, refs in index.range(start, stop):
+            if not cls.implicit(name):
+                res.setdefault(ea, {})[name] = refs
+            continue
+        return res
+
+    @classmethod
+    def __compare__(cls, kind, ea, stored, expected, recorded, tagged):
+        """Return the mismatches between the `stored` reference count at `ea` and the `expected` tags.
+
+        If `recorded` is not ``None``, then check the reference count of each tag that it contains for `ea` too.
+        The callable `tagged` is used to determine whether any implicit tags exist at `ea`.
+        """
+        res, count = [], sum(expected.values())
+        if stored < count or (stored > count and not count and not tagged(ea)):
+            res.append((kind, ea, None, stored, count))
+        if recorded is None:
+            return res
+
+        current = recorded.get(ea, {})
+        for name in sorted(set(current) | set(expected)):
+            if current.get(name, 0) != expected.get(name, 0):
+                res.append((kind, ea, name, current.get(name, 0), expected.get(name, 0)))
+            continue
+        return res
+
+    @classmethod
+    def __stored__(cls, ctx, ea, **target):
+        '''Return the reference count for the address `ea` that is stored by the namespace `ctx` for the given `target`.'''
+        if ctx is internal.comment.globals:
+            return internal.netnode.alt.get(internal.comment.tagging.node(), ea) or 0
+        state = ctx._read(target.get('target', None), ea) or {}
+        return state.get(internal.comment.tagging.__address__, {}).get(ea, 0)
+
+    @classmethod
+    def __repair__(cls, ctx, mismatches, **target):
+        '''Repair each of the `mismatches` using the namespace `ctx` with the given `target`.'''
+        for _, ea, name, stored, expected in mismatches:
+            if name is None:
+                continue
+            [ ctx.inc(ea, name, **target) for i in range(expected - stored) ]
+            [ ctx.dec(ea, name, **target) for i in range(stored - expected) ]
+
+        # adjusting each name also adjusts the count for its address, so we
+        # only need to fix the address if it's still not what we expected.
+        for _, ea, name, stored, expected in mismatches:
+            if name is not None:
+                continue
+            current = cls.__stored__(ctx, ea, **target)
+            if current >= expected and expected:
+                continue
+            elif ctx is internal.comment.globals and not expected:
+                internal.netnode.alt.remove(internal.comment.tagging.node(), ea)
+            else:
+                ctx.set_address(ea, expected, **target)
+            continue
+        return mismatches
+
+    @classmethod
+    def function(cls, ea, repair=False):
+        """Verify the contents and the tags of the function at `ea` returning any mismatches.
+
+        If `repair` is true, then also update the cache to fix the mismatches.
+        """
+        _, res = cls.__function_contents__(func.address(ea), repair=repair)
+        return res
+
+    @classmethod
+    def __function_contents__(cls, fn, repair=False):
+        '''Verify the function at `fn` returning the number of its heads and any mismatches.'''
+        state = internal.comment.contents._read(fn, fn) or {}
+        addresses = state.get(internal.comment.tagging.__address__, {})
+        heads = [item for item in func.iterate(fn)]
+        decoded = {item : cls.decode(item, db.comment) for item in heads if db.type.has_comment(item)}
+
+        # grab the tags that the index has for the addresses that we'll be
+        # checking so that we only need to visit the index once.
+        items = sorted(set(decoded) | set(addresses))
+        recorded = cls.recorded(internal.comment.contents.locations, items[0], items[-1] + 1) if items else {}
+
+        res = []
+        with internal.comment.contents.batch():
+            for item in items:
+                ui.navigation.auto(item)
+                mismatches = cls.__compare__('contents', item, addresses.get(item, 0), decoded.get(item, {}), recorded, db.tag)
+                res.extend(cls.__repair__(internal.comment.contents, mismatches, target=fn) if repair else mismatches)
+
+            # now we can compare the total for each tag name in the function
+            # against all of the tags that we decoded from its comments.
+            totals = {}
+            for item, expected in decoded.items():
+                for name, count in expected.items():
+                    totals[name] = totals.get(name, 0) + count
+                continue
+
+            state = internal.comment.contents._read(fn, fn) or {}
+            stored = {name : count for name, count in state.get(internal.comment.tagging.__tags__, {}).items() if not cls.implicit(name)}
+            for name in sorted(set(stored) | set(totals)):
+                if stored.get(name, 0) != totals.get(name, 0):
+                    res.append(('contents', fn, name, stored.get(name, 0), totals.get(name, 0)))
+                    repair and internal.comment.contents.set_name(fn, name, totals.get(name, 0))
+                continue
+            pass
+
+        # the function's comments are stored as a global, so check them too.
+        recorded = cls.recorded(internal.comment.globals.index, fn, fn + 1)
+        return len(heads), res + cls.__global__(fn, func.comment, recorded, func.tag, repair=repair)
+
+    @classmethod
+    def address(cls, ea, repair=False):
+        """Verify the global tags at the address `ea` returning any mismatches.
+
+        If `repair` is true, then also update the cache to fix the mismatches.
+        """
+        if func.within(ea) and func.address(ea) == ea:
+            F, tagged = func.comment, func.tag
+        elif func.within(ea):
+            raise internal.exceptions.InvalidTypeOrValueError(u"{:s}.address({:#x}{:s}) : The specified address ({:#x}) is within a function and its tags are stored in the contents.".format('.'.join([__name__, cls.__name__]), ea, ', repair={!s}'.format(repair) if repair else '', ea))
+        else:
+            F, tagged = db.comment, db.tag
+        recorded = cls.recorded(internal.comment.globals.index, ea, ea + 1)
+        return cls.__global__(ea, F, recorded, tagged, repair=repair)
+
+    @classmethod
+    def __global__(cls, ea, F, recorded, tagged, repair=False):
+        '''Verify the global tags at `ea` using `F` to fetch its comments, `recorded` for the tags in the index, and `tagged` to fetch its tags.'''
+        stored = internal.netnode.alt.get(internal.comment.tagging.node(), ea) or 0
+        expected = cls.decode(ea, F) if stored or db.type.has_comment(ea) or F is func.comment else {}
+        mismatches = cls.__compare__('globals', ea, stored, expected, recorded, tagged)
+        return cls.__repair__(internal.comment.globals, mismatches) if repair else mismatches
+
+    @classmethod
+    def step(cls, heads=None, addresses=None, repair=None):
+        """Verify the functions containing the next number of `heads` and global `addresses` in the database returning any mismatches.
+
+        If `repair` is true, then also update the cache to fix the mismatches.
+        """
+        heads = cls.heads if heads is None else heads
+        addresses = cls.addresses if addresses is None else addresses
+        repair = cls.repair if repair is None else repair
+
+        # apply any deferred adjustments so that they aren't seen as mismatches.
+        internal.comment.deferred.flush()
+
+        node, (left, right) = cls.node(), db.config.bounds()
+        fcursor, acursor = cls.cursor()
+        res = []
+
+        # start by verifying the contents of each function until we've
+        # gone through the number of heads that we were given.
+        count = 0
+        while count < heads:
+            fn = idaapi.get_func(fcursor)
+            if not (fn and internal.interface.range.start(fn) == fcursor):
+                fn = idaapi.get_next_func(fcursor)
+            if fn is None:
+                fcursor = left
+                internal.netnode.alt.set(node, cls.__passes__, (internal.netnode.alt.get(node, cls.__passes__) or 0) + 1)
+                break
+            ea = internal.interface.range.start(fn)
+            total, mismatches = cls.__function_contents__(ea, repair=repair)
+            res.extend(mismatches)
+            count, fcursor = count + max(1, total), ea + 1
+        internal.netnode.alt.set(node, cls.__function__, fcursor)
+
+        # now we can gather the next number of global addresses. as the
+        # contents were already verified, we skip anything inside a function.
+        items = []
+        for _ in range(addresses):
+            if not (left <= acursor < right):
+                acursor = left
+                break
+            if not idaapi.get_func(acursor):
+                items.append(acursor)
+            acursor = idaapi.next_head(acursor, right)
+        internal.netnode.alt.set(node, cls.__address__, acursor)
+
+        # then we can verify them using the tags that the index has for them.
+        recorded = cls.recorded(internal.comment.globals.index, items[0], items[-1] + 1) if items else {}
+        for ea in items:
+            res.extend(cls.__global__(ea, db.comment, recorded, db.tag, repair=repair))
+
+        # log each of the mismatches that we found so that the user knows.
+        for kind, ea, name, stored, expected in res:
+            description = u"address {:#x}".format(ea) if name is None else u"tag {!s} at address {:#x}".format(internal.utils.string.repr(name), ea)
+            logging.warning(u"{:s}.step({:d}, {:d}) : {:s} the {:s} reference count for the {:s} from {:d} to {:d}.".format('.'.join([__name__, cls.__name__]), heads, addresses, 'Repaired' if repair else 'Found a mismatch in', kind, description, stored, expected))
+        cls.mismatches.extend(res)
+        return res
+
+    @classmethod
+    def __tick__(cls):
+        '''Verify the next number of heads and addresses returning the interval until the next tick.'''
+        if not cls.running:
+            return -1
+
+        # if IDA is still analyzing the database, then wait for the next tick.
+        Fready = idaapi.autoIsOk if idaapi.__version__ < 7.0 else idaapi.auto_is_ok
+        if not Fready():
+            return cls.interval
+
+        try:
+            cls.step()
+        except Exception:
+            logging.warning(u"{:s}.tick() : Stopping the verifier due to an exception being raised while verifying the tag cache.".format('.'.join([__name__, cls.__name__])), exc_info=True)
+            cls.running = False
+            return -1
+        return cls.interval
+
+    @classmethod
+    def start(cls, interval=None, repair=None):
+        """Start verifying the cache for every `interval` milliseconds using a timer.
+
+        If `repair` is true, then also update the cache to fix any mismatches that were found.
+        """
+        cls.interval = cls.interval if interval is None else interval
+        cls.repair = cls.repair if repair is None else repair
+        cls.running = True
+        return ui.timer.register(cls.__node__, cls.interval, cls.__tick__)
+
+    @classmethod
+    def stop(cls):
+        '''Stop verifying the cache on the next tick of the timer.'''
+        res, cls.running = cls.running, False
+        return res
+
 def everything():
     '''Re-create the cache for all the tags found in the database.'''
     erase()
     all()
+    index()
+
+def migrate(name='zlib', level=1):
+    """Re-write the contents cache for every function using the codec `name` at the specified compression `level`.
+
+    The codec is also selected for anything that is written to the cache afterwards.
+    """
+    codec = internal.comment.cachecodec(name, level)
+    internal.comment.deferred.flush()
+    n, tag = internal.comment.tagging.node(), internal.comment.contents.btag
+    functions = [ea for ea in internal.netnode.sup.fiter(n)]
+
+    # tally up what codecs were being used for the blobs prior to changing them
+    before, previous = {}, 0
+    for ea in functions:
+        data = internal.netnode.blob.get(ea, tag) or b''
+        identifier = internal.comment.cachecodec.identify(data) if data else None
+        before[identifier] = before.get(identifier, 0) + 1
+        previous += sum(len(internal.netnode.blob.get(node, tag, start) or b'') for node, start in internal.comment.contents.__blobs__(ea))
+
+    # now we can select the codec and re-write each function with it
+    internal.comment.tagging.codec = codec
+    p = ui.Progress()
+    p.update(current=0, min=0, max=len(functions), title=u"Migrating tagcache to {!r}...".format(codec))
+    p.open()
+
+    failed, current = 0, 0
+    try:
+        for idx, ea in enumerate(functions):
+            if idx % (len(functions) // 10 or 1) == 0:
+                p.update(current=idx, text=u"Migrating contents for function {:#x} : {:d} of {:d}".format(ea, idx, len(functions)))
+            try:
+                state = internal.comment.contents._read(ea, ea)
+                internal.comment.contents._write(ea, ea, state)
+            except Exception:
+                logging.warning(u"{:s}.migrate({!r}, {!s}) : Unable to migrate the contents for the function at {:#x} to {!r}.".format(__name__, name, level, ea, codec), exc_info=True)
+                failed += 1
+            current += sum(len(internal.netnode.blob.get(node, tag, start) or b'') for node, start in internal.comment.contents.__blobs__(ea))
+        p.update(current=len(functions))
+    finally:
+        p.close()
+
+    six.print_(u"migrated {:d} function{:s} ({:s}) to {!r} : {:d} -> {:d} bytes{:s}".format(len(functions) - failed, '' if len(functions) - failed == 1 else 's', ', '.join(u"{:d} {!s}".format(count, item) for item, count in sorted(before.items())), codec, previous, current, " ({:d} failed)".format(failed) if failed else ''), file=output)
+    return len(functions) - failed
 
 def erase_globals():
     '''Erase the cache defined for all of the global tags in the database.'''
@@ -258,12 +674,16 @@ def erase_contents():
     yield total
 
     for idx, ea in enumerate(functions):
+        node = internal.comment.contents.__shardnode__(ea)
         internal.netnode.blob.remove(ea, tag)
+        node is None or internal.netnode.remove(node)
         yield idx, ea
     return
 
 def erase():
     '''Erase the current cache from the database.'''
+    internal.comment.deferred.reset()
+    [ item.erase() for item in [internal.comment.globals.index, internal.comment.contents.index, internal.comment.contents.locations] ]
     iter1, iter2 = erase_contents(), erase_globals()
     total = sum(map(next, [iter1, iter2]))
 
@@ -277,4 +697,4 @@ def erase():
         six.print_(u"erasing global {:s} : {:d} of {:d}".format(fmt.format(addressOrName), res+idx, total), file=output)
     return
 
-__all__ = ['everything', 'globals', 'contents']
+__all__ = ['everything', 'globals', 'contents', 'index', 'migrate', 'verify']
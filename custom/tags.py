@@ -464,41 +464,44 @@ class apply(object):
         global apply
         cls, tagmap_output = apply.__class__, u", {:s}".format(u', '.join(u"{:s}={:s}".format(internal.utils.string.escape(oldtag), internal.utils.string.escape(newtag)) for oldtag, newtag in tagmap.items())) if tagmap else ''
 
+        # update the contents tag cache in a single batch so that each function
+        # only has its reference counts written once.
         count = 0
-        for loc, res in Contents:
-            ea = locationToAddress(loc)
+        with internal.comment.contents.batch():
+            for loc, res in Contents:
+                ea = locationToAddress(loc)
 
-            # warn the user if this address is not within a function
-            if not func.within(ea):
-                logging.warning(u"{:s}.contents(...{:s}) : Address {:#x} is not within a function. Using a global tag.".format('.'.join([__name__, cls.__name__]), tagmap_output, ea))
+                # warn the user if this address is not within a function
+                if not func.within(ea):
+                    logging.warning(u"{:s}.contents(...{:s}) : Address {:#x} is not within a function. Using a global tag.".format('.'.join([__name__, cls.__name__]), tagmap_output, ea))
 
-            # grab the current (old) tag state
-            state = db.tag(ea)
+                # grab the current (old) tag state
+                state = db.tag(ea)
 
-            # transform the new tag state using the tagmap
-            new = { tagmap.get(name, name) : value for name, value in res.items() }
+                # transform the new tag state using the tagmap
+                new = { tagmap.get(name, name) : value for name, value in res.items() }
 
-            # check if the tag mapping resulted in the deletion of a tag
-            if len(new) != len(res):
-                reskeys, newkeys = ({item for item in items.keys()} for items in [res, new])
-                for name in reskeys - newkeys:
-                    logging.warning(u"{:s}.contents(...{:s}) : Refusing requested tag mapping as it results in the tag \"{:s}\" overwriting tag \"{:s}\" for the contents at {:#x}. The value {!s} would be overwritten by {!s}.".format('.'.join([__name__, cls.__name__]), tagmap_output, internal.utils.string.escape(name, '"'), internal.utils.string.escape(tagmap[name], '"'), ea, internal.utils.string.repr(res[name]), internal.utils.string.repr(res[tagmap[name]])))
-                pass
+                # check if the tag mapping resulted in the deletion of a tag
+                if len(new) != len(res):
+                    reskeys, newkeys = ({item for item in items.keys()} for items in [res, new])
+                    for name in reskeys - newkeys:
+                        logging.warning(u"{:s}.contents(...{:s}) : Refusing requested tag mapping as it results in the tag \"{:s}\" overwriting tag \"{:s}\" for the contents at {:#x}. The value {!s} would be overwritten by {!s}.".format('.'.join([__name__, cls.__name__]), tagmap_output, internal.utils.string.escape(name, '"'), internal.utils.string.escape(tagmap[name], '"'), ea, internal.utils.string.repr(res[name]), internal.utils.string.repr(res[tagmap[name]])))
+                    pass
 
-            # inform the user if any tags are being overwritten with different values
-            statekeys, newkeys = ({item for item in items.keys()} for items in [state, new])
-            for name in statekeys & newkeys:
-                if state[name] == new[name]: continue
-                logging.warning(u"{:s}.contents(...{:s}) : Overwriting contents tag \"{:s}\" for address {:#x} with new value {!s}. Old value was {!s}.".format('.'.join([__name__, cls.__name__]), tagmap_output, internal.utils.string.escape(name, '"'), ea, internal.utils.string.repr(new[name]), internal.utils.string.repr(state[name])))
+                # inform the user if any tags are being overwritten with different values
+                statekeys, newkeys = ({item for item in items.keys()} for items in [state, new])
+                for name in statekeys & newkeys:
+                    if state[name] == new[name]: continue
+                    logging.warning(u"{:s}.contents(...{:s}) : Overwriting contents tag \"{:s}\" for address {:#x} with new value {!s}. Old value was {!s}.".format('.'.join([__name__, cls.__name__]), tagmap_output, internal.utils.string.escape(name, '"'), ea, internal.utils.string.repr(new[name]), internal.utils.string.repr(state[name])))
 
-            # write the tags to the contents address
-            try:
-                [ db.tag(ea, name, value) for name, value in new.items() if state.get(name, dummy) != value ]
-            except:
-                logging.warning(u"{:s}.contents(...{:s}) : Unable to apply tags {!s} to location {:#x}.".format('.'.join([__name__, cls.__name__]), tagmap_output, internal.utils.string.repr(new), ea), exc_info=True)
+                # write the tags to the contents address
+                try:
+                    [ db.tag(ea, name, value) for name, value in new.items() if state.get(name, dummy) != value ]
+                except:
+                    logging.warning(u"{:s}.contents(...{:s}) : Unable to apply tags {!s} to location {:#x}.".format('.'.join([__name__, cls.__name__]), tagmap_output, internal.utils.string.repr(new), ea), exc_info=True)
 
-            # increase our counter
-            count += 1
+                # increase our counter
+                count += 1
         return count
 
     ## applying frames to all the functions
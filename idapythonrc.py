@@ -14,7 +14,7 @@ print_banner()
 
 # some general python modules that we use for meta_path
 import sys, os
-import imp, fnmatch, ctypes, types
+import imp, fnmatch, ctypes, types, time
 import idaapi
 
 library = ctypes.WinDLL if os.name == 'nt' else ctypes.CDLL
@@ -23,11 +23,20 @@ library = ctypes.WinDLL if os.name == 'nt' else ctypes.CDLL
 root = idaapi.get_user_idadir()
 sys.path.remove(root)
 
+# determine whether the public api should be loaded on first use. this can
+# be disabled by setting the MINSC_LAZY environment variable to 0.
+lazy = os.getenv('MINSC_LAZY', '1').lower() not in {'0', 'no', 'false', 'off'}
+
 class internal_api(object):
     """
     Loader base-class for any api that's based on files contained within a directory.
     """
-    os, imp, fnmatch = os, imp, fnmatch
+    os, imp, fnmatch, time = os, imp, fnmatch, time
+
+    # the number of seconds that it took to load each module (including
+    # whatever it imported) which is shared between all of the loaders.
+    timings = {}
+
     def __init__(self, directory, **attributes):
         '''Initialize the api using the contents within the specified `directory`.'''
         self.path = self.os.path.realpath(directory)
@@ -62,9 +71,12 @@ class internal_api(object):
     def new_api(self, modulename, path):
         '''Load the file found at `path` into the specified `modulename`.'''
         file, path, description = self.load_api(path)
+        ts = self.time.time()
         try:
             return self.imp.load_module(modulename, file, path, description)
-        finally: file.close()
+        finally:
+            self.timings[modulename] = self.time.time() - ts
+            file.close()
 
     ### Module operations
     def new_module(self, fullname, documentation=None):
@@ -80,16 +92,73 @@ class internal_api(object):
     def load_module(self, fullname):
         raise NotImplementedError
 
+class lazy_module(types.ModuleType):
+    # Module type used for a module that has not been loaded yet. The first
+    # time an attribute that does not exist is fetched from the module, the
+    # module will be loaded into this very same object by its loader. As the
+    # namespace containing this class gets cleared after initialization, none
+    # of its globals (including itself) can be referenced from its methods.
+
+    def __init__(self, name, loader, path):
+        self.__class__.__base__.__init__(self, name)
+        self.__dict__['__lazy__'] = loader, path
+        self.__dict__['__file__'] = path
+
+    def __materialize__(self):
+        '''Load the module if it has not been loaded yet and return whether it was loaded.'''
+        if '__lazy__' not in self.__dict__:
+            return False
+
+        # remove our loader before loading the module, so that any attribute
+        # that is missing while the module is loading will raise an exception.
+        loader, path = self.__dict__.pop('__lazy__')
+        try:
+            loader.new_api(self.__name__, path)
+
+        # if we failed, then restore our loader and ourselves so that it can be tried again.
+        except Exception:
+            self.__dict__['__lazy__'] = loader, path
+            loader.sys.modules[self.__name__] = self
+            raise
+        return True
+
+    def __getattr__(self, name):
+        if name in {'__path__'} or not self.__materialize__():
+            raise AttributeError("'module' object has no attribute '{:s}'".format(name))
+        return getattr(self, name)
+
+    def __dir__(self):
+        self.__materialize__()
+        return sorted(self.__dict__)
+
+    # the documentation always exists, so we need to load the module when it's fetched.
+    def __get_documentation(self):
+        self.__materialize__()
+        return self.__dict__.get('__doc__')
+    def __set_documentation(self, documentation):
+        self.__dict__['__doc__'] = documentation
+    __doc__ = property(__get_documentation, __set_documentation)
+
+    def __repr__(self):
+        if '__lazy__' in self.__dict__:
+            _, path = self.__dict__['__lazy__']
+            return "<module '{:s}' from '{:s}' (not loaded)>".format(self.__name__, path)
+        return self.__class__.__base__.__repr__(self)
+
 class internal_path(internal_api):
     """
     Loader class which provides all api composed of all of the files within a directory
     as modules that can always be imported from anywhere.
+
+    If `lazy` is specified as true, then each module is only loaded when
+    one of its attributes is fetched for the very first time.
     """
-    def __init__(self, path, **attrs):
+    sys, lazy_module = sys, lazy_module
+    def __init__(self, path, lazy=False, **attrs):
         '''Initialize the loader using the files from the directory specified by `path`.'''
         super(internal_path, self).__init__(path)
         attrs.setdefault('include', '*.py')
-        self.attrs, self.cache = attrs, { name : path for name, path in self.iterate_api(**attrs) }
+        self.lazy, self.attrs, self.cache = lazy, attrs, { name : path for name, path in self.iterate_api(**attrs) }
 
     def find_module(self, fullname, path=None):
         '''If the module with the name `fullname` matches one of the files handled by our api, then act as their loader.'''
@@ -100,6 +169,9 @@ class internal_path(internal_api):
         self.cache = { name : path for name, path in self.iterate_api(**self.attrs) }
         if fullname not in self.cache:
             raise ImportError("Path-loader ({:s}) was unable to find a module named {:s}".format(self.path, fullname))
+        elif self.lazy:
+            module = self.sys.modules[fullname] = self.lazy_module(fullname, self, self.cache[fullname])
+            return module
         return self.new_api(fullname, self.cache[fullname])
 
 class internal_submodule(internal_api):
@@ -213,8 +285,9 @@ else:
 sys.meta_path.append( internal_submodule('internal', os.path.join(root, 'base'), include='_*.py') )
 
 ## public api
-sys.meta_path.append( internal_path(os.path.join(root, 'base'), exclude='_*.py') )
-sys.meta_path.append( internal_path(os.path.join(root, 'misc')) )
+sys.meta_path.append( internal_path(os.path.join(root, 'base'), exclude='_*.py', lazy=lazy) )
+sys.meta_path.append( internal_path(os.path.join(root, 'misc'), lazy=lazy) )
+del(lazy)
 
 # user and application api's
 for subdir in ('custom', 'app'):
@@ -8,7 +8,7 @@ to be used by the average user.
 """
 
 import six
-import sys, logging
+import sys, time, logging
 import functools, operator, itertools, types
 
 import database, function, instruction, ui
@@ -69,43 +69,42 @@ class address(commentbase):
     @classmethod
     def _update_refs(cls, ea, old, new):
         f, rt = cls.get_func_extern(ea)
+        target = interface.range.start(f) if f and not rt else None
 
         oldkeys, newkeys = ({item for item in content.keys()} for content in [old, new])
         logging.debug(u"{:s}.update_refs({:#x}) : Updating old keys ({!s}) to new keys ({!s}){:s}.".format('.'.join([__name__, cls.__name__]), ea, utils.string.repr(oldkeys), utils.string.repr(newkeys), ' for runtime-linked function' if rt else ''))
         for key in oldkeys ^ newkeys:
             if key not in new:
                 logging.debug(u"{:s}.update_refs({:#x}) : Decreasing reference count for {!s} at {:s}.".format('.'.join([__name__, cls.__name__]), ea, utils.string.repr(key), 'address', ea))
-                if f and not rt: internal.comment.contents.dec(ea, key)
-                else: internal.comment.globals.dec(ea, key)
+                internal.comment.deferred.adjust(target, ea, key, -1)
             if key not in old:
                 logging.debug(u"{:s}.update_refs({:#x}) : Increasing reference count for {!s} at {:s}.".format('.'.join([__name__, cls.__name__]), ea, utils.string.repr(key), 'address', ea))
-                if f and not rt: internal.comment.contents.inc(ea, key)
-                else: internal.comment.globals.inc(ea, key)
+                internal.comment.deferred.adjust(target, ea, key, +1)
             continue
         return
 
     @classmethod
     def _create_refs(cls, ea, content):
         f, rt = cls.get_func_extern(ea)
+        target = interface.range.start(f) if f and not rt else None
 
         contentkeys = {item for item in content.keys()}
         logging.debug(u"{:s}.create_refs({:#x}) : Creating keys ({!s}){:s}.".format('.'.join([__name__, cls.__name__]), ea, utils.string.repr(contentkeys), ' for runtime-linked function' if rt else ''))
         for key in contentkeys:
             logging.debug(u"{:s}.create_refs({:#x}) : Increasing reference count for {!s} at {:s} {:#x}.".format('.'.join([__name__, cls.__name__]), ea, utils.string.repr(key), 'address', ea))
-            if f and not rt: internal.comment.contents.inc(ea, key)
-            else: internal.comment.globals.inc(ea, key)
+            internal.comment.deferred.adjust(target, ea, key, +1)
         return
 
     @classmethod
     def _delete_refs(cls, ea, content):
         f, rt = cls.get_func_extern(ea)
+        target = interface.range.start(f) if f and not rt else None
 
         contentkeys = {item for item in content.keys()}
         logging.debug(u"{:s}.delete_refs({:#x}) : Deleting keys ({!s}){:s}.".format('.'.join([__name__, cls.__name__]), ea, utils.string.repr(contentkeys), ' from runtime-linked function' if rt else ''))
         for key in contentkeys:
             logging.debug(u"{:s}.delete_refs({:#x}) : Decreasing reference count for {!s} at {:s} {:#x}.".format('.'.join([__name__, cls.__name__]), ea, utils.string.repr(key), 'address', ea))
-            if f and not rt: internal.comment.contents.dec(ea, key)
-            else: internal.comment.globals.dec(ea, key)
+            internal.comment.deferred.adjust(target, ea, key, -1)
         return
 
     @classmethod
@@ -160,6 +159,7 @@ class address(commentbase):
 
     @classmethod
     def changing(cls, ea, repeatable_cmt, newcmt):
+        internal.comment.decoded.discard(ea, repeatable_cmt)
         if not cls.is_ready():
             return logging.debug(u"{:s}.changing({:#x}, {:d}, {!s}) : Ignoring comment.changing event (database not ready) for a {:s} comment at {:#x}.".format('.'.join([__name__, cls.__name__]), ea, repeatable_cmt, utils.string.repr(newcmt), 'repeatable' if repeatable_cmt else 'non-repeatable', ea))
 
@@ -191,6 +191,7 @@ class address(commentbase):
 
     @classmethod
     def changed(cls, ea, repeatable_cmt):
+        internal.comment.decoded.discard(ea, repeatable_cmt)
         if not cls.is_ready():
             return logging.debug(u"{:s}.changed({:#x}, {:d}) : Ignoring comment.changed event (database not ready) for a {:s} comment at {:#x}.".format('.'.join([__name__, cls.__name__]), ea, repeatable_cmt, 'repeatable' if repeatable_cmt else 'non-repeatable', ea))
 
@@ -222,6 +223,7 @@ class address(commentbase):
 
     @classmethod
     def old_changed(cls, ea, repeatable_cmt):
+        internal.comment.decoded.discard(ea, repeatable_cmt)
         if not cls.is_ready():
             return logging.debug(u"{:s}.old_changed({:#x}, {:d}) : Ignoring comment.changed event (database not ready) for a {:s} comment at {:#x}.".format('.'.join([__name__, cls.__name__]), ea, repeatable_cmt, 'repeatable' if repeatable_cmt else 'non-repeatable', ea))
 
@@ -269,10 +271,10 @@ class globals(commentbase):
         for key in oldkeys ^ newkeys:
             if key not in new:
                 logging.debug(u"{:s}.update_refs({:#x}) : Decreasing reference count for {!s} at {:s} {:#x}.".format('.'.join([__name__, cls.__name__]), interface.range.start(fn) if fn else idaapi.BADADDR, utils.string.repr(key), 'function' if fn else 'global', interface.range.start(fn)))
-                internal.comment.globals.dec(interface.range.start(fn), key)
+                internal.comment.deferred.adjust(None, interface.range.start(fn), key, -1)
             if key not in old:
                 logging.debug(u"{:s}.update_refs({:#x}) : Increasing reference count for {!s} at {:s} {:#x}.".format('.'.join([__name__, cls.__name__]), interface.range.start(fn) if fn else idaapi.BADADDR, utils.string.repr(key), 'function' if fn else 'global', interface.range.start(fn)))
-                internal.comment.globals.inc(interface.range.start(fn), key)
+                internal.comment.deferred.adjust(None, interface.range.start(fn), key, +1)
             continue
         return
 
@@ -282,7 +284,7 @@ class globals(commentbase):
         logging.debug(u"{:s}.create_refs({:#x}) : Creating keys ({!s}).".format('.'.join([__name__, cls.__name__]), interface.range.start(fn) if fn else idaapi.BADADDR, utils.string.repr(contentkeys)))
         for key in contentkeys:
             logging.debug(u"{:s}.create_refs({:#x}) : Increasing reference count for {!s} at {:s} {:#x}.".format('.'.join([__name__, cls.__name__]), interface.range.start(fn) if fn else idaapi.BADADDR, utils.string.repr(key), 'function' if fn else 'global', interface.range.start(fn)))
-            internal.comment.globals.inc(interface.range.start(fn), key)
+            internal.comment.deferred.adjust(None, interface.range.start(fn), key, +1)
         return
 
     @classmethod
@@ -291,7 +293,7 @@ class globals(commentbase):
         logging.debug(u"{:s}.delete_refs({:#x}) : Deleting keys ({!s}).".format('.'.join([__name__, cls.__name__]), interface.range.start(fn) if fn else idaapi.BADADDR, utils.string.repr(contentkeys)))
         for key in contentkeys:
             logging.debug(u"{:s}.delete_refs({:#x}) : Decreasing reference count for {!s} at {:s} {:#x}.".format('.'.join([__name__, cls.__name__]), interface.range.start(fn) if fn else idaapi.BADADDR, utils.string.repr(key), 'function' if fn else 'global', interface.range.start(fn)))
-            internal.comment.globals.dec(interface.range.start(fn), key)
+            internal.comment.deferred.adjust(None, interface.range.start(fn), key, -1)
         return
 
     @classmethod
@@ -349,6 +351,7 @@ class globals(commentbase):
 
     @classmethod
     def changing(cls, cb, a, cmt, repeatable):
+        internal.comment.decoded.discard_function(interface.range.start(a), repeatable)
         if not cls.is_ready():
             return logging.debug(u"{:s}.changing({!s}, {:#x}, {!s}, {:d}) : Ignoring comment.changing event (database not ready) for a {:s} comment at {:#x}.".format('.'.join([__name__, cls.__name__]), utils.string.repr(cb), interface.range.start(a), utils.string.repr(cmt), repeatable, 'repeatable' if repeatable else 'non-repeatable', interface.range.start(a)))
 
@@ -387,6 +390,7 @@ class globals(commentbase):
 
     @classmethod
     def changed(cls, cb, a, cmt, repeatable):
+        internal.comment.decoded.discard_function(interface.range.start(a), repeatable)
         if not cls.is_ready():
             return logging.debug(u"{:s}.changed({!s}, {:#x}, {!s}, {:d}) : Ignoring comment.changed event (database not ready) for a {:s} comment at {:#x}.".format('.'.join([__name__, cls.__name__]), utils.string.repr(cb), interface.range.start(a), utils.string.repr(cmt), repeatable, 'repeatable' if repeatable else 'non-repeatable', interface.range.start(a)))
 
@@ -425,6 +429,7 @@ class globals(commentbase):
 
     @classmethod
     def old_changed(cls, cb, a, cmt, repeatable):
+        internal.comment.decoded.discard_function(interface.range.start(a), repeatable)
         if not cls.is_ready():
             return logging.debug(u"{:s}.old_changed({!s}, {:#x}, {!s}, {:d}) : Ignoring comment.changed event (database not ready) for a {:s} comment at {:#x}.".format('.'.join([__name__, cls.__name__]), utils.string.repr(cb), interface.range.start(a), utils.string.repr(cmt), repeatable, 'repeatable' if repeatable else 'non-repeatable', interface.range.start(a)))
 
@@ -531,6 +536,9 @@ def on_ready():
     '''IDP_Hooks.auto_empty'''
     global State
 
+    # The analysis queue is empty, so apply any adjustments that were deferred
+    internal.comment.deferred.flush()
+
     # Queues have just been emptied, so now we can transition
     if State == state.loaded:
         State = state.ready
@@ -549,10 +557,13 @@ def auto_queue_empty(type):
 
     If the database is ready to be tampered with, then we proceed by executing
     the `on_ready` function which will perform any tasks required to be done
-    on the database at startup.
+    on the database at startup. Any adjustments to the tag cache that were
+    deferred are applied whenever one of the queues has been emptied.
     """
     if type == idaapi.AU_FINAL:
         on_ready()
+    else:
+        internal.comment.deferred.flush()
 
 def __process_functions(percentage=0.10):
     """This prebuilds the tag-cache for the entire database.
@@ -568,148 +579,277 @@ def __process_functions(percentage=0.10):
     p.update(current=0, max=len(funcs), title=u"Pre-building tagcache...")
     p.open()
     six.print_(u"Pre-building tagcache for {:d} functions.".format(len(funcs)))
+    ts = time.time()
     for i, fn in enumerate(funcs):
         chunks = [item for item in function.chunks(fn)]
 
-        text = functools.partial(u"Processing function {:#x} ({chunks:d} chunk{plural:s}) -> {:d} of {:d}".format, fn, 1 + i, len(funcs))
-        p.update(current=i)
+        text = u"Processing function {:#x} ({:d} chunk{:s}) -> {:d} of {:d}".format(fn, len(chunks), '' if len(chunks) == 1 else 's', 1 + i, len(funcs))
+        p.update(current=i, text=text)
         ui.navigation.procedure(fn)
         if i % (int(len(funcs) * percentage) or 1) == 0:
             six.print_(u"Processing function {:#x} -> {:d} of {:d} ({:.02f}%)".format(fn, 1 + i, len(funcs), i / float(len(funcs)) * 100.0))
 
-        contents = {item for item in internal.comment.contents.address(fn)}
-        for ci, (l, r) in enumerate(chunks):
-            p.update(text=text(chunks=len(chunks), plural='' if len(chunks) == 1 else 's'), tooltip="Chunk #{:d} : {:#x} - {:#x}".format(ci, l, r))
+        total += __process_function(fn, chunks, globals)
+
+    elapsed = time.time() - ts
+    six.print_(u"Successfully built tag-cache composed of {:d} tag{:s} for {:d} function{:s} in {:.3f} seconds ({:.2f} functions/s).".format(total, '' if total == 1 else 's', len(funcs), '' if len(funcs) == 1 else 's', elapsed, len(funcs) / elapsed if elapsed else float('inf')))
+    p.close()
+
+def __process_function(fn, chunks, globals):
+    """This adds the tags for each of the `chunks` belonging to the function `fn` to the tag-cache.
+
+    Only the heads that have a comment, an extra comment, or a custom name are
+    visited and only the text of their comments is decoded. The reference counts
+    are accumulated within a batch so that the function is only written once.
+    """
+    get_flags = idaapi.getFlags if idaapi.__version__ < 7.0 else idaapi.get_full_flags
+    mask = idaapi.FF_COMM | idaapi.FF_LINE | idaapi.FF_NAME
+
+    # any address that the hooks have already added to the function's contents
+    # will already have the reference counts for its name and extra comments.
+    contents = {item for item in internal.comment.contents.address(fn)}
+
+    total = 0
+    with internal.comment.contents.batch():
+        for l, r in chunks:
             ui.navigation.analyze(l)
-            for ea in database.address.iterate(l, database.address.prev(r)):
-                # FIXME: no need to iterate really since we should have
-                #        all of the addresses
-                for k, v in database.tag(ea).items():
-                    if ea in globals: internal.comment.globals.dec(ea, k)
-                    if ea not in contents: internal.comment.contents.inc(ea, k, target=fn)
-                    total += 1
-                continue
+
+            # jump from head to head checking their flags to find any of the
+            # ones that might contain a tag.
+            ea = l
+            while ea != idaapi.BADADDR and ea < r:
+                flags = get_flags(ea)
+                if flags & mask:
+                    total += __process_address(fn, ea, flags, ea in contents, ea in globals)
+                ea = idaapi.next_head(ea, r)
             continue
-        continue
-    six.print_(u"Successfully built tag-cache composed of {:d} tag{:s}.".format(total, '' if total == 1 else 's'))
-    p.close()
+        pass
+    return total
+
+def __process_address(fn, ea, flags, counted, moved):
+    """This adds the tags at the address `ea` with the specified `flags` to the contents of the function `fn`.
+
+    If `counted` is true, then the implicit tags at `ea` have already been counted by
+    the hooks. If `moved` is true, then they were counted as globals and are moved.
+    """
+    names = []
+
+    # decode the tag names out of the repeatable and non-repeatable comments
+    if flags & idaapi.FF_COMM:
+        for repeatable in [False, True]:
+            names.extend(internal.comment.decode(utils.string.of(idaapi.get_cmt(ea, repeatable))))
+        pass
+
+    # the custom name and extra comments are counted just like the hooks would.
+    # the name of the function itself, however, belongs to the globals.
+    implicit = []
+    if flags & idaapi.FF_NAME and ea != fn:
+        implicit.append('__name__')
+    if flags & idaapi.FF_LINE:
+        for key, where in [('__extra_prefix__', idaapi.E_PREV), ('__extra_suffix__', idaapi.E_NEXT)]:
+            implicit.extend([key] * (database.extra.__count__(ea, where) or 0))
+        pass
+
+    if counted:
+        implicit = []
+    elif moved:
+        [ internal.comment.globals.dec(ea, key) for key in implicit ]
+
+    [ internal.comment.contents.inc(ea, key, target=fn) for key in itertools.chain(names, implicit) ]
+    return len(names) + len(implicit)
+
+## segments that have been relocated by the "segm_moved" event, so that
+## they can be skipped if IDA is rebasing all of the segments at once.
+Relocated = []
+
+def relocated(*args):
+    '''Forget the segments that were relocated by the "segm_moved" event as the database is not being rebased.'''
+    Relocated[:] = []
 
 def rebase(info):
     """This is for when the user rebases the entire database.
 
-    We update the entire database in two parts. First we iterate through all
-    the functions, and transform its cache to its new address. Next we iterate
-    through all of the known global tags and then transform those.
+    Any segments that were already relocated by the "segm_moved" event are
+    skipped, and the tag cache for the rest of them is relocated together.
     """
     get_segment_name = idaapi.get_segm_name if hasattr(idaapi, 'get_segm_name') else idaapi.get_true_segm_name
-    functions, globals = map(utils.fcompose(sorted, list), [database.functions(), internal.netnode.alt.fiter(internal.comment.tagging.node())])
-
-    p = ui.Progress()
-    p.update(current=0, title=u"Rebasing tagcache...", min=0, max=sum(len(item) for item in [functions, globals]))
-    fcount = gcount = 0
+    internal.comment.decoded.reset()
+    internal.comment.deferred.flush()
 
     scount = info.size()
-    segmap = {info[si].to : info[si]._from for si in range(scount)}
-    listable = sorted(segmap)
-    six.print_(u"{:s}.rebase({:#x}, {:#x}) : Rebasing tagcache for {:d} segments.".format(__name__, segmap[listable[0]], listable[0], scount))
-
-    # for each segment
+    segments = [(info[si]._from, info[si].to, info[si].size) for si in range(scount)]
+    applied, Relocated[:] = {item for item in Relocated}, []
+    six.print_(u"{:s}.rebase({!r}) : Rebasing tagcache for {:d} segments.".format(__name__, info, scount))
+    for si, (old, new, size) in enumerate(sorted(segments)):
+        seg = idaapi.getseg(new)
+        six.print_(u"Rebasing tagcache for segment {:d} of {:d}{:s}: {:#x} ({:+#x}) -> {:#x}{:s}".format(1 + si, scount, " ({:s})".format(get_segment_name(seg)) if seg else '', old, size, new, ' (already relocated)' if (old, new, size) in applied else ''))
+
+    p, started = ui.Progress(), time.time()
+    p.update(current=0, title=u"Relocating tagcache...", min=0, max=0)
     p.open()
-    for si in range(scount):
-        seg = idaapi.getseg(info[si].to)
-
-        msg = u"Rebasing tagcache for segment {:d} of {:d}{:s}: {:#x} ({:+#x}) -> {:#x}".format(1 + si, scount, " ({:s})".format(get_segment_name(seg)) if seg else '', info[si]._from, info[si].size, info[si].to)
-        p.update(title=msg), six.print_(msg)
-
-        # for each function (using target address because ida moved the netnodes for us)
-        listable = [ea for ea in functions if info[si].to <= ea < info[si].to + info[si].size]
-        for i, offset in __rebase_function(info[si]._from, info[si].to, info[si].size, (item for item in listable)):
-            name = database.name(info[si].to + offset)
-            text = u"Relocating function {:d} of {:d}{:s}: {:#x} -> {:#x}".format(i + fcount, len(functions), " ({:s})".format(name) if name else '', info[si]._from + offset, info[si].to + offset)
-            p.update(value=sum([fcount, gcount, i]), text=text)
-            ui.navigation.procedure(info[si].to + offset)
-        fcount += len(listable)
-
-        # for each global
-        listable = [(ea, count) for ea, count in globals if info[si]._from <= ea < info[si]._from + info[si].size]
-        for i, offset in __rebase_globals(info[si]._from, info[si].to, info[si].size, (item for item in listable)):
-            name = database.name(info[si].to + offset)
-            text = u"Relocating global {:d} of {:d}{:s}: {:#x} -> {:#x}".format(i + gcount, len(globals), " ({:s})".format(name) if name else '', info[si]._from + offset, info[si].to + offset)
-            p.update(value=sum([fcount, gcount, i]), text=text)
-            ui.navigation.analyze(info[si].to + offset)
-        gcount += len(listable)
-    p.close()
+    try:
+        relocating = [item for item in segments if item not in applied]
+        fcount, gcount, failures = __relocate(relocating, p)
+    finally:
+        p.close()
+
+    six.print_(u"{:s}.rebase({!r}) : Relocated {:d} function{:s} and {:d} global{:s} in {:.3f}s with {:d} failure{:s}.".format(__name__, info, fcount, '' if fcount == 1 else 's', gcount, '' if gcount == 1 else 's', time.time() - started, len(failures), '' if len(failures) == 1 else 's'))
+    if failures:
+        logging.warning(u"{:s}.rebase({!r}) : Unable to relocate the tagcache for the following {:d} address{:s}: {:s}.".format(__name__, info, len(failures), '' if len(failures) == 1 else 'es', ', '.join("{:#x} -> {:#x}".format(old, new) for old, new, _ in failures)))
+    return
 
-def __rebase_function(old, new, size, iterable):
-    key = internal.comment.tagging.__address__
-    failure, total = [], [item for item in iterable]
+def __relocate(segments, progress=None):
+    """Relocate the tag cache for each `(old, new, size)` in `segments` updating `progress` if it was given.
+
+    Returns the number of functions and globals that were relocated along
+    with a list of the `(old, new, state)` for each one that failed.
+
+    This is done in two phases. First we read the contents of every function
+    and every global within the segments into memory, translating each of
+    their addresses with a single sorted map of the segments. Then we erase
+    all of the old keys and write all of the new ones, so that a segment
+    being moved on top of another one is handled. Only the keys within the
+    segments are visited, so the cost depends on the number of tags in them.
+    """
+    key, node = internal.comment.tagging.__address__, internal.comment.tagging.node()
+    forward = internal.comment.segmentmap(segments)
 
-    for i, fn in enumerate(total):
-        offset = fn - new
+    # find the functions and globals within each segment that was moved.
+    functions = [(fn, forward(fn)) for old, _, size in forward.segments for fn in internal.netnode.sup.range(node, old, old + size)]
+    globals = [(ea, forward(ea), count) for old, _, size in forward.segments for ea, count in internal.netnode.alt.range(node, old, old + size)]
+
+    failures, total = [], 2 * (len(functions) + len(globals))
+    stride = max(1, total // 1000)
+    progress and progress.update(current=0, min=0, max=total)
+
+    # phase 1: read the contents of each function and translate their addresses.
+    progress and progress.update(title=u"Reading tagcache for {:d} function{:s}...".format(len(functions), '' if len(functions) == 1 else 's'))
+    states = []
+    for i, (old, new) in enumerate(functions):
+        if progress and i % stride == 0:
+            progress.update(value=i, text=u"Reading function {:d} of {:d}: {:#x}".format(1 + i, len(functions), old))
 
-        # grab the contents dictionary from the former address
         try:
-            state = internal.comment.contents._read(offset + old, offset + old)
+            state = internal.comment.contents._read(old, old)
 
-        except E.FunctionNotFoundError:
-            logging.fatal(u"{:s}.rebase({:#x}, {:#x}, {:-#x}, {!r}) : Unable to transform non-function address {:#x} -> {:#x}.".format(__name__, old, new, size, iterable, offset + old, offset + new))
-            state = None
+        except E.SerializationError:
+            logging.fatal(u"{:s}.relocate({!r}) : Unable to read the tagcache for function {:#x} to transform it to {:#x}.".format(__name__, segments, old, new))
+            failures.append((old, new, None))
+            continue
 
         if state is None: continue
 
-        # erase the old one since we've loaded its state
-        internal.comment.contents._write(offset + old, offset + old, None)
-
         # ensure that the key is available in the state that we fetched
         if key not in state:
             state.setdefault(key, {})
             # FIXME: we should completely rebuild the contents here instead of just
             #        initializing it with an empty dict and throwing a warning.
-            logging.warning(u"{:s}.rebase({:#x}, {:#x}, {:-#x}, {!r}) : Missing address cache while translating address {:#x} -> {:#x}.".format(__name__, old, new, size, iterable, offset + old, offset + new))
-
-        # update the addresses
-        res, state[key] = state[key], {ea - old + new : ref for ea, ref in state[key].items()}
-
-        # and put the new addresses back to the new state
-        ok = internal.comment.contents._write(None, fn, state)
+            logging.warning(u"{:s}.relocate({!r}) : Missing address cache while translating address {:#x} -> {:#x}.".format(__name__, segments, old, new))
+
+        # update the addresses (leaving any that weren't moved alone)
+        state[key] = {(ea if forward(ea) is None else forward(ea)) : ref for ea, ref in state[key].items()}
+        states.append((old, new, state))
+
+    # phase 2: erase every one of the old keys before writing any new ones.
+    progress and progress.update(title=u"Writing tagcache for {:d} function{:s} and {:d} global{:s}...".format(len(states), '' if len(states) == 1 else 's', len(globals), '' if len(globals) == 1 else 's'))
+    offset = len(functions)
+    for i, (old, new, _) in enumerate(states):
+        if progress and i % stride == 0:
+            progress.update(value=offset + i, text=u"Erasing function {:d} of {:d}: {:#x}".format(1 + i, len(states), old))
+        internal.comment.contents._write(old, old, None)
+
+    offset += len(functions)
+    for i, (old, new, state) in enumerate(states):
+        if progress and i % stride == 0:
+            progress.update(value=offset + i, text=u"Relocating function {:d} of {:d}: {:#x} -> {:#x}".format(1 + i, len(states), old, new))
+            ui.navigation.procedure(new)
+
+        ok = internal.comment.contents._write(new, new, state)
         if not ok:
-            logging.fatal(u"{:s}.rebase({:#x}, {:#x}, {:-#x}, {!r}) : Failure trying to write reference count for function {:#x} while trying to update old reference count ({!s}) to new one ({!s}).".format(__name__, old, new, size, iterable, fn, utils.string.repr(res), utils.string.repr(state[key])))
-            failure.append((fn, res, state[key]))
-
-        yield i, offset
-    return
+            logging.fatal(u"{:s}.relocate({!r}) : Failure trying to write reference count for function {:#x} -> {:#x} ({!s}).".format(__name__, segments, old, new, utils.string.repr(state[key])))
+            failures.append((old, new, state))
+        continue
 
-def __rebase_globals(old, new, size, iterable):
-    node = internal.comment.tagging.node()
-    failure, total = [], [item for item in iterable]
-    for i, (ea, count) in enumerate(total):
-        offset = ea - old
+    offset += len(functions)
+    for i, (ea, target, count) in enumerate(globals):
+        if progress and i % stride == 0:
+            progress.update(value=offset + i, text=u"Erasing global {:d} of {:d}: {:#x}".format(1 + i, len(globals), ea))
 
-        # remove the old address
         ok = internal.netnode.alt.remove(node, ea)
         if not ok:
-            logging.fatal(u"{:s}.rebase({:#x}, {:#x}, {:-#x}, {!r}) : Failure trying to remove reference count ({!r}) for global {:#x}.".format(__name__, old, new, size, iterable, count, ea))
+            logging.fatal(u"{:s}.relocate({!r}) : Failure trying to remove reference count ({!r}) for global {:#x}.".format(__name__, segments, count, ea))
+        continue
+
+    offset += len(globals)
+    for i, (ea, target, count) in enumerate(globals):
+        if progress and i % stride == 0:
+            progress.update(value=offset + i, text=u"Relocating global {:d} of {:d}: {:#x} -> {:#x}".format(1 + i, len(globals), ea, target))
+            ui.navigation.analyze(target)
 
-        # now add the new address
-        ok = internal.netnode.alt.set(node, offset + new, count)
+        ok = internal.netnode.alt.set(node, target, count)
         if not ok:
-            logging.fatal(u"{:s}.rebase({:#x}, {:#x}, {:-#x}, {!r}) : Failure trying to store reference count ({!r}) from {:#x} to {:#x}.".format(__name__, old, new, size, iterable, count, ea, new + offset))
-            failure.append((ea, new + offset, count))
-        yield i, offset
-    return
+            logging.fatal(u"{:s}.relocate({!r}) : Failure trying to store reference count ({!r}) from {:#x} to {:#x}.".format(__name__, segments, count, ea, target))
+            failures.append((ea, target, count))
+        continue
 
-def segm_start_changed(s):
-    # XXX: not yet implemented
-    return
+    # now we can relocate the addresses in each index all at once
+    for index in [internal.comment.globals.index, internal.comment.contents.index, internal.comment.contents.locations]:
+        count = index.relocate(segments)
+        logging.info(u"{:s}.relocate({!r}) : Relocated {:d} address{:s} in the index ({!r}).".format(__name__, segments, count, '' if count == 1 else 'es', index))
+    return len(states), len(globals), failures
 
-def segm_end_changed(s):
-    # XXX: not yet implemented
-    return
+def segm_moved(source, destination, size, *changed_netmap):
+    """This is for when the user moves a single segment.
+
+    IDA refuses to move a segment on top of another one, so each segment
+    can be relocated as soon as it has been moved. The segment is recorded
+    so that it can be skipped if this is part of rebasing the database.
+    """
+    global State
+    if State != state.ready: return
 
-def segm_moved(source, destination, size):
-    # XXX: not yet implemented
+    internal.comment.decoded.reset()
+    internal.comment.deferred.flush()
+    _, _, failures = __relocate([(source, destination, size)])
+    Relocated.append((source, destination, size))
+    if failures:
+        logging.warning(u"{:s}.segm_moved({:#x}, {:#x}, {:#x}) : Unable to relocate the tagcache for the following {:d} address{:s}: {:s}.".format(__name__, source, destination, size, len(failures), '' if len(failures) == 1 else 'es', ', '.join("{:#x} -> {:#x}".format(old, new) for old, new, _ in failures)))
     return
 
+def segm_start_changed(s, *oldstart):
+    '''This is for when the start of the segment `s` has changed and its tags might no longer be within a segment.'''
+    global State
+    if State != state.ready: return
+
+    seg = idaapi.get_prev_seg(interface.range.start(s))
+    return __discard(interface.range.end(seg) if seg else 0, interface.range.start(s))
+
+def segm_end_changed(s, *oldend):
+    '''This is for when the end of the segment `s` has changed and its tags might no longer be within a segment.'''
+    global State
+    if State != state.ready: return
+
+    seg = idaapi.get_next_seg(interface.range.end(s))
+    return __discard(interface.range.end(s), interface.range.start(seg) if seg else idaapi.BADADDR)
+
+def __discard(start, stop):
+    """Remove the global tags from `start` up to `stop` as those addresses are not within any segment.
+
+    The tags are found with the index for the globals, so only the tags that
+    are between the segments are visited. Any function that was removed or
+    truncated along with the segment is handled by the function hooks.
+    """
+    internal.comment.deferred.flush()
+    if not internal.comment.globals.index.ready():
+        items = [ea for ea, _ in internal.netnode.alt.range(internal.comment.tagging.node(), start, stop)]
+        items and logging.warning(u"{:s}.discard({:#x}, {:#x}) : Unable to remove the tags for {:d} global{:s} outside of a segment ({:s}) due to the index not being built.".format(__name__, start, stop, len(items), '' if len(items) == 1 else 's', ', '.join(map("{:#x}".format, items))))
+        return
+
+    items = [(ea, name, refs) for ea, name, refs in internal.comment.globals.index.range(start, stop)]
+    for ea, name, refs in items:
+        [ internal.comment.globals.dec(ea, name) for _ in range(refs) ]
+    items and logging.info(u"{:s}.discard({:#x}, {:#x}) : Removed {:d} tag{:s} from {:d} global{:s} that are no longer within a segment.".format(__name__, start, stop, len(items), '' if len(items) == 1 else 's', len({ea for ea, _, _ in items}), '' if len({ea for ea, _, _ in items}) == 1 else 's'))
+
 # address naming
 def rename(ea, newname):
     """This hook is when a user adds a name or removes it from the database.
@@ -781,13 +921,16 @@ def func_tail_appended(pfn, tail):
     """
     global State
     if State != state.ready: return
-    # tail = func_t
-    for ea in database.address.iterate(interface.range.bounds(tail)):
-        for k in database.tag(ea):
-            internal.comment.globals.dec(ea, k)
-            internal.comment.contents.inc(ea, k, target=interface.range.start(pfn))
-            logging.debug(u"{:s}.func_tail_appended({:#x}, {:#x}) : Exchanging (decreasing) reference count for global tag {!s} and (increasing) reference count for contents tag {!s}.".format(__name__, interface.range.start(pfn), interface.range.start(tail), utils.string.repr(k), utils.string.repr(k)))
-        continue
+
+    # update the contents in a batch so each function is only written once.
+    with internal.comment.contents.batch():
+        # tail = func_t
+        for ea in database.address.iterate(interface.range.bounds(tail)):
+            for k in database.tag(ea):
+                internal.comment.globals.dec(ea, k)
+                internal.comment.contents.inc(ea, k, target=interface.range.start(pfn))
+                logging.debug(u"{:s}.func_tail_appended({:#x}, {:#x}) : Exchanging (decreasing) reference count for global tag {!s} and (increasing) reference count for contents tag {!s}.".format(__name__, interface.range.start(pfn), interface.range.start(tail), utils.string.repr(k), utils.string.repr(k)))
+            continue
     return
 
 def removing_func_tail(pfn, tail):
@@ -798,13 +941,16 @@ def removing_func_tail(pfn, tail):
     """
     global State
     if State != state.ready: return
-    # tail = range_t
-    for ea in database.address.iterate(interface.range.bounds(tail)):
-        for k in database.tag(ea):
-            internal.comment.contents.dec(ea, k, target=interface.range.start(pfn))
-            internal.comment.globals.inc(ea, k)
-            logging.debug(u"{:s}.removing_func_tail({:#x}, {:#x}) : Exchanging (increasing) reference count for global tag {!s} and (decreasing) reference count for contents tag {!s}.".format(__name__, interface.range.start(pfn), interface.range.start(tail), utils.string.repr(k), utils.string.repr(k)))
-        continue
+
+    # update the contents in a batch so each function is only written once.
+    with internal.comment.contents.batch():
+        # tail = range_t
+        for ea in database.address.iterate(interface.range.bounds(tail)):
+            for k in database.tag(ea):
+                internal.comment.contents.dec(ea, k, target=interface.range.start(pfn))
+                internal.comment.globals.inc(ea, k)
+                logging.debug(u"{:s}.removing_func_tail({:#x}, {:#x}) : Exchanging (increasing) reference count for global tag {!s} and (decreasing) reference count for contents tag {!s}.".format(__name__, interface.range.start(pfn), interface.range.start(tail), utils.string.repr(k), utils.string.repr(k)))
+            continue
     return
 
 def func_tail_removed(pfn, ea):
@@ -816,29 +962,31 @@ def func_tail_removed(pfn, ea):
     global State
     if State != state.ready: return
 
-    # first we'll grab the addresses from our refs
-    listable = internal.comment.contents.address(ea, target=interface.range.start(pfn))
-
-    # these should already be sorted, so our first step is to filter out what
-    # doesn't belong. in order to work around one of the issues posed in the
-    # issue arizvisa/ida-minsc#61, we need to explicitly check that each item is
-    # not None prior to their comparison against `pfn`. this is needed in order
-    # to work around a null-pointer exception raised by SWIG when it calls the
-    # area_t.__ne__ method to do the comparison.
-    missing = [ item for item in listable if not idaapi.get_func(item) or idaapi.get_func(item) != pfn ]
-
-    # if there was nothing found, then we can simply exit the hook early
-    if not missing:
-        return
+    # update the contents in a batch so each function is only written once.
+    with internal.comment.contents.batch():
+        # first we'll grab the addresses from our refs
+        listable = internal.comment.contents.address(ea, target=interface.range.start(pfn))
+
+        # these should already be sorted, so our first step is to filter out what
+        # doesn't belong. in order to work around one of the issues posed in the
+        # issue arizvisa/ida-minsc#61, we need to explicitly check that each item is
+        # not None prior to their comparison against `pfn`. this is needed in order
+        # to work around a null-pointer exception raised by SWIG when it calls the
+        # area_t.__ne__ method to do the comparison.
+        missing = [ item for item in listable if not idaapi.get_func(item) or idaapi.get_func(item) != pfn ]
+
+        # if there was nothing found, then we can simply exit the hook early
+        if not missing:
+            return
 
-    # now iterate through the min/max of the list as hopefully this is
-    # our event.
-    for ea in database.address.iterate(min(missing), max(missing)):
-        for k in database.tag(ea):
-            internal.comment.contents.dec(ea, k, target=interface.range.start(pfn))
-            internal.comment.globals.inc(ea, k)
-            logging.debug(u"{:s}.func_tail_removed({:#x}, {:#x}) : Exchanging (increasing) reference count for global tag {!s} and (decreasing) reference count for contents tag {!s}.".format(__name__, interface.range.start(pfn), ea, utils.string.repr(k), utils.string.repr(k)))
-        continue
+        # now iterate through the min/max of the list as hopefully this is
+        # our event.
+        for ea in database.address.iterate(min(missing), max(missing)):
+            for k in database.tag(ea):
+                internal.comment.contents.dec(ea, k, target=interface.range.start(pfn))
+                internal.comment.globals.inc(ea, k)
+                logging.debug(u"{:s}.func_tail_removed({:#x}, {:#x}) : Exchanging (increasing) reference count for global tag {!s} and (decreasing) reference count for contents tag {!s}.".format(__name__, interface.range.start(pfn), ea, utils.string.repr(k), utils.string.repr(k)))
+            continue
     return
 
 def tail_owner_changed(tail, owner_func):
@@ -852,14 +1000,16 @@ def tail_owner_changed(tail, owner_func):
     global State
     if State != state.ready: return
 
-    # this is easy as we just need to walk through tail and add it
-    # to owner_func
-    for ea in database.address.iterate(interface.range.bounds(tail)):
-        for k in database.tag(ea):
-            internal.comment.contents.dec(ea, k)
-            internal.comment.contents.inc(ea, k, target=owner_func)
-            logging.debug(u"{:s}.tail_owner_changed({:#x}, {:#x}) : Exchanging (increasing) reference count for contents tag {!s} and (decreasing) reference count for contents tag {!s}.".format(__name__, interface.range.start(tail), owner_func, utils.string.repr(k), utils.string.repr(k)))
-        continue
+    # update the contents in a batch so each function is only written once.
+    with internal.comment.contents.batch():
+        # this is easy as we just need to walk through tail and add it
+        # to owner_func
+        for ea in database.address.iterate(interface.range.bounds(tail)):
+            for k in database.tag(ea):
+                internal.comment.contents.dec(ea, k)
+                internal.comment.contents.inc(ea, k, target=owner_func)
+                logging.debug(u"{:s}.tail_owner_changed({:#x}, {:#x}) : Exchanging (increasing) reference count for contents tag {!s} and (decreasing) reference count for contents tag {!s}.".format(__name__, interface.range.start(tail), owner_func, utils.string.repr(k), utils.string.repr(k)))
+            continue
     return
 
 def add_func(pfn):
@@ -872,15 +1022,17 @@ def add_func(pfn):
     global State
     if State != state.ready: return
 
-    # convert all globals into contents
-    for l, r in function.chunks(pfn):
-        for ea in database.address.iterate(l, database.address.prev(r)):
-            for k in database.tag(ea):
-                internal.comment.globals.dec(ea, k)
-                internal.comment.contents.inc(ea, k, target=interface.range.start(pfn))
-                logging.debug(u"{:s}.add_func({:#x}) : Exchanging (decreasing) reference count for global tag {!s} and (increasing) reference count for contents tag {!s}.".format(__name__, interface.range.start(pfn), utils.string.repr(k), utils.string.repr(k)))
+    # update the contents in a batch so each function is only written once.
+    with internal.comment.contents.batch():
+        # convert all globals into contents
+        for l, r in function.chunks(pfn):
+            for ea in database.address.iterate(l, database.address.prev(r)):
+                for k in database.tag(ea):
+                    internal.comment.globals.dec(ea, k)
+                    internal.comment.contents.inc(ea, k, target=interface.range.start(pfn))
+                    logging.debug(u"{:s}.add_func({:#x}) : Exchanging (decreasing) reference count for global tag {!s} and (increasing) reference count for contents tag {!s}.".format(__name__, interface.range.start(pfn), utils.string.repr(k), utils.string.repr(k)))
+                continue
             continue
-        continue
     return
 
 def del_func(pfn):
@@ -895,20 +1047,22 @@ def del_func(pfn):
     global State
     if State != state.ready: return
 
-    # convert all contents into globals
-    for l, r in function.chunks(pfn):
-        for ea in database.address.iterate(l, database.address.prev(r)):
-            for k in database.tag(ea):
-                internal.comment.contents.dec(ea, k, target=interface.range.start(pfn))
-                internal.comment.globals.inc(ea, k)
-                logging.debug(u"{:s}.del_func({:#x}) : Exchanging (increasing) reference count for global tag {!s} and (decreasing) reference count for contents tag {!s}.".format(__name__, interface.range.start(pfn), utils.string.repr(k), utils.string.repr(k)))
+    # update the contents in a batch so each function is only written once.
+    with internal.comment.contents.batch():
+        # convert all contents into globals
+        for l, r in function.chunks(pfn):
+            for ea in database.address.iterate(l, database.address.prev(r)):
+                for k in database.tag(ea):
+                    internal.comment.contents.dec(ea, k, target=interface.range.start(pfn))
+                    internal.comment.globals.inc(ea, k)
+                    logging.debug(u"{:s}.del_func({:#x}) : Exchanging (increasing) reference count for global tag {!s} and (decreasing) reference count for contents tag {!s}.".format(__name__, interface.range.start(pfn), utils.string.repr(k), utils.string.repr(k)))
+                continue
             continue
-        continue
 
-    # remove all function tags
-    for k in function.tag(interface.range.start(pfn)):
-        internal.comment.globals.dec(interface.range.start(pfn), k)
-        logging.debug(u"{:s}.del_func({:#x}) : Removing (global) tag {!s} from function.".format(__name__, interface.range.start(pfn), utils.string.repr(k)))
+        # remove all function tags
+        for k in function.tag(interface.range.start(pfn)):
+            internal.comment.globals.dec(interface.range.start(pfn), k)
+            logging.debug(u"{:s}.del_func({:#x}) : Removing (global) tag {!s} from function.".format(__name__, interface.range.start(pfn), utils.string.repr(k)))
     return
 
 def set_func_start(pfn, new_start):
@@ -921,27 +1075,29 @@ def set_func_start(pfn, new_start):
     global State
     if State != state.ready: return
 
-    # new_start has removed addresses from function
-    # replace contents with globals
-    if interface.range.start(pfn) > new_start:
-        for ea in database.address.iterate(new_start, database.address.prev(interface.range.start(pfn))):
-            for k in database.tag(ea):
-                internal.comment.contents.dec(ea, k, target=interface.range.start(pfn))
-                internal.comment.globals.inc(ea, k)
-                logging.debug(u"{:s}.set_func_start({:#x}, {:#x}) : Exchanging (increasing) reference count for global tag {!s} and (decreasing) reference count for contents tag {!s}.".format(__name__, interface.range.start(pfn), new_start, utils.string.repr(k), utils.string.repr(k)))
-            continue
-        return
+    # update the contents in a batch so each function is only written once.
+    with internal.comment.contents.batch():
+        # new_start has removed addresses from function
+        # replace contents with globals
+        if interface.range.start(pfn) > new_start:
+            for ea in database.address.iterate(new_start, database.address.prev(interface.range.start(pfn))):
+                for k in database.tag(ea):
+                    internal.comment.contents.dec(ea, k, target=interface.range.start(pfn))
+                    internal.comment.globals.inc(ea, k)
+                    logging.debug(u"{:s}.set_func_start({:#x}, {:#x}) : Exchanging (increasing) reference count for global tag {!s} and (decreasing) reference count for contents tag {!s}.".format(__name__, interface.range.start(pfn), new_start, utils.string.repr(k), utils.string.repr(k)))
+                continue
+            return
 
-    # new_start has added addresses to function
-    # replace globals with contents
-    elif interface.range.start(pfn) < new_start:
-        for ea in database.address.iterate(interface.range.start(pfn), database.address.prev(new_start)):
-            for k in database.tag(ea):
-                internal.comment.globals.dec(ea, k)
-                internal.comment.contents.inc(ea, k, target=interface.range.start(pfn))
-                logging.debug(u"{:s}.set_func_start({:#x}, {:#x}) : Exchanging (decreasing) reference count for global tag {!s} and (increasing) reference count for contents tag {!s}.".format(__name__, interface.range.start(pfn), new_start, utils.string.repr(k), utils.string.repr(k)))
-            continue
-        return
+        # new_start has added addresses to function
+        # replace globals with contents
+        elif interface.range.start(pfn) < new_start:
+            for ea in database.address.iterate(interface.range.start(pfn), database.address.prev(new_start)):
+                for k in database.tag(ea):
+                    internal.comment.globals.dec(ea, k)
+                    internal.comment.contents.inc(ea, k, target=interface.range.start(pfn))
+                    logging.debug(u"{:s}.set_func_start({:#x}, {:#x}) : Exchanging (decreasing) reference count for global tag {!s} and (increasing) reference count for contents tag {!s}.".format(__name__, interface.range.start(pfn), new_start, utils.string.repr(k), utils.string.repr(k)))
+                continue
+            return
     return
 
 def set_func_end(pfn, new_end):
@@ -953,29 +1109,40 @@ def set_func_end(pfn, new_end):
     """
     global State
     if State != state.ready: return
-    # new_end has added addresses to function
-    # replace globals with contents
-    if new_end > interface.range.end(pfn):
-        for ea in database.address.iterate(interface.range.end(pfn), database.address.prev(new_end)):
-            for k in database.tag(ea):
-                internal.comment.globals.dec(ea, k)
-                internal.comment.contents.inc(ea, k, target=interface.range.start(pfn))
-                logging.debug(u"{:s}.set_func_end({:#x}, {:#x}) : Exchanging (decreasing) reference count for global tag {!s} and (increasing) reference count for contents tag {!s}.".format(__name__, interface.range.start(pfn), new_end, utils.string.repr(k), utils.string.repr(k)))
-            continue
-        return
 
-    # new_end has removed addresses from function
-    # replace contents with globals
-    elif new_end < interface.range.end(pfn):
-        for ea in database.address.iterate(new_end, database.address.prev(interface.range.end(pfn))):
-            for k in database.tag(ea):
-                internal.comment.contents.dec(ea, k, target=interface.range.start(pfn))
-                internal.comment.globals.inc(ea, k)
-                logging.debug(u"{:s}.set_func_end({:#x}, {:#x}) : Exchanging (increasing) reference count for global tag {!s} and (decreasing) reference count for contents tag {!s}.".format(__name__, interface.range.start(pfn), new_end, utils.string.repr(k), utils.string.repr(k)))
-            continue
-        return
+    # update the contents in a batch so each function is only written once.
+    with internal.comment.contents.batch():
+        # new_end has added addresses to function
+        # replace globals with contents
+        if new_end > interface.range.end(pfn):
+            for ea in database.address.iterate(interface.range.end(pfn), database.address.prev(new_end)):
+                for k in database.tag(ea):
+                    internal.comment.globals.dec(ea, k)
+                    internal.comment.contents.inc(ea, k, target=interface.range.start(pfn))
+                    logging.debug(u"{:s}.set_func_end({:#x}, {:#x}) : Exchanging (decreasing) reference count for global tag {!s} and (increasing) reference count for contents tag {!s}.".format(__name__, interface.range.start(pfn), new_end, utils.string.repr(k), utils.string.repr(k)))
+                continue
+            return
+
+        # new_end has removed addresses from function
+        # replace contents with globals
+        elif new_end < interface.range.end(pfn):
+            for ea in database.address.iterate(new_end, database.address.prev(interface.range.end(pfn))):
+                for k in database.tag(ea):
+                    internal.comment.contents.dec(ea, k, target=interface.range.start(pfn))
+                    internal.comment.globals.inc(ea, k)
+                    logging.debug(u"{:s}.set_func_end({:#x}, {:#x}) : Exchanging (increasing) reference count for global tag {!s} and (decreasing) reference count for contents tag {!s}.".format(__name__, interface.range.start(pfn), new_end, utils.string.repr(k), utils.string.repr(k)))
+                continue
+            return
     return
 
+def deferred(module, *attributes):
+    '''Return a callable that resolves the specified `attributes` from `module` when it is called.'''
+    def resolve(*args, **kwargs):
+        F = functools.reduce(getattr, attributes, module)
+        return F(*args, **kwargs)
+    resolve.__name__ = '.'.join([module.__name__] + [item for item in attributes])
+    return resolve
+
 def make_ida_not_suck_cocks(nw_code):
     '''Start hooking all of IDA's API.'''
 
@@ -1009,28 +1176,80 @@ def make_ida_not_suck_cocks(nw_code):
         idaapi.__notification__.add(idaapi.NW_OPENIDB, nw_on_oldfile, -20)
         ui.hook.idp.add('auto_empty', on_ready, 0)
 
-    ## create the tagcache netnode when a database is created
+    ## create the tagcache netnode when a database is created, and empty
+    ## the tags that were decoded from the previous one.
     if idaapi.__version__ >= 7.0:
         ui.hook.idp.add('ev_init', comment.tagging.__init_tagcache__, -1)
+        ui.hook.idp.add('ev_init', comment.decoded.reset, -1)
+        ui.hook.idp.add('ev_init', comment.deferred.reset, -1)
     elif idaapi.__version__ >= 6.9:
         ui.hook.idp.add('init', comment.tagging.__init_tagcache__, -1)
+        ui.hook.idp.add('init', comment.decoded.reset, -1)
+        ui.hook.idp.add('init', comment.deferred.reset, -1)
     else:
         idaapi.__notification__.add(idaapi.NW_OPENIDB, comment.tagging.__nw_init_tagcache__, -40)
+        idaapi.__notification__.add(idaapi.NW_OPENIDB, comment.decoded.reset, -40)
+        idaapi.__notification__.add(idaapi.NW_OPENIDB, comment.deferred.reset, -40)
 
-    ## hook any user-entered comments so that they will also update the tagcache
+    ## apply any deferred adjustments to the tagcache before the database is saved or closed
+    if idaapi.__version__ >= 7.0:
+        ui.hook.idb.add('savebase', comment.deferred.flush, -1)
+        ui.hook.idb.add('closebase', comment.deferred.flush, -1)
+    else:
+        idaapi.__notification__.add(idaapi.NW_CLOSEIDB, comment.deferred.__nw_flush__, -40)
+
+    ## initialize the coroutines that update the tagcache from the comment hooks
     if idaapi.__version__ >= 7.0:
         ui.hook.idp.add('ev_init', address.database_init, 0)
         ui.hook.idp.add('ev_init', globals.database_init, 0)
-        ui.hook.idb.add('changing_range_cmt', globals.changing, 0)
-        ui.hook.idb.add('range_cmt_changed', globals.changed, 0)
     elif idaapi.__version__ >= 6.9:
         ui.hook.idp.add('init', address.database_init, 0)
         ui.hook.idp.add('init', globals.database_init, 0)
-        ui.hook.idb.add('changing_area_cmt', globals.changing, 0)
-        ui.hook.idb.add('area_cmt_changed', globals.changed, 0)
     else:
         idaapi.__notification__.add(idaapi.NW_OPENIDB, address.nw_database_init, -30)
         idaapi.__notification__.add(idaapi.NW_OPENIDB, globals.nw_database_init, -30)
+
+    ## switch the instruction set when the processor is switched. we defer
+    ## fetching these so that their modules aren't loaded until they're used.
+    if idaapi.__version__ >= 7.0:
+        ui.hook.idp.add('ev_newprc', deferred(instruction, '__ev_newprc__'), 0)
+    elif idaapi.__version__ >= 6.9:
+        ui.hook.idp.add('newprc', deferred(instruction, '__newprc__'), 0)
+    else:
+        idaapi.__notification__.add(idaapi.NW_OPENIDB, deferred(instruction, '__nw_newprc__'), -10)
+
+    ## ensure the database.config namespace is initialized as it's
+    ## necessary and used by the processor detection.
+    if idaapi.__version__ >= 7.0:
+        ui.hook.idp.add('ev_init', deferred(database, 'config', '__init_info_structure__'), -100)
+    elif idaapi.__version__ >= 6.9:
+        ui.hook.idp.add('init', deferred(database, 'config', '__init_info_structure__'), -100)
+    else:
+        idaapi.__notification__.add(idaapi.NW_OPENIDB, deferred(database, 'config', '__nw_init_info_structure__'), -30)
+
+    ## install the rest of our hooks when a database is opened, as they're
+    ## only needed when there's a database to modify.
+    if idaapi.__version__ >= 7.0:
+        ui.hook.idp.add('ev_init', make_ida_not_suck_cocks_database, -1000)
+    elif idaapi.__version__ >= 6.9:
+        ui.hook.idp.add('init', make_ida_not_suck_cocks_database, -1000)
+    else:
+        idaapi.__notification__.add(idaapi.NW_OPENIDB, nw_make_ida_not_suck_cocks_database, -1000)
+
+    ### ...and that's it for all the hooks, so give out our greeting
+    return greeting()
+
+def make_ida_not_suck_cocks_database(idp_modname):
+    '''Start hooking the parts of IDA's API that are only used when a database is open.'''
+
+    ## hook any user-entered comments so that they will also update the tagcache
+    if idaapi.__version__ >= 7.0:
+        ui.hook.idb.add('changing_range_cmt', globals.changing, 0)
+        ui.hook.idb.add('range_cmt_changed', globals.changed, 0)
+    elif idaapi.__version__ >= 6.9:
+        ui.hook.idb.add('changing_area_cmt', globals.changing, 0)
+        ui.hook.idb.add('area_cmt_changed', globals.changed, 0)
+    else:
         ui.hook.idb.add('area_cmt_changed', globals.old_changed, 0)
 
     if idaapi.__version__ >= 6.9:
@@ -1073,27 +1292,16 @@ def make_ida_not_suck_cocks(nw_code):
     ## rebase the entire tagcache when the entire database is rebased.
     if idaapi.__version__ >= 6.9:
         ui.hook.idb.add('allsegs_moved', rebase, 0)
-    else:
-        ui.hook.idb.add('segm_start_changed', segm_start_changed, 0)
-        ui.hook.idb.add('segm_end_changed', segm_end_changed, 0)
-        ui.hook.idb.add('segm_moved', segm_moved, 0)
 
-    ## switch the instruction set when the processor is switched
-    if idaapi.__version__ >= 7.0:
-        ui.hook.idp.add('ev_newprc', instruction.__ev_newprc__, 0)
-    elif idaapi.__version__ >= 6.9:
-        ui.hook.idp.add('newprc', instruction.__newprc__, 0)
-    else:
-        idaapi.__notification__.add(idaapi.NW_OPENIDB, instruction.__nw_newprc__, -10)
+    ## relocate the tags for a segment that was moved, or discard them if a segment was shrunk.
+    [ ui.hook.idb.add(item.__name__, item, 0) for item in [segm_start_changed, segm_end_changed, segm_moved] ]
 
-    ## ensure the database.config namespace is initialized as it's
-    ## necessary and used by the processor detection.
+    ## forget the segments that were moved if the database isn't being rebased.
     if idaapi.__version__ >= 7.0:
-        ui.hook.idp.add('ev_init', database.config.__init_info_structure__, -100)
+        ui.hook.idp.add('ev_auto_queue_empty', relocated, 0)
+        [ ui.hook.idb.add(item, relocated, 0) for item in ['savebase', 'closebase'] ]
     elif idaapi.__version__ >= 6.9:
-        ui.hook.idp.add('init', database.config.__init_info_structure__, -100)
-    else:
-        idaapi.__notification__.add(idaapi.NW_OPENIDB, database.config.__nw_init_info_structure__, -30)
+        ui.hook.idp.add('auto_empty', relocated, 0)
 
     ## just some debugging notification hooks
     #[ ui.hook.ui.add(item, notify(item), -100) for item in ['range','idcstop','idcstart','suspend','resume','term','ready_to_run'] ]
@@ -1103,8 +1311,13 @@ def make_ida_not_suck_cocks(nw_code):
     #ui.hook.idb.add('allsegs_moved', notify('allsegs_moved'), -100)
     #[ ui.hook.idb.add(item, notify(item), -100) for item in ['cmt_changed', 'changing_cmt', 'range_cmt_changed', 'changing_range_cmt'] ]
 
-    ### ...and that's it for all the hooks, so give out our greeting
-    return greeting()
+    ### ...and that's it for all the database hooks
+    return
+
+def nw_make_ida_not_suck_cocks_database(nw_code, is_old_database):
+    idp_modname = idaapi.get_idp_name()
+    return make_ida_not_suck_cocks_database(idp_modname)
+
 
 def make_ida_suck_cocks(nw_code):
     '''Unhook all of IDA's API.'''
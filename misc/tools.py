@@ -296,3 +296,256 @@ def makecall(ea=None, target=None):
     except:
         pass
     return "{:s}({:s})".format(internal.declaration.demangle(database.name(fn)), ','.join(result))
+
+def loadtimes(file=None):
+    """Write the number of seconds that it took to load each module of the plugin to the specified `file`.
+
+    The time for each module includes whatever it imported while it was being
+    loaded. Modules that are part of the public api and have not been used yet
+    are listed as "lazy" since they will only be loaded on their first use.
+    """
+    file, timings = file or sys.stdout, {}
+    [timings.update(loader.timings) for loader in sys.meta_path if isinstance(getattr(loader, 'timings', None), dict)]
+
+    # figure out which modules haven't been loaded yet by checking for a loader
+    lazy = {name for name, module in sys.modules.items() if isinstance(module, types.ModuleType) and '__lazy__' in module.__dict__}
+    names = sorted(timings, key=timings.__getitem__, reverse=True) + sorted(lazy - {name for name in timings})
+
+    width = max(builtins.map(len, names)) if names else 0
+    for name in names:
+        if name in timings:
+            six.print_("{:<{:d}s} : {:.6f}s".format(name, width, timings[name]), file=file)
+        else:
+            six.print_("{:<{:d}s} : lazy".format(name, width), file=file)
+        continue
+    six.print_("{:<{:d}s} : {:.6f}s".format('total', width, sum(timings.get(name, 0.) for name in names if '.' not in name and name in timings)), file=file)
+
+class trace(object):
+    """
+    This namespace is used to trace the calls to the public functions of the
+    `database`, `function`, `instruction`, `structure`, `segment`, and
+    `enumeration` modules. Once installed, the number of calls, the time
+    spent in each function including its callees (cumulative), and the time
+    spent in each function excluding its callees (self) are recorded for
+    each function. Every call to a function from `idaapi` that is made while
+    one of these functions is executing is also recorded in order to
+    distinguish the time spent within IDA from the time spent within the
+    plugin itself.
+
+    Tracing is installed by replacing each of the functions with a wrapper,
+    and is removed by restoring the original functions. If a function returns
+    a generator, then the generator is wrapped too so that the time spent each
+    time it is resumed is credited to the function instead of its caller. The results can be
+    written as "collapsed" stacks so that they can be rendered as a flame
+    graph using a tool such as "flamegraph.pl".
+
+    Some examples of using this namespace are::
+
+        > tools.trace.install()
+        > tools.trace.report(20)
+        > tools.trace.flamegraph('/path/to/output.folded')
+        > tools.trace.uninstall()
+
+    """
+    modules = ['database', 'function', 'instruction', 'structure', 'segment', 'enumeration']
+
+    # the function used to measure time, the original attributes that have
+    # been replaced, and the statistics that have been collected.
+    timer = staticmethod(__import__('timeit').default_timer)
+    installed, stack, state, stacks = [], [], {}, {}
+
+    @classmethod
+    def install(cls, *modules, **idaapi):
+        """Start tracing the public functions from each of the specified `modules`.
+
+        If `modules` is not specified, then use the namespaces from the ``modules`` attribute.
+        If the boolean `idaapi` is false, then avoid tracing the calls that are made to IDA's api.
+        """
+        if cls.installed:
+            raise internal.exceptions.InvalidTypeOrValueError(u"{:s}.install({:s}) : Refusing to install the tracer as it has already been installed for {:d} function{:s}.".format('.'.join([__name__, cls.__name__]), ', '.join(builtins.map("{!r}".format, modules)), len(cls.installed), '' if len(cls.installed) == 1 else 's'))
+
+        # collect the attributes from each of the modules that we're going to wrap.
+        wrapped, attributes = {}, []
+        for name in modules or cls.modules:
+            module = __import__(name) if isinstance(name, six.string_types) else name
+            if '__lazy__' in module.__dict__:
+                module.__materialize__()
+            attributes.extend(cls.__collect__(module, module.__name__, module.__name__, set()))
+
+        # if we were asked to trace idaapi, then include all of its callables.
+        if idaapi.get('idaapi', True):
+            module = __import__('idaapi')
+            attributes.extend((module, attribute, item, '.'.join([module.__name__, attribute])) for attribute, item in sorted(module.__dict__.items()) if not attribute.startswith('_') and callable(item) and not isinstance(item, six.class_types + (types.ModuleType,)))
+
+        # now we can replace each attribute. we cache each wrapper so that any
+        # aliases for the same function will continue to be the same object.
+        for owner, attribute, item, name in attributes:
+            descriptor, F = (item.__class__, item.__func__) if isinstance(item, (classmethod, staticmethod)) else (None, item)
+            if builtins.id(F) not in wrapped:
+                wrapped[builtins.id(F)] = cls.__wrap__(F, name)
+            W = wrapped[builtins.id(F)]
+            setattr(owner, attribute, W if descriptor is None else descriptor(W))
+            cls.installed.append((owner, attribute, item))
+        return len(wrapped)
+
+    @classmethod
+    def uninstall(cls):
+        """Stop tracing by restoring all of the functions that were replaced.
+
+        The statistics that were collected are left intact.
+        """
+        count = len(cls.installed)
+        while cls.installed:
+            owner, attribute, item = cls.installed.pop()
+            setattr(owner, attribute, item)
+        return count
+
+    @classmethod
+    def reset(cls):
+        '''Discard all of the statistics that have been collected.'''
+        cls.state.clear(), cls.stacks.clear()
+
+    @classmethod
+    def __collect__(cls, owner, module, prefix, visited):
+        '''Yield each `(owner, attribute, item, name)` belonging to `module` that can be found within `owner`.'''
+        for attribute, item in sorted(owner.__dict__.items()):
+            if attribute.startswith('_') and attribute != '__new__':
+                continue
+
+            # use the namespace's name for its constructor since that's how it
+            # gets called, and the real name of anything else to avoid aliases.
+            name = prefix if attribute == '__new__' else '.'.join([prefix, getattr(item, '__name__', getattr(getattr(item, '__func__', None), '__name__', attribute))])
+
+            # if it's a class defined by the module, then descend into it.
+            if isinstance(item, six.class_types) and item.__module__ == module and builtins.id(item) not in visited:
+                visited.add(builtins.id(item))
+                for result in cls.__collect__(item, module, name, visited):
+                    yield result
+                continue
+
+            # otherwise grab the function so that we can check where it came from.
+            F = item.__func__ if isinstance(item, (classmethod, staticmethod)) else item
+            if isinstance(F, types.FunctionType) and F.__module__ == module:
+                yield owner, attribute, item, name
+            continue
+        return
+
+    @classmethod
+    def __wrap__(cls, F, name):
+        '''Return a function that will record the call to the callable `F` using the given `name`.'''
+        stack, timer, record, resume = cls.stack, cls.timer, cls.__record__, cls.__resume__
+        def trace(*args, **kwargs):
+            path = (stack[-1][0] if stack else ()) + (name,)
+            frame = [path, 0., 0]
+            stack.append(frame)
+            start = timer()
+            try:
+                res = F(*args, **kwargs)
+            finally:
+                elapsed = timer() - start
+                stack.pop()
+                record(frame, elapsed)
+
+            # if we got a generator, then its body hasn't been executed yet.
+            return resume(res, name) if isinstance(res, types.GeneratorType) else res
+
+        # if it's an idaapi function, then we only care about it if it's being called by one of our functions.
+        def idaapi(*args, **kwargs):
+            return trace(*args, **kwargs) if stack else F(*args, **kwargs)
+
+        res = idaapi if name.startswith('idaapi.') else trace
+        res.__name__, res.__doc__ = getattr(F, '__name__', name.rsplit('.', 1)[-1]), getattr(F, '__doc__', None)
+        res.__dict__.update(getattr(F, '__dict__', {}))
+        return res
+
+    @classmethod
+    def __resume__(cls, generator, name):
+        """Yield each item from `generator` recording the time spent resuming it using the given `name`.
+
+        Each time the generator is resumed, it is traced as if it was called
+        by whichever function is resuming it. These are not counted as calls.
+        """
+        stack, timer, record = cls.stack, cls.timer, cls.__record__
+        value, exception = None, None
+        while True:
+            path = (stack[-1][0] if stack else ()) + (name,)
+            frame = [path, 0., 0]
+            stack.append(frame)
+            start = timer()
+            try:
+                item = generator.send(value) if exception is None else generator.throw(*exception)
+            except StopIteration:
+                return
+            finally:
+                elapsed = timer() - start
+                stack.pop()
+                record(frame, elapsed, False)
+
+            # pass anything that was sent or thrown to us to the generator.
+            try:
+                value, exception = (yield item), None
+            except GeneratorExit:
+                generator.close()
+                raise
+            except Exception:
+                value, exception = None, sys.exc_info()
+            continue
+        return
+
+    @classmethod
+    def __record__(cls, frame, elapsed, call=True):
+        """Update the statistics for the specified `frame` that took `elapsed` seconds.
+
+        If `call` is false, then the frame is not counted as a call.
+        """
+        path, children, calls = frame
+        name = path[-1]
+
+        # figure out the statistics for the current function and its caller.
+        if name not in cls.state:
+            cls.state[name] = {'name': name, 'calls': 0, 'cumulative': 0., 'self': 0., 'idaapi': 0}
+        statistics, caller = cls.state[name], cls.stack[-1] if cls.stack else None
+
+        # if the function is recursive, then its cumulative time will
+        # already be included by the outermost call to it.
+        statistics['calls'] += 1 if call else 0
+        statistics['cumulative'] += 0. if name in path[:-1] else elapsed
+        statistics['self'] += elapsed - children
+        statistics['idaapi'] += calls
+        cls.stacks[path] = cls.stacks.get(path, 0.) + elapsed - children
+
+        # now we can add ourselves to our caller.
+        if caller:
+            caller[1] += elapsed
+            caller[2] += 1 if name.startswith('idaapi.') else 0
+        return
+
+    @classmethod
+    def results(cls):
+        '''Return a list of the statistics for each function that was traced sorted by their self time.'''
+        res = (builtins.dict(statistics) for statistics in cls.state.values())
+        return builtins.sorted(res, key=operator.itemgetter('self'), reverse=True)
+
+    @classmethod
+    def report(cls, count=None, file=None):
+        '''Write the statistics for the first `count` functions that took the most time to the specified `file`.'''
+        file, results = file or sys.stdout, cls.results()[:count]
+        width = max(builtins.map(len, (item['name'] for item in results))) if results else 0
+        for item in results:
+            six.print_(u"{:<{:d}s} : {:d} call{:s} spent {:.6f}s (cumulative) {:.6f}s (self) with {:d} call{:s} to idaapi".format(item['name'], width, item['calls'], '' if item['calls'] == 1 else 's', item['cumulative'], item['self'], item['idaapi'], '' if item['idaapi'] == 1 else 's'), file=file)
+        return
+
+    @classmethod
+    def collapsed(cls):
+        '''Yield each stack that was traced in the "collapsed" format along with the number of microseconds spent in it.'''
+        for path, elapsed in sorted(cls.stacks.items()):
+            yield u"{:s} {:d}".format(';'.join(path), builtins.int(round(elapsed * 1e6)))
+        return
+
+    @classmethod
+    def flamegraph(cls, path):
+        '''Write the stacks that were traced to the file at `path` in the "collapsed" format used by flame graphs.'''
+        with open(path, 'wt') as outfile:
+            for line in cls.collapsed():
+                outfile.write(line.encode('utf-8') + '\n')
+            return
@@ -1189,6 +1189,15 @@ class hook(object):
     Please refer to the documentation for ``idaapi.IDP_Hooks``,
     ``idaapi.IDB_Hooks``, and ``idaapi.UI_Hooks`` for identifying what
     is available.
+
+    Statistics for each of the hooked callables can be collected with
+    ``hook.profile(True)``. Afterwards, the callables that took the most
+    time can be listed for a component by using ``hook.idb.top()``.
+
+    The events that are dispatched to each component can be recorded by
+    using ``hook.record(callable)``, where `callable` is given the name of
+    the component, the name of the event, and its parameters. The events
+    can be written to a file by using the ``custom.events`` module.
     """
     @classmethod
     def __start_ida__(cls):
@@ -1226,6 +1235,30 @@ class hook(object):
             hooker.unhook()
         return
 
+    @classmethod
+    def profile(cls, *enable):
+        '''Return whether statistics are being collected for the callables of each component that can be hooked.'''
+        if not enable:
+            return all(getattr(cls, api).profile() for api in ['idp', 'idb', 'ui'])
+        enabled, = enable
+        res = [getattr(cls, api).profile(enabled) for api in ['idp', 'idb', 'ui']]
+        return all(res)
+
+    @classmethod
+    def reset(cls):
+        '''Reset the statistics that have been collected for the callables of each component that can be hooked.'''
+        res = [getattr(cls, api).reset() for api in ['idp', 'idb', 'ui']]
+        return all(res)
+
+    @classmethod
+    def record(cls, *recorder):
+        '''Return whether the events for each component that can be hooked are being recorded, or give them to `recorder` along with the name of their component.'''
+        if not recorder:
+            return all(getattr(cls, api).record() is not None for api in ['idp', 'idb', 'ui'])
+        F, = recorder
+        res = [getattr(cls, api).record(None if F is None else functools.partial(F, api)) for api in ['idp', 'idb', 'ui']]
+        return all(item is not None for item in res)
+
 ### Helper classes to use or inherit from
 # XXX: why was this base class implemented again??
 class InputBox(idaapi.PluginForm):